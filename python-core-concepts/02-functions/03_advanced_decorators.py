@@ -30,6 +30,7 @@ def function_to_decorate():
 """
 1. Logging Decorator
 A simple decorator to log the input arguments and output of a function.
+For a buffered, non-blocking JSON-lines version suited to hot paths, see 08_advanced_structured_logging.py.
 """
 def log_decorator(func):
     def wrapper(*args, **kwargs):
@@ -47,14 +48,16 @@ print(add(3,5))
 """
 2. Timing Decorator
 A decorator to measure the execution time of a function.
+time.perf_counter() is a monotonic, high-resolution clock - better suited to measuring durations than time.time().
+For profiling without printing on every call, see 07_advanced_profiling.py.
 """
 import time
 
 def timing_decorator(func):
     def wrapper(*args, **kwargs):
-        start_time=time.time()
+        start_time=time.perf_counter()
         result = func(*args, **kwargs)
-        end_time=time.time()
+        end_time=time.perf_counter()
         print(f"{func.__name__} executed in {end_time-start_time:.4f} seconds")
         return result
     return wrapper
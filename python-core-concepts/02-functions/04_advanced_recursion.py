@@ -130,6 +130,9 @@ print(fibonacci_memo(50))
 """
 Q: How can you optimize recursive functions?
 A: Using memoization to store intermediate results, reducing redundant calculations.
+
+Note: memo={} is a mutable default - one dict shared by every call that never shrinks and isn't thread-safe.
+See 09_advanced_memoization.py for a bounded, thread-safe memoize decorator (LRU/LFU/TTL).
 """
 """-----------------------------------------------------------------------------------------------------------------"""
 """
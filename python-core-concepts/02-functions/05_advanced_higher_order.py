@@ -60,6 +60,7 @@ print(times_two(5))
 # 4. Combining Functions
 # Higher-order functions can combine multiple functions.
 # Example: Applying Multiple Transformations
+# (For a lazy, fused and optionally vectorised version, see 16_advanced_lazy_pipelines.py)
 def apply_transformations(data, transformations):
     for transformation in transformations:
         data = map(transformation,data)
@@ -107,6 +108,7 @@ A: The key argument allows you to specify a function that determines how element
 """-----------------------------------------------------------------------------------------------------------------"""
 # 6. Practice Exercise
 # Task: Write a higher-order function to normalise a list of numbers to a range [0, 1].
+# (For a streaming, serialisable version that also handles constant data, see 17_advanced_streaming_normaliser.py)
 def normalise_values(data: list):
     min_value, max_value = min(data), max(data)
     return list(map(lambda x: (x - min_value) / (max_value - min_value), data))
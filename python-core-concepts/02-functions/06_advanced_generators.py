@@ -50,6 +50,7 @@ print(next(gen))
 3. Use Cases for Generators in Data Science
 A. Reading Large Files - Efficiently process a large file line by line.
 Why Generators?: Instead of loading the entire file into memory, this processes it line by line.
+For multi-GB files, see 12_advanced_mmap_file_reader.py (memory-mapped, block-at-a-time reading and sharding).
 """
 def read_large_file(file_path):
     with open(file_path, 'r') as file:
@@ -154,6 +155,7 @@ def sliding_window_average(data, window_size):
 data = [1, 2, 3, 4, 5]
 print(list(sliding_window_average(data, 3)))  # Output: [2.0, 3.0, 4.0]
 ```
+This re-sums every window (O(n * w)); see 14_advanced_sliding_windows.py for O(1)-per-step streaming windows.
 
 Summary of Key Points
    > What Are Generators?: Functions that use yield or expressions to generate values lazily.
@@ -0,0 +1,266 @@
+"""
+Low-Overhead Profiling Decorators
+The timing_decorator in 03_advanced_decorators.py is great for learning, but it prints on every call.
+Printing is I/O, and I/O is usually far slower than the function being measured, so the numbers it reports
+(and the throughput of the pipeline it is attached to) are skewed by the measurement itself.
+
+A production-friendly profiler should:
+ > Use a high-resolution, monotonic clock (time.perf_counter_ns) instead of wall-clock time (time.time).
+ > Record measurements in memory and only report when asked (no print per call).
+ > Keep memory bounded - a fixed-size latency histogram instead of a list of every duration.
+ > Support sampling, so only a fraction of calls pay for the timing work.
+ > Export a summary snapshot (call counts, mean, p50/p95/p99) for dashboards or logs.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import json
+import random
+import threading
+import time
+from functools import wraps
+
+"""
+1. Latency Histogram
+Storing every duration grows without bound. Instead we use log-linear buckets (the idea behind HDR histograms):
+ - Each power of two is split into a fixed number of sub-buckets, so the relative error stays small (~3% here).
+ - Recording is O(1) and the whole histogram is a fixed list of integers, no matter how many calls we record.
+"""
+SUB_BUCKET_BITS = 4  # 16 sub-buckets per power of two
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_BUCKETS = 64 * SUB_BUCKETS
+
+
+def bucket_index(value_ns):
+    if value_ns < SUB_BUCKETS:  # small values get an exact bucket each
+        return value_ns
+    shift = value_ns.bit_length() - SUB_BUCKET_BITS - 1
+    # (shift + 1) selects the power of two, the top bits below the leading 1 select the sub-bucket
+    return ((shift + 1) << SUB_BUCKET_BITS) + ((value_ns >> shift) & (SUB_BUCKETS - 1))
+
+
+def bucket_midpoint(index):
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    low = (SUB_BUCKETS + (index & (SUB_BUCKETS - 1))) << shift
+    return low + ((1 << shift) >> 1)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * MAX_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, value_ns):
+        self.counts[bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        if self.min_ns is None or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    def percentile(self, p):
+        if self.count == 0:
+            return 0
+        target = max(1, round(self.count * p / 100))
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return min(bucket_midpoint(index), self.max_ns)
+        return self.max_ns
+
+    def merge(self, other):
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.total_ns += other.total_ns
+        if other.min_ns is not None and (self.min_ns is None or other.min_ns < self.min_ns):
+            self.min_ns = other.min_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+
+histogram = LatencyHistogram()
+for duration in [120, 130, 150, 900, 1000, 20000]:
+    histogram.record(duration)
+print(histogram.percentile(50), histogram.percentile(99))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Per-Function Statistics and the Profiler
+ - Every call increments a plain counter (cheap).
+ - Only sampled calls read the clock and update the histogram (under a lock, so threads can share one profiler).
+ - A sample_rate of 0.1 means roughly 1 in 10 calls is timed. Percentiles stay representative,
+   and the mean/total are scaled back up using the real call count.
+"""
+class FunctionStats:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0  # incremented without a lock - may undercount slightly under heavy thread contention
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+        self.lock = threading.Lock()
+
+    def record(self, duration_ns, failed):
+        with self.lock:
+            self.histogram.record(duration_ns)
+            if failed:
+                self.errors += 1
+
+    def summary(self):
+        with self.lock:
+            hist = self.histogram
+            sampled = hist.count
+            mean_ns = hist.total_ns / sampled if sampled else 0
+            return {
+                "calls": self.calls,
+                "sampled": sampled,
+                "errors": self.errors,
+                "mean_us": mean_ns / 1_000,
+                "p50_us": hist.percentile(50) / 1_000,
+                "p95_us": hist.percentile(95) / 1_000,
+                "p99_us": hist.percentile(99) / 1_000,
+                "max_us": hist.max_ns / 1_000,
+                "estimated_total_ms": mean_ns * self.calls / 1_000_000,
+            }
+
+
+class Profiler:
+    def __init__(self, sample_rate=1.0, enabled=True):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, name):
+        with self._lock:
+            if name not in self._stats:
+                self._stats[name] = FunctionStats(name)
+            return self._stats[name]
+
+    def profile(self, func=None, *, name=None, sample_rate=None):
+        # Usable both as @profiler.profile and @profiler.profile(sample_rate=0.01)
+        if func is None:
+            return lambda f: self.profile(f, name=name, sample_rate=sample_rate)
+
+        stats = self._stats_for(name or func.__qualname__)
+        rate = self.sample_rate if sample_rate is None else sample_rate
+        clock = time.perf_counter_ns
+        rand = random.random
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            stats.calls += 1
+            if rate < 1.0 and rand() >= rate:  # not sampled: no clock reads, no locking
+                return func(*args, **kwargs)
+            failed = True
+            start = clock()
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                stats.record(clock() - start, failed)
+
+        wrapper.stats = stats
+        return wrapper
+
+    def snapshot(self):
+        with self._lock:
+            all_stats = list(self._stats.values())
+        return {stats.name: stats.summary() for stats in all_stats}
+
+    def export_json(self, path=None):
+        payload = json.dumps({"captured_at": time.time(), "functions": self.snapshot()}, indent=2)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(payload)
+        return payload
+
+    def report(self):
+        # Printing happens once, on demand - never inside the hot path
+        print(f"{'function':<20}{'calls':>10}{'p50(us)':>12}{'p95(us)':>12}{'p99(us)':>12}{'max(us)':>12}")
+        for name, summary in sorted(self.snapshot().items()):
+            print(f"{name:<20}{summary['calls']:>10}{summary['p50_us']:>12.1f}"
+                  f"{summary['p95_us']:>12.1f}{summary['p99_us']:>12.1f}{summary['max_us']:>12.1f}")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# A module-level default profiler, so pipelines can share one registry
+default_profiler = Profiler()
+profile = default_profiler.profile
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Profiling Pipeline Steps
+The same steps that were wrapped with log_preprocessing and timing_decorator, now profiled silently.
+"""
+pipeline_profiler = Profiler(sample_rate=0.5)
+
+@pipeline_profiler.profile
+def clean_data(data):
+    return [item.strip() for item in data]
+
+@pipeline_profiler.profile(sample_rate=1.0)
+def train_model():
+    time.sleep(0.01)  # Simulating training
+    return "Model Trained"
+
+for _ in range(1000):
+    clean_data(["Alice ", " Bob", " Charlie "])
+for _ in range(5):
+    train_model()
+
+pipeline_profiler.report()
+print(pipeline_profiler.snapshot()["clean_data"])
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Measuring the Profiler's Own Overhead
+Compare a tiny function with and without the decorator. With sampling, most calls skip the clock entirely.
+"""
+def measure_overhead(sample_rate, calls=200_000):
+    def tiny(x):
+        return x + 1
+
+    profiled = Profiler(sample_rate=sample_rate).profile(tiny)
+
+    start = time.perf_counter_ns()
+    for i in range(calls):
+        tiny(i)
+    baseline_ns = time.perf_counter_ns() - start
+
+    start = time.perf_counter_ns()
+    for i in range(calls):
+        profiled(i)
+    profiled_ns = time.perf_counter_ns() - start
+    return (profiled_ns - baseline_ns) / calls
+
+for rate in (1.0, 0.1, 0.01):
+    print(f"sample_rate={rate}: ~{measure_overhead(rate):.0f} ns overhead per call")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why use time.perf_counter_ns() instead of time.time() to measure execution time?
+A: time.time() is wall-clock time - it can jump (NTP adjustments) and has coarse resolution on some platforms.
+perf_counter_ns() is monotonic, has the highest available resolution, and returns an int, so there is no float rounding.
+
+Q: Why shouldn't a profiling decorator print on every call?
+A: Printing is synchronous I/O. It can cost more than the function being measured, which distorts both the measured
+latency and the throughput of the pipeline. Collect in memory and report on demand instead.
+
+Q: How can you report p95/p99 latency without storing every measurement?
+A: Use a bucketed histogram (e.g., log-linear/HDR buckets). Memory is fixed, recording is O(1),
+and percentiles are accurate to the bucket width.
+
+Q: What does sampling trade off?
+A: Lower overhead in exchange for statistical (rather than exact) latency figures. Every call is still counted,
+because counting is cheap; only the timing is sampled. The count is kept without a lock, so under heavy thread
+contention it can undercount slightly - exact in single-threaded code, approximate otherwise.
+"""
@@ -0,0 +1,302 @@
+"""
+Buffered, Asynchronous Structured Logging
+log_decorator and log_preprocessing in 03_advanced_decorators.py call print() synchronously and format the full
+repr of args/kwargs on every call. With a list of a million items, building that string alone costs more than the
+function being logged, and the caller waits for stdout on every call.
+
+A faster logging path separates "recording an event" from "writing it out":
+ > The caller appends a small record to a bounded ring buffer and returns immediately.
+ > A background thread drains the buffer in batches and writes JSON lines (one record per line).
+ > Reprs are built lazily (by the writer thread, not the caller) and truncated with reprlib,
+   so a huge list is summarised as [0, 1, 2, 3, 4, 5, ...] instead of being fully formatted.
+ > When the buffer is full, a policy decides what happens: drop the new record, drop the oldest, or block the caller.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import contextlib
+import io
+import json
+import os
+import reprlib
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+"""
+1. A Bounded Ring Buffer with an Overflow Policy
+ - "drop_newest": keep what is already queued, discard the incoming record (never slows the caller).
+ - "drop_oldest": discard the oldest queued record to make room (keep the most recent history).
+ - "block": wait until the writer thread frees space (no data loss, but callers can stall).
+"""
+POLICIES = ("drop_newest", "drop_oldest", "block")
+
+
+class RingBuffer:
+    def __init__(self, capacity=10_000, policy="drop_newest"):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.policy = policy
+        self.dropped = 0
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def put(self, item, timeout=None):
+        with self._lock:
+            if len(self._items) >= self.capacity:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                elif not self._not_full.wait_for(lambda: len(self._items) < self.capacity, timeout):
+                    self.dropped += 1  # block policy timed out
+                    return False
+            self._items.append(item)
+            self._not_empty.notify()
+            return True
+
+    def get_batch(self, max_items, timeout):
+        # Waits up to `timeout` for at least one item, then takes as many as are ready (up to max_items)
+        with self._lock:
+            self._not_empty.wait_for(lambda: self._items, timeout)
+            batch = []
+            while self._items and len(batch) < max_items:
+                batch.append(self._items.popleft())
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+buffer = RingBuffer(capacity=2, policy="drop_oldest")
+for i in range(4):
+    buffer.put(i)
+print(buffer.get_batch(10, timeout=0), buffer.dropped)  # [2, 3] 2
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Lazy, Truncated Reprs
+reprlib.Repr limits how many items and characters are formatted, so the cost no longer grows with the data size.
+Records keep a reference to the original arguments and the writer thread formats them later.
+Note: if a caller mutates an argument before the writer flushes it, the log shows the mutated value.
+Pass lazy=False to the decorator when that matters - the truncated repr is still cheap to build eagerly.
+"""
+short_repr = reprlib.Repr()
+short_repr.maxlist = short_repr.maxtuple = short_repr.maxset = short_repr.maxdict = 6
+short_repr.maxstring = short_repr.maxother = 80
+short_repr.maxlevel = 3
+
+
+class LazyRepr:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return short_repr.repr(self.value)
+
+
+def to_json_safe(value):
+    if isinstance(value, LazyRepr):
+        return str(value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return short_repr.repr(value)
+
+print(short_repr.repr(list(range(1_000_000))))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. The Background Writer
+AsyncJSONLogger owns the buffer and a daemon thread. The thread wakes up when records arrive (or every
+flush_interval seconds), pulls up to batch_size records and writes them with a single write() call.
+A record whose repr raises, or a batch the sink fails to write, is counted in errors and the thread keeps draining -
+if it died instead, callers using policy="block" would wait forever on a full buffer.
+"""
+class AsyncJSONLogger:
+    def __init__(self, sink, capacity=10_000, policy="drop_newest", batch_size=512, flush_interval=0.2):
+        self.sink = sink  # any object with write() (and optionally flush()), e.g. an open file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = RingBuffer(capacity, policy)
+        self.written = 0
+        self.errors = 0  # records lost to a failing repr or sink.write - counted, never fatal to the writer
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="async-json-logger", daemon=True)
+        self._thread.start()
+
+    def log(self, event, **fields):
+        if self._closed.is_set():
+            raise RuntimeError("logger is closed")
+        fields["event"] = event
+        fields["ts"] = time.time()
+        return self.buffer.put(fields)
+
+    def _write_batch(self, batch):
+        lines = []
+        for record in batch:
+            try:  # a lazy repr runs user code here, long after the call that logged it
+                lines.append(json.dumps({key: to_json_safe(value) for key, value in record.items()}))
+            except Exception:
+                self.errors += 1
+        if not lines:
+            return
+        try:
+            self.sink.write("\n".join(lines) + "\n")
+            if hasattr(self.sink, "flush"):
+                self.sink.flush()
+        except Exception:
+            self.errors += len(lines)
+            return
+        self.written += len(lines)
+
+    def _run(self):
+        while not self._closed.is_set() or len(self.buffer):
+            batch = self.buffer.get_batch(self.batch_size, self.flush_interval)
+            if batch:
+                self._write_batch(batch)
+
+    @property
+    def dropped(self):
+        return self.buffer.dropped
+
+    def close(self):
+        # Stop accepting records, drain whatever is buffered, and wait for the writer to finish
+        self._closed.set()
+        with self.buffer._lock:
+            self.buffer._not_empty.notify_all()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Structured Replacements for log_decorator and log_preprocessing
+"""
+def structured_log_decorator(logger, lazy=True):
+    wrap_value = LazyRepr if lazy else (lambda value: short_repr.repr(value))
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            logger.log("call", function=func.__name__, args=wrap_value(args), kwargs=wrap_value(kwargs))
+            result = func(*args, **kwargs)
+            logger.log("return", function=func.__name__, result=wrap_value(result))
+            return result
+        return wrapper
+    return decorator
+
+
+def structured_log_preprocessing(logger, lazy=True):
+    wrap_value = LazyRepr if lazy else (lambda value: short_repr.repr(value))
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # The writer stores an epoch timestamp - no strftime on the caller's thread
+            logger.log("preprocessing", function=func.__name__, args=wrap_value(args), kwargs=wrap_value(kwargs))
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+log_path = "structured_log_demo.jsonl"
+with open(log_path, "w") as log_file, AsyncJSONLogger(log_file, policy="block") as logger:
+    @structured_log_preprocessing(logger)
+    def clean_data(data):
+        return [item.strip() for item in data]
+
+    @structured_log_decorator(logger)
+    def add(x, y):
+        return x + y
+
+    print(clean_data(["Alice ", " Bob", " Charlie "]))
+    print(add(3, 5))
+
+with open(log_path) as log_file:
+    for line in log_file:
+        print(line.strip())
+os.remove(log_path)
+
+
+class FlakySink(io.StringIO):
+    def write(self, text):
+        if not self.getvalue() and not getattr(self, "failed", False):
+            self.failed = True
+            raise OSError("disk full")  # the first write fails
+        return super().write(text)
+
+# A failed write is counted and dropped; the writer keeps draining, so policy="block" never deadlocks
+with AsyncJSONLogger(FlakySink(), capacity=2, policy="block", batch_size=2) as logger:
+    for i in range(10):
+        logger.log("row", value=i)
+print(f"written: {logger.written}, errors: {logger.errors}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. Comparing the Cost on the Caller's Thread
+The print-based decorator formats the whole list and writes it synchronously.
+The structured logger only appends a record to the buffer.
+"""
+def log_decorator(func):  # the original, from 03_advanced_decorators.py
+    def wrapper(*args, **kwargs):
+        print(f"Calling {func.__name__} with args {args}, kwargs {kwargs}")
+        result = func(*args, **kwargs)
+        print(f"{func.__name__} returned {result}")
+        return result
+    return wrapper
+
+
+def benchmark_loggers(size=100_000, calls=20):
+    large_list = list(range(size))
+
+    def total(data):
+        return len(data)
+
+    with open(os.devnull, "w") as devnull:
+        printed_total = log_decorator(total)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            for _ in range(calls):
+                printed_total(large_list)
+        print_seconds = time.perf_counter() - start
+
+        with AsyncJSONLogger(devnull) as logger:
+            structured_total = structured_log_decorator(logger)(total)
+            start = time.perf_counter()
+            for _ in range(calls):
+                structured_total(large_list)
+            structured_seconds = time.perf_counter() - start
+
+    print(f"print-based: {print_seconds / calls * 1e6:.0f} us/call, "
+          f"structured: {structured_seconds / calls * 1e6:.1f} us/call")
+
+benchmark_loggers()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why is print-based logging slow in a hot path?
+A: print() formats the full message and performs a synchronous write on every call.
+For large arguments the string formatting alone can dominate, and the caller blocks on I/O.
+
+Q: What is structured logging?
+A: Writing log records as machine-readable key/value data (e.g., one JSON object per line) instead of free text,
+so logs can be filtered, aggregated and loaded into analysis tools without parsing.
+
+Q: What happens when a bounded log buffer fills up?
+A: You must choose: drop new records (protects latency), drop old records (keeps recent history),
+or block the producer (no data loss, but the application slows down to the writer's pace).
+
+Q: Why batch writes in a background thread?
+A: One write() per batch amortises the system-call and flush cost across many records,
+and moves that cost off the thread doing the real work.
+"""
@@ -0,0 +1,383 @@
+"""
+Bounded, Thread-Safe Memoization
+fibonacci_memo(n, memo={}) in 04_advanced_recursion.py shows the idea of memoization, but its cache is a mutable
+default argument:
+ - The same dict is shared by every caller for the lifetime of the process.
+ - It never evicts anything, so in a long-running worker it grows forever (a memory leak).
+ - Nothing protects it when several threads call the function at once.
+
+A reusable memoization decorator fixes all three:
+ > Eviction policies: LRU (least recently used), LFU (least frequently used) and TTL (time-to-live expiry).
+ > A budget: a maximum number of entries and/or an approximate maximum number of bytes.
+ > Counters: hits, misses, evictions and expirations, so we can tell whether the cache is actually helping.
+ > Concurrency: lock striping (the cache is split into N independent segments, each with its own lock)
+   or one private cache per thread.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+"""
+1. Building Cache Keys and Estimating Sizes
+functools.lru_cache needs hashable arguments. extract_keys receives a dict, so unhashable arguments are "frozen"
+into nested tuples. Freezing walks the whole argument, so prefer a custom key= function for very large inputs.
+"""
+KWARGS_MARK = object()
+FROZEN_MARK = object()  # tags frozen containers; callers can't pass it, so frozen and plain arguments never collide
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return (FROZEN_MARK, dict) + tuple((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return (FROZEN_MARK, type(value)) + tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return (FROZEN_MARK, frozenset, frozenset(freeze(item) for item in value))
+    return value
+
+
+def make_key(args, kwargs):
+    key = args
+    if kwargs:
+        key += (KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return freeze(key)
+
+
+def estimate_size(value, seen=None):
+    # sys.getsizeof is shallow, so walk containers (once each) to approximate the real footprint
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    return size
+
+key = make_key(({"a": 1, "b": {"c": 2}},), {})
+print(hash(key) == hash(make_key(({"a": 1, "b": {"c": 2}},), {})))  # equal arguments, equal hashable keys
+print(make_key(([1, 2],), {}) == make_key((("list", 1, 2),), {}))  # False: a list never looks like a plain tuple
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Eviction Policies
+Both stores offer the same small interface (get / add / pop / pop_victim), so the cache logic does not care which one
+it uses.
+ - LRUStore: an OrderedDict. A hit moves the key to the end, the victim is the first key. All operations are O(1).
+ - LFUStore: keys are grouped into buckets by access frequency. The victim is the oldest key in the lowest-frequency
+   bucket, which is also O(1).
+"""
+class LRUStore:
+    def __init__(self):
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def add(self, key, entry):
+        self.entries[key] = entry
+
+    def pop(self, key):
+        return self.entries.pop(key, None)
+
+    def pop_victim(self):
+        return self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class LFUStore:
+    def __init__(self):
+        self.entries = {}  # key -> [entry, frequency]
+        self.buckets = defaultdict(OrderedDict)  # frequency -> keys, oldest first
+        self.min_frequency = 0
+
+    def _unlink(self, key, frequency):
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
+
+    def get(self, key):
+        slot = self.entries.get(key)
+        if slot is None:
+            return None
+        self._unlink(key, slot[1])
+        slot[1] += 1
+        self.buckets[slot[1]][key] = None
+        if self.min_frequency not in self.buckets:
+            self.min_frequency = slot[1]
+        return slot[0]
+
+    def add(self, key, entry):
+        self.entries[key] = [entry, 1]
+        self.buckets[1][key] = None
+        self.min_frequency = 1
+
+    def pop(self, key):
+        slot = self.entries.pop(key, None)
+        if slot is None:
+            return None
+        self._unlink(key, slot[1])
+        return slot[0]
+
+    def pop_victim(self):
+        if self.min_frequency not in self.buckets:
+            self.min_frequency = min(self.buckets)
+        key, _ = self.buckets[self.min_frequency].popitem(last=False)
+        if not self.buckets[self.min_frequency]:
+            del self.buckets[self.min_frequency]
+        entry, _ = self.entries.pop(key)
+        return key, entry
+
+    def __len__(self):
+        return len(self.entries)
+
+
+STORES = {"lru": LRUStore, "lfu": LFUStore}
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. A Cache Segment (Stripe)
+Each segment owns a store, a lock, a byte counter and its own hit/miss counters.
+The lock is only held while reading or updating the store - never while the wrapped function runs,
+so recursive functions can call themselves without deadlocking.
+"""
+MISSING = object()
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "expirations", "entries", "bytes"])
+
+
+class CacheSegment:
+    def __init__(self, policy, max_entries, max_bytes, ttl):
+        self.store = STORES[policy]()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.lock = threading.Lock()
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.store.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self.store.pop(key)
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            return value
+
+    def insert(self, key, value):
+        size = estimate_size(key) + estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return  # larger than the whole budget - not worth caching
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            previous = self.store.pop(key)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.store.add(key, (value, size, expires_at))
+            self.bytes += size
+            while len(self.store) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+                _, (_, victim_size, _) = self.store.pop_victim()
+                self.bytes -= victim_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.store = type(self.store)()
+            self.bytes = 0
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. The memoize Decorator
+ - stripes=N: keys are spread over N segments by hash, so threads working on different keys rarely wait for each other.
+   The entry/byte budget is divided between the segments (the remainder goes to the first ones, so the totals are
+   exactly max_entries and max_bytes). Each segment evicts within its own share, so a cache can evict before it is
+   full when keys hash unevenly.
+ - per_thread=True: every thread gets a private cache with the full budget (no sharing, no contention),
+   at the cost of duplicating entries between threads.
+"""
+def memoize(func=None, *, policy="lru", max_entries=1024, max_bytes=None, ttl=None, stripes=8, per_thread=False,
+            key=None):
+    if policy not in STORES:
+        raise ValueError(f"policy must be one of {tuple(STORES)}")
+    if max_entries is None or max_entries <= 0:
+        raise ValueError("max_entries must be a positive integer")
+    if func is None:
+        return lambda f: memoize(f, policy=policy, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl,
+                                 stripes=stripes, per_thread=per_thread, key=key)
+
+    key_func = key or (lambda *args, **kwargs: make_key(args, kwargs))
+    registry_lock = threading.Lock()
+
+    if per_thread:
+        local = threading.local()
+        all_segments = weakref.WeakSet()  # a thread's cache is freed when the thread exits
+
+        def segment_for(cache_key):
+            segment = getattr(local, "segment", None)
+            if segment is None:
+                segment = local.segment = CacheSegment(policy, max_entries, max_bytes, ttl)
+                with registry_lock:
+                    all_segments.add(segment)
+            return segment
+    else:
+        stripes = max(1, min(stripes, max_entries))
+        all_segments = []
+        for index in range(stripes):
+            segment_entries = max_entries // stripes + (index < max_entries % stripes)
+            segment_bytes = max_bytes // stripes + (index < max_bytes % stripes) if max_bytes else None
+            all_segments.append(CacheSegment(policy, segment_entries, segment_bytes, ttl))
+
+        def segment_for(cache_key):
+            return all_segments[hash(cache_key) % stripes]
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        cache_key = key_func(*args, **kwargs)
+        segment = segment_for(cache_key)
+        value = segment.lookup(cache_key)
+        if value is MISSING:
+            value = func(*args, **kwargs)
+            segment.insert(cache_key, value)
+        return value
+
+    def cache_info():
+        with registry_lock:
+            segments = list(all_segments)
+        return CacheInfo(
+            hits=sum(s.hits for s in segments),
+            misses=sum(s.misses for s in segments),
+            evictions=sum(s.evictions for s in segments),
+            expirations=sum(s.expirations for s in segments),
+            entries=sum(len(s.store) for s in segments),
+            bytes=sum(s.bytes for s in segments),
+        )
+
+    def cache_clear():
+        with registry_lock:
+            for segment in all_segments:
+                segment.clear()
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. First Users: fibonacci_memo, factorial and extract_keys
+The recursive helpers from 04_advanced_recursion.py, now with a bounded cache instead of a mutable default.
+extract_keys returns a tuple so callers cannot mutate a cached result.
+"""
+@memoize(max_entries=512)
+def fibonacci_memo(n):
+    if n <= 1:  # base case
+        return n
+    return fibonacci_memo(n - 1) + fibonacci_memo(n - 2)
+
+@memoize(policy="lfu", max_entries=256, max_bytes=1_000_000)
+def factorial(n):
+    if n == 0:  # Base case
+        return 1
+    return n * factorial(n - 1)
+
+@memoize(max_entries=128, ttl=60)
+def extract_keys(data):
+    keys = []
+    for key, value in data.items():
+        keys.append(key)
+        if isinstance(value, dict):  # Recursive Case
+            keys.extend(extract_keys(value))
+    return tuple(keys)
+
+print(fibonacci_memo(50))
+print(fibonacci_memo.cache_info())
+
+print(factorial(20))
+print(factorial(25))  # reuses factorial(20) ... factorial(0)
+print(factorial.cache_info())
+
+nested_data = {
+    "a": 1,
+    "b": {"c": 2, "d": {"e": 3, "f": 4}},
+    "g": 5
+}
+print(extract_keys(nested_data))
+print(extract_keys(nested_data))  # hit
+print(extract_keys.cache_info())
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+6. Eviction and Expiry in Action
+"""
+@memoize(max_entries=3, stripes=1)
+def square(x):
+    return x * x
+
+for value in [1, 2, 3, 1, 4]:  # 4 evicts 2, the least recently used
+    square(value)
+print(square.cache_info())
+
+@memoize(max_entries=10, ttl=0.05, stripes=1)
+def slow_lookup(x):
+    return x * 10
+
+slow_lookup(1)
+time.sleep(0.1)
+slow_lookup(1)  # expired, recomputed
+print(slow_lookup.cache_info())
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+7. Sharing a Cache Between Threads
+"""
+@memoize(max_entries=1_000, stripes=16)
+def shared_feature(x):
+    return sum(i * i for i in range(x))
+
+@memoize(max_entries=1_000, per_thread=True)
+def per_thread_feature(x):
+    return sum(i * i for i in range(x))
+
+for cached in (shared_feature, per_thread_feature):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(cached, [x % 200 for x in range(20_000)]))
+        print(cached.__name__, cached.cache_info())
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why is a mutable default argument a poor cache?
+A: Default values are evaluated once, when the function is defined. The dict is shared by every call, never shrinks,
+and has no locking - so it leaks memory in long-running processes and is unsafe with threads.
+
+Q: What is the difference between LRU and LFU eviction?
+A: LRU evicts the entry that was used least recently; it adapts quickly to changing access patterns.
+LFU evicts the entry used least often; it protects "always popular" entries from one-off scans.
+
+Q: When would you add a TTL to a cache?
+A: When the cached result can become stale, e.g. features derived from data that is refreshed daily.
+
+Q: What is lock striping?
+A: Splitting one shared structure into N segments, each with its own lock. Threads touching different segments
+don't block each other, which reduces contention compared to one global lock.
+
+Q: How does this compare to functools.lru_cache?
+A: lru_cache is faster (implemented in C) and thread-safe, and is the right default for hashable arguments.
+A custom layer is useful when you need LFU/TTL, a byte budget, eviction counters or unhashable arguments.
+"""
@@ -0,0 +1,222 @@
+"""
+Stack-Safe Recursion: Trampolines and Explicit Stacks
+The recursive helpers in 04_advanced_recursion.py (factorial, fibonacci, sum_of_a_list, extract_keys) use Python's
+call stack. CPython limits that stack (sys.getrecursionlimit() is 1000 by default), so:
+ - factorial(1000) or sum_of_a_list of 1000 items raises RecursionError.
+ - sum_of_a_list also copies data[1:] on every call, so summing n items copies ~n²/2 elements: O(n²) time and memory.
+
+Two ways to keep the recursive structure without the recursion limit:
+ > A trampoline engine: each recursive function is written as a generator that *yields* its sub-call instead of
+   calling it. A small loop keeps the pending generators on an explicit list (on the heap), so depth is limited only by
+   memory, and the Python call stack stays constant.
+ > Hand-written explicit stacks / work queues: the fastest option, with the "stack" being a plain list or an index.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import sys
+import time
+
+"""
+1. The Trampoline Engine
+A step function is a generator. `value = yield step(args)` means "call step(args) and give me its result".
+`return value` hands the result back to whichever step is waiting for it.
+"""
+def run_stack_safe(step, *args):
+    stack = [step(*args)]
+    result = None
+    while stack:
+        try:
+            sub_call = stack[-1].send(result)
+        except StopIteration as finished:
+            stack.pop()
+            result = finished.value
+        else:
+            stack.append(sub_call)
+            result = None
+    return result
+
+
+def stack_safe(step):
+    # Turn a generator-based step function into a normal-looking function
+    def wrapper(*args):
+        return run_stack_safe(step, *args)
+    wrapper.__name__ = step.__name__.replace("_steps", "")
+    wrapper.step = step
+    return wrapper
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. The Recursive Helpers as Trampolined Steps
+The code reads almost exactly like the recursive originals - only the recursive call is prefixed with `yield`.
+sum_of_a_list walks an index instead of slicing, which removes the O(n²) copying.
+extract_keys appends into one shared list: extending each parent with its child's list would copy the keys once per
+level of nesting, which is O(n²) for deeply nested data.
+"""
+def factorial_steps(n):
+    if n == 0:  # Base case
+        return 1
+    return n * (yield factorial_steps(n - 1))  # Recursive case
+
+def fibonacci_steps(n):
+    if n <= 1:
+        return n
+    return (yield fibonacci_steps(n - 1)) + (yield fibonacci_steps(n - 2))
+
+def sum_of_a_list_steps(data, index=0):
+    if index == len(data):
+        return 0
+    return data[index] + (yield sum_of_a_list_steps(data, index + 1))
+
+def extract_keys_steps(data, keys=None):
+    if keys is None:
+        keys = []
+    for key, value in data.items():
+        keys.append(key)
+        if isinstance(value, dict):  # Recursive Case
+            yield extract_keys_steps(value, keys)
+    return keys
+
+factorial_trampolined = stack_safe(factorial_steps)
+fibonacci_trampolined = stack_safe(fibonacci_steps)
+sum_of_a_list_trampolined = stack_safe(sum_of_a_list_steps)
+extract_keys_trampolined = stack_safe(extract_keys_steps)
+
+print(factorial_trampolined(3))
+print(fibonacci_trampolined(10))
+print(sum_of_a_list_trampolined([1, 2, 3, 4]))
+print(extract_keys_trampolined({"a": 1, "b": {"c": 2, "d": {"e": 3, "f": 4}}, "g": 5}))
+print(factorial_trampolined(5000).bit_length())  # far deeper than the recursion limit
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Explicit-Stack (Work-Queue) Versions
+When the recursion is simple, the stack can be replaced by a loop variable (factorial, fibonacci, sum) or by a list of
+iterators (extract_keys). These run in linear time with no generator overhead.
+Note: the trampoline keeps fibonacci's exponential call tree (it is the same algorithm); the iterative version is O(n).
+"""
+def factorial_iterative(n):
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result
+
+def fibonacci_iterative(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+def sum_of_a_list_iterative(data):
+    total = 0
+    for item in data:
+        total += item
+    return total
+
+def extract_keys_iterative(data):
+    # A stack of dict iterators - resuming the parent iterator after a child is exhausted keeps depth-first order
+    keys = []
+    stack = [iter(data.items())]
+    while stack:
+        for key, value in stack[-1]:
+            keys.append(key)
+            if isinstance(value, dict):
+                stack.append(iter(value.items()))
+                break
+        else:
+            stack.pop()
+    return keys
+
+print(extract_keys_iterative({"a": 1, "b": {"c": 2, "d": {"e": 3, "f": 4}}, "g": 5}))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Benchmark: Recursive vs Trampolined vs Iterative
+The originals are copied here unchanged so the comparison is like-for-like.
+Recursive versions that exceed the recursion limit are reported as RecursionError.
+"""
+def factorial(n):
+    if n == 0:
+        return 1
+    return n * factorial(n - 1)
+
+def fibonacci(n):
+    if n <= 1:
+        return n
+    return fibonacci(n - 1) + fibonacci(n - 2)
+
+def sum_of_a_list(data):
+    if len(data) == 0:
+        return 0
+    return data[0] + sum_of_a_list(data[1:])
+
+def extract_keys(data):
+    keys = []
+    for key, value in data.items():
+        keys.append(key)
+        if isinstance(value, dict):
+            keys.extend(extract_keys(value))
+    return keys
+
+
+def make_nested(depth):
+    # {"k0": {"k1": {... "k<depth-1>": 0}}} built bottom-up, so building it needs no recursion either
+    data = 0
+    for level in reversed(range(depth)):
+        data = {f"k{level}": data, f"v{level}": level}
+    return data
+
+
+def time_call(func, argument):
+    start = time.perf_counter()
+    try:
+        func(argument)
+    except RecursionError:
+        return "RecursionError"
+    return f"{time.perf_counter() - start:.4f}s"
+
+
+CASES = {
+    "factorial": (lambda n: n, factorial, factorial_trampolined, factorial_iterative),
+    "sum_of_a_list": (lambda n: list(range(n)), sum_of_a_list, sum_of_a_list_trampolined, sum_of_a_list_iterative),
+    "extract_keys": (make_nested, extract_keys, extract_keys_trampolined, extract_keys_iterative),
+}
+
+
+def benchmark(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6), cases=tuple(CASES) + ("fibonacci",)):
+    print(f"{'function':<15}{'n':>10}{'recursive':>17}{'trampolined':>15}{'iterative':>12}")
+    for name in cases:
+        if name not in CASES:
+            continue
+        make_input, recursive, trampolined, iterative = CASES[name]
+        for n in sizes:
+            argument = make_input(n)
+            print(f"{name:<15}{n:>10}{time_call(recursive, argument):>17}"
+                  f"{time_call(trampolined, argument):>15}{time_call(iterative, argument):>12}")
+
+    # fibonacci is limited by its exponential call tree, not its depth
+    for n in ((20, 25) if "fibonacci" in cases else ()):
+        print(f"{'fibonacci':<15}{n:>10}{time_call(fibonacci, n):>17}"
+              f"{time_call(fibonacci_trampolined, n):>15}{time_call(fibonacci_iterative, n):>12}")
+
+
+print("recursion limit:", sys.getrecursionlimit())
+# Sizes are kept small so the script runs quickly - call benchmark() with the defaults for the full 10^3..10^6 sweep.
+# (factorial of 10^6 is a ~5.5 million digit number, so expect that row to take a while.)
+benchmark(sizes=(10 ** 3, 10 ** 4), cases=("factorial", "fibonacci"))
+benchmark(sizes=(10 ** 3, 10 ** 4, 10 ** 5), cases=("sum_of_a_list", "extract_keys"))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why does Python raise RecursionError for deep recursion?
+A: Each call uses a frame on the interpreter's call stack. CPython caps the depth (default 1000) to avoid crashing
+the process with a C stack overflow. Python does not perform tail-call optimisation.
+
+Q: How can you convert a recursive function into an iterative one?
+A: Replace the implicit call stack with an explicit one: a list of pending work (or iterators), processed in a loop.
+For simple linear recursion (factorial, sum), an accumulator variable is enough.
+
+Q: What is a trampoline?
+A: A loop that repeatedly runs "the next step" of a computation. The recursive function returns (or yields) a
+description of the next call instead of making it, so the stack never grows.
+
+Q: Why is sum_of_a_list(data[1:]) O(n²)?
+A: Every slice copies the remaining list: (n-1) + (n-2) + ... + 1 copies in total. Passing an index avoids it.
+
+Q: Can you just raise the recursion limit with sys.setrecursionlimit?
+A: Only a little. Past a point the C stack overflows and the interpreter crashes instead of raising an exception.
+"""
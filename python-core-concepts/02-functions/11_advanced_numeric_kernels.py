@@ -0,0 +1,194 @@
+"""
+Fast Fibonacci and Factorial Kernels
+04_advanced_recursion.py computes Fibonacci and factorial the textbook way:
+ - fibonacci(n) is exponential - fibonacci(40) makes over 300 million calls.
+ - fibonacci_memo(n) is O(n) additions and keeps one dict entry per n.
+ - factorial/factorial_iterative multiply 1 * 2 * 3 * ... * n sequentially. Once the running product is huge,
+   every step multiplies a giant number by a tiny one, which wastes the fast big-number multiplication Python has.
+
+Better algorithms:
+ > Fast doubling Fibonacci: O(log n) steps using F(2k) = F(k) * (2F(k+1) - F(k)) and F(2k+1) = F(k)² + F(k+1)².
+ > Binary splitting factorial: multiply the numbers in a balanced tree, so both sides of each multiplication are of
+   similar size (that is where Karatsuba multiplication pays off).
+ > Batched evaluation: when a job needs F(n) or n! for many n, share work between them instead of starting over.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import math
+import time
+
+"""
+1. Fast Doubling Fibonacci
+Walk the bits of n from the most significant one. Each bit doubles k (and adds one if the bit is set).
+An optional modulus keeps the numbers small, which is common when Fibonacci values are used as hash-like features.
+"""
+def fibonacci_fast(n, mod=None):
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    a, b = 0, 1  # F(k), F(k+1) with k = 0
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)  # F(2k)
+        d = a * a + b * b  # F(2k+1)
+        if mod is not None:
+            c, d = c % mod, d % mod
+        if bit == "1":
+            a, b = d, c + d  # k -> 2k + 1
+        else:
+            a, b = c, d  # k -> 2k
+        if mod is not None:
+            b %= mod
+    return a
+
+print(fibonacci_fast(10))
+print(fibonacci_fast(100))
+print(fibonacci_fast(10 ** 18, mod=1_000_000_007))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Binary Splitting Factorial
+product_range(low, high) multiplies low * (low + 1) * ... * (high - 1) by splitting the range in half.
+The recursion depth is only log2(n), so there is no risk of RecursionError.
+"""
+def product_range(low, high):
+    if high - low <= 8:  # small ranges: a plain loop is faster than more splitting
+        result = 1
+        for i in range(low, high):
+            result *= i
+        return result
+    middle = (low + high) // 2
+    return product_range(low, middle) * product_range(middle, high)
+
+def factorial_fast(n):
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    return product_range(2, n + 1)
+
+print(factorial_fast(5))
+print(factorial_fast(1000) == math.factorial(1000))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Batched Evaluation
+ - fibonacci_many: if the requested n values are dense (many values up to a small maximum), one linear sweep produces
+   all of them. If they are sparse (a few very large n), fast doubling each one is cheaper.
+ - factorial_many: sort the distinct n values and extend the previous factorial by the product of the gap
+   (n_i! = n_(i-1)! * product of (n_(i-1), n_i]), so no multiplication is done twice.
+Results come back in the same order as the input, duplicates included.
+"""
+def fibonacci_many(ns, mod=None):
+    ns = list(ns)
+    if not ns:
+        return []
+    distinct = sorted(set(ns))
+    if distinct[0] < 0:  # checked up front, like fibonacci_fast, rather than failing inside the sweep
+        raise ValueError("n must be non-negative")
+    largest = distinct[-1]
+    results = {}
+    if len(distinct) * max(1, largest.bit_length()) >= largest:  # dense: one sweep is cheaper
+        wanted = iter(distinct)
+        target = next(wanted)
+        a, b = 0, 1
+        for k in range(largest + 1):
+            if k == target:
+                results[k] = a
+                target = next(wanted, None)
+            a, b = b, a + b
+            if mod is not None:
+                a, b = a % mod, b % mod
+    else:
+        for n in distinct:
+            results[n] = fibonacci_fast(n, mod)
+    return [results[n] for n in ns]
+
+def factorial_many(ns):
+    ns = list(ns)
+    results = {}
+    previous_n, previous_value = 1, 1
+    for n in sorted(set(ns)):
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n <= 1:
+            results[n] = 1
+            continue
+        previous_value *= product_range(previous_n + 1, n + 1)
+        previous_n = n
+        results[n] = previous_value
+    return [results[n] for n in ns]
+
+print(fibonacci_many([10, 1, 5, 10]))
+print(factorial_many([5, 0, 3, 5]))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Benchmark Against the Existing Functions
+The originals from 04_advanced_recursion.py (and the iterative factorial from its Q&A) are copied here unchanged.
+math.factorial (implemented in C, also divide-and-conquer) is included as a reference point.
+"""
+def fibonacci(n):
+    if n <= 1:
+        return n
+    return fibonacci(n - 1) + fibonacci(n - 2)
+
+def fibonacci_memo(n, memo={}):
+    if n in memo:
+        return memo[n]
+    if n <= 1:
+        return n
+    memo[n] = fibonacci_memo(n - 1, memo) + fibonacci_memo(n - 2, memo)
+    return memo[n]
+
+def factorial_iterative(n):
+    result = 1
+    for i in range(1, n + 1):
+        result *= i
+    return result
+
+
+def best_of(func, *args, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def report(label, baseline_seconds, fast_seconds):
+    print(f"{label:<45}{baseline_seconds:>11.5f}s{fast_seconds:>11.5f}s{baseline_seconds / fast_seconds:>10.1f}x")
+
+
+def benchmark(fib_n=25, memo_n=900, factorial_n=20_000, batch_size=2_000):
+    print(f"{'case':<45}{'baseline':>12}{'fast':>12}{'speedup':>11}")
+    report(f"fibonacci({fib_n}) vs fibonacci_fast",
+           best_of(fibonacci, fib_n, repeat=1), best_of(fibonacci_fast, fib_n))
+
+    def fresh_memo(n):  # a fresh dict each time, otherwise every repeat after the first is a cache hit
+        return fibonacci_memo(n, {})
+    report(f"fibonacci_memo({memo_n}) vs fibonacci_fast",
+           best_of(fresh_memo, memo_n), best_of(fibonacci_fast, memo_n))
+
+    report(f"factorial_iterative({factorial_n}) vs factorial_fast",
+           best_of(factorial_iterative, factorial_n), best_of(factorial_fast, factorial_n))
+    report(f"factorial_iterative({factorial_n}) vs math.factorial",
+           best_of(factorial_iterative, factorial_n), best_of(math.factorial, factorial_n))
+
+    memo_ns = list(range(memo_n))
+    report(f"{memo_n} x fibonacci_memo (fresh) vs fibonacci_many",
+           best_of(lambda: [fresh_memo(n) for n in memo_ns], repeat=1), best_of(fibonacci_many, memo_ns))
+    small_ns = list(range(0, batch_size, 2))
+    report(f"{len(small_ns)} x factorial_iterative vs factorial_many",
+           best_of(lambda: [factorial_iterative(n) for n in small_ns], repeat=1),
+           best_of(factorial_many, small_ns))
+
+# fibonacci_memo is itself recursive, so memo_n must stay below the recursion limit (see 10_advanced_iterative_recursion.py)
+benchmark()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: How can Fibonacci be computed in O(log n)?
+A: Using fast doubling (or 2x2 matrix exponentiation): F(2k) and F(2k+1) can be derived from F(k) and F(k+1),
+so n is processed one bit at a time.
+
+Q: Why is binary splitting faster than a simple loop for large factorials?
+A: Multiplying a huge number by a small one repeatedly does O(n) big-number operations on ever-growing values.
+A balanced product tree multiplies numbers of similar size, where algorithms like Karatsuba are much more efficient.
+
+Q: What would you use in production?
+A: math.factorial for factorials (C implementation), and fast doubling (optionally modulo m) for Fibonacci.
+For many inputs, batch them so shared work (sweeps, prefix products) is done once.
+"""
@@ -0,0 +1,175 @@
+"""
+Parallel, Sharded File Processing
+The read_large_file generator (06_advanced_generators.py) keeps memory flat, but everything downstream of it runs on
+one core. CPU-heavy preprocessing such as clean_data then becomes the bottleneck.
+
+A parallel pipeline stage:
+ > Splits the file into newline-aligned byte ranges (chunks), so no line is cut in half.
+ > Sends each range - just (path, start, end), not the data - to a ProcessPoolExecutor worker, which reads its own
+   bytes, splits them into lines and applies a user function such as clean_data.
+ > Merges results either in the original file order (ordered=True) or as soon as any chunk finishes (ordered=False).
+ > Applies backpressure: at most max_in_flight chunks are queued or being processed, and results are yielded to the
+   caller lazily, so the driver never holds more than N chunks in memory.
+
+Note: process pools start new interpreters on Windows/macOS ("spawn"), which re-import this script. That is why the
+demo lives under `if __name__ == "__main__":` and the worker functions are defined at module level (so they pickle).
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+"""
+1. Newline-Aligned Chunks
+Ranges are produced lazily: the driver only looks ahead as far as it needs to submit the next chunk.
+Each chunk ends right after a newline (or at the end of the file).
+"""
+def newline_aligned_ranges(file_path, chunk_size=8 * 1024 * 1024):
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as file:
+        start = 0
+        while start < size:
+            end = start + chunk_size
+            if end < size:
+                file.seek(end)
+                file.readline()  # move to the end of the line that crosses the boundary
+                end = file.tell()
+            end = min(end, size)
+            yield start, end
+            start = end
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Worker Side
+The worker receives only the byte range, reads it itself and calls func(lines).
+Lines are split on "\n" only - the same boundary newline_aligned_ranges cuts on - with a trailing "\r" removed.
+str.splitlines() would also split on "\x0b", "\x0c", "\x85", "\u2028" and others, so the lines would depend on how
+the file happened to be chunked.
+func must be a module-level function so it can be pickled and sent to the worker processes.
+"""
+def process_range(file_path, start, end, func, encoding="utf-8"):
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        lines = file.read(end - start).decode(encoding).split("\n")
+    if lines[-1] == "":
+        lines.pop()  # the chunk ends with a newline, so the last split is empty
+    return func([line[:-1] if line.endswith("\r") else line for line in lines])
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Driver Side: Bounded Submission and Ordered/Unordered Merging
+ - ordered=True: futures are kept in a FIFO queue and results are yielded in file order. A slow chunk holds back the
+   ones behind it (head-of-line blocking), but the output matches a serial run.
+ - ordered=False: results are yielded as soon as any chunk completes - best throughput when order doesn't matter.
+In both modes a new chunk is only submitted after a result has been handed to the caller and the caller has asked
+for the next one, so at most max_in_flight chunks are ever queued, running or waiting to be consumed.
+"""
+def process_file_parallel(file_path, func, chunk_size=8 * 1024 * 1024, workers=None, ordered=True,
+                          max_in_flight=None, encoding="utf-8"):
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers  # enough to keep every worker busy, small enough to bound memory
+    ranges = newline_aligned_ranges(file_path, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit_next():
+            chunk = next(ranges, None)
+            if chunk is None:
+                return None
+            return pool.submit(process_range, file_path, chunk[0], chunk[1], func, encoding)
+
+        if ordered:
+            pending = deque()
+            while len(pending) < max_in_flight and (future := submit_next()) is not None:
+                pending.append(future)
+            while pending:
+                yield pending.popleft().result()
+                if (future := submit_next()) is not None:
+                    pending.append(future)
+        else:
+            pending = set()
+            while len(pending) < max_in_flight and (future := submit_next()) is not None:
+                pending.add(future)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    if (next_future := submit_next()) is not None:
+                        pending.add(next_future)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Pipeline Functions
+clean_data is the preprocessing step from 03_advanced_decorators.py. clean_and_count shows a reducing step:
+returning a small summary instead of every line keeps the data sent back from the workers small.
+"""
+def clean_data(data):
+    return [item.strip() for item in data]
+
+def clean_and_count(data):
+    counts = {}
+    for item in data:
+        fields = item.split()  # split() with no argument also strips the surrounding whitespace
+        level = fields[1] if len(fields) > 1 else ""
+        counts[level] = counts.get(level, 0) + 1
+    return counts
+
+def read_large_file(file_path):  # the original, from 06_advanced_generators.py
+    with open(file_path, 'r') as file:
+        for line in file:
+            yield line.strip()
+
+
+def make_sample_file(line_count):
+    handle, path = tempfile.mkstemp(suffix=".log")
+    levels = ["INFO", "WARN", "ERROR", "DEBUG"]
+    with os.fdopen(handle, "w") as file:
+        for i in range(line_count):
+            file.write(f"  2024-01-01T00:00:{i % 60:02d} {levels[i % 4]} worker={i % 8} latency_ms={i % 97}  \n")
+    return path
+
+
+def merge_counts(partials):
+    total = {}
+    for partial in partials:
+        for key, value in partial.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+if __name__ == "__main__":
+    path = make_sample_file(400_000)
+    try:
+        # Ordered: the cleaned lines come back exactly as a serial run would produce them
+        serial = list(read_large_file(path))
+        parallel = [line for chunk in process_file_parallel(path, clean_data, chunk_size=1 << 20) for line in chunk]
+        print("ordered output matches serial:", parallel == serial)
+
+        start = time.perf_counter()
+        serial_counts = clean_and_count(read_large_file(path))
+        serial_seconds = time.perf_counter() - start
+
+        for workers in (1, 2, 4):
+            start = time.perf_counter()
+            counts = merge_counts(process_file_parallel(path, clean_and_count, chunk_size=1 << 20,
+                                                        workers=workers, ordered=False, max_in_flight=2 * workers))
+            seconds = time.perf_counter() - start
+            print(f"workers={workers}: {seconds:.2f}s vs serial {serial_seconds:.2f}s, "
+                  f"same result: {counts == serial_counts}")
+    finally:
+        os.remove(path)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why split a file by byte ranges instead of sending lines to the workers?
+A: Sending lines means the driver reads, pickles and transmits all the data - it becomes the bottleneck.
+Sending (path, start, end) lets every worker read its own part of the file in parallel.
+
+Q: What is backpressure?
+A: Limiting how much work a producer can push ahead of its consumers. Here the driver only submits a new chunk after
+one is handed back, so memory stays bounded even if the caller is slow to consume results.
+
+Q: When should results be merged in order versus unordered?
+A: Keep order when the output must match the input (e.g., writing a cleaned file). Go unordered when results are
+aggregated (counts, sums) - it avoids waiting on a single slow chunk.
+
+Q: Why processes instead of threads here?
+A: Pure-Python CPU work holds the GIL, so threads would run one at a time. Processes run truly in parallel.
+"""
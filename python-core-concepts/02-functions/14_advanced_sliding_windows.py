@@ -0,0 +1,305 @@
+"""
+Streaming Sliding-Window Aggregations
+The sliding_window_average answer in 06_advanced_generators.py re-sums data[i:i + window_size] at every position:
+ - O(n * w) work, plus a new slice (a list copy) on every step.
+ - It needs len(data), so it only works on a fully materialised list - not on a generator or a live stream.
+
+Each aggregate can instead be updated in amortised O(1) per element, from any iterator:
+ > Sum / mean: add the value entering the window, subtract the one leaving it.
+ > Min / max: a monotonic deque keeps only the values that can still become the minimum (or maximum).
+ > Variance: Welford's algorithm, extended to also *remove* the value leaving the window.
+ > Windows can be count-based (the last w values) or time-based (values from the last t seconds).
+ > For NumPy arrays, cumulative sums give every window's mean/variance in a few vectorised passes.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import math
+import time
+from collections import deque
+from itertools import islice
+
+try:
+    import numpy as np  # optional: vectorised path for array input
+except ImportError:
+    np = None
+
+"""
+1. Monotonic Deque for Sliding Min/Max
+For a sliding max we keep values in decreasing order. A new value removes every smaller value from the back - those
+can never be the max again, because the new value is both larger and will stay in the window longer.
+Each value is pushed and popped at most once, so the cost is amortised O(1).
+"""
+class MonotonicDeque:
+    def __init__(self, keep_max=True):
+        self.keep_max = keep_max
+        self.items = deque()  # (position, value)
+
+    def push(self, position, value):
+        items = self.items
+        if self.keep_max:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((position, value))
+
+    def expire(self, oldest_position):
+        while self.items and self.items[0][0] < oldest_position:
+            self.items.popleft()
+
+    def best(self):
+        return self.items[0][1] if self.items else None
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. One Aggregator for Count-Based and Time-Based Windows
+push() adds a value and evicts whatever has fallen out of the window:
+ - size=w: keep the last w values.
+ - duration=t: keep values whose timestamp is within t seconds of the newest one.
+Every statistic is then available in O(1): count, sum, mean, min, max, variance, std.
+Note: with floats, a running sum that adds and subtracts for a very long time can drift slightly; call
+rebuild() periodically if exactness over billions of updates matters. Integer sums are exact.
+"""
+class WindowAggregator:
+    def __init__(self, size=None, duration=None):
+        if (size is None) == (duration is None):
+            raise ValueError("Provide exactly one of size (count-based) or duration (time-based)")
+        if (size is not None and size <= 0) or (duration is not None and duration <= 0):
+            raise ValueError("Window size/duration must be positive")
+        self.size = size
+        self.duration = duration
+        self.window = deque()  # (position, timestamp, value)
+        self.position = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Welford: sum of squared differences from the mean
+        self.max_deque = MonotonicDeque(keep_max=True)
+        self.min_deque = MonotonicDeque(keep_max=False)
+
+    def push(self, value, timestamp=None):
+        if self.duration is not None and timestamp is None:
+            timestamp = time.monotonic()
+        self.window.append((self.position, timestamp, value))
+        self.max_deque.push(self.position, value)
+        self.min_deque.push(self.position, value)
+        self._add(value)
+        self.position += 1
+
+        # Evict from the front until the window satisfies its size or duration
+        window = self.window
+        if self.size is not None:
+            while len(window) > self.size:
+                self._remove(window.popleft()[2])
+        else:
+            while window and window[0][1] <= timestamp - self.duration:
+                self._remove(window.popleft()[2])
+        oldest = window[0][0]
+        self.max_deque.expire(oldest)
+        self.min_deque.expire(oldest)
+
+    def _add(self, value):
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / len(self.window)
+        self.m2 += delta * (value - self.mean)
+
+    def _remove(self, value):
+        self.total -= value
+        count = len(self.window)  # already excludes the removed value
+        if count == 0:
+            self.mean = self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / count
+        self.m2 = max(0.0, self.m2 - delta * (value - self.mean))
+
+    def rebuild(self):
+        # Recompute sum/mean/m2 exactly from the values currently in the window
+        values = [item[2] for item in self.window]
+        self.total = math.fsum(values) if any(isinstance(v, float) for v in values) else sum(values)
+        self.mean = self.total / len(values) if values else 0.0
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in values)
+
+    @property
+    def count(self):
+        return len(self.window)
+
+    @property
+    def is_full(self):
+        return self.size is not None and len(self.window) == self.size
+
+    @property
+    def min(self):
+        return self.min_deque.best()
+
+    @property
+    def max(self):
+        return self.max_deque.best()
+
+    @property
+    def variance(self):  # sample variance, like statistics.variance
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Generator Interface (Works on Any Iterator)
+WindowAggregator is convenient when several statistics or a time-based window are needed at once. For a single
+statistic over a count-based window, a dedicated loop that keeps only what that statistic needs is several times
+faster. These generators yield once per full window, like the original sliding_window_average.
+time_window_stats yields a snapshot for every element of a (timestamp, value) stream.
+"""
+def sliding_sum(data, window_size):
+    iterator = iter(data)
+    window = deque(islice(iterator, window_size))
+    if len(window) < window_size:
+        return
+    total = sum(window)
+    yield total
+    for value in iterator:
+        total += value - window.popleft()
+        window.append(value)
+        yield total
+
+def sliding_mean(data, window_size):
+    if np is not None and isinstance(data, np.ndarray):
+        return sliding_mean_array(data, window_size)
+    return (total / window_size for total in sliding_sum(data, window_size))
+
+def _sliding_extreme(data, window_size, keep_max):
+    candidates = MonotonicDeque(keep_max)
+    for position, value in enumerate(data):
+        candidates.push(position, value)
+        if position >= window_size - 1:
+            candidates.expire(position - window_size + 1)
+            yield candidates.best()
+
+def sliding_min(data, window_size):
+    return _sliding_extreme(data, window_size, keep_max=False)
+
+def sliding_max(data, window_size):
+    return _sliding_extreme(data, window_size, keep_max=True)
+
+def sliding_variance(data, window_size):
+    # Sample variance (n - 1). A window of one value has no spread: both paths return 0.0 for it rather than 0 / 0
+    if window_size < 1:
+        raise ValueError("window_size must be positive")
+    if np is not None and isinstance(data, np.ndarray):
+        return sliding_variance_array(data, window_size)
+    return _sliding_variance(data, window_size)
+
+def _sliding_variance(data, window_size):
+    window = deque()
+    mean = m2 = 0.0
+    for value in data:
+        window.append(value)  # Welford: add the new value
+        delta = value - mean
+        mean += delta / len(window)
+        m2 += delta * (value - mean)
+        if len(window) > window_size:  # Welford in reverse: remove the value leaving the window
+            old = window.popleft()
+            delta = old - mean
+            mean -= delta / window_size
+            m2 = max(0.0, m2 - delta * (old - mean))
+        if len(window) == window_size:
+            yield m2 / (window_size - 1) if window_size > 1 else 0.0
+
+def time_window_stats(timestamped_values, duration):
+    aggregator = WindowAggregator(duration=duration)
+    for timestamp, value in timestamped_values:
+        aggregator.push(value, timestamp)
+        yield {"timestamp": timestamp, "count": aggregator.count, "mean": aggregator.mean,
+               "min": aggregator.min, "max": aggregator.max}
+
+
+data = [1, 2, 3, 4, 5]
+print(list(sliding_mean(data, 3)))  # Output: [2.0, 3.0, 4.0]
+print(list(sliding_min(iter([5, 1, 4, 2, 8, 3]), 3)))  # works on a plain iterator
+print(list(sliding_max([5, 1, 4, 2, 8, 3], 3)))
+print(list(sliding_variance([2, 4, 4, 4, 5, 5, 7, 9], 4)))
+
+events = [(0.0, 10), (0.5, 20), (1.2, 30), (2.6, 40), (3.0, 50)]
+for snapshot in time_window_stats(events, duration=1.5):
+    print(snapshot)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Vectorised Path for NumPy Arrays
+With cumulative sums c, the sum of window i is c[i + w] - c[i] - one subtraction per window, done for all windows at
+once. Variance uses cumulative sums of squares after subtracting the overall mean (which keeps the numbers small and
+avoids most of the cancellation error of E[x²] - E[x]²).
+Min/max use sliding_window_view; that is O(n * w) work but runs in C, which is fast for moderate window sizes.
+"""
+def sliding_mean_array(values, window_size):
+    values = np.asarray(values, dtype=float)
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    return (cumulative[window_size:] - cumulative[:-window_size]) / window_size
+
+def sliding_variance_array(values, window_size):
+    values = np.asarray(values, dtype=float)
+    if window_size == 1:
+        return np.zeros(len(values))
+    shifted = values - values.mean()
+    sums = np.concatenate(([0.0], np.cumsum(shifted)))
+    squares = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+    window_sums = sums[window_size:] - sums[:-window_size]
+    window_squares = squares[window_size:] - squares[:-window_size]
+    m2 = window_squares - window_sums * window_sums / window_size
+    return np.maximum(m2, 0.0) / (window_size - 1)
+
+def sliding_extreme_array(values, window_size, keep_max=True):
+    windows = np.lib.stride_tricks.sliding_window_view(np.asarray(values), window_size)
+    return windows.max(axis=1) if keep_max else windows.min(axis=1)
+
+if np is not None:
+    array_data = np.arange(10, dtype=float)
+    print(sliding_mean(array_data, 3))
+    print(sliding_extreme_array(array_data, 3))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. Benchmark Against the Original
+"""
+def sliding_window_average(data, window_size):  # the original, from 06_advanced_generators.py
+    for i in range(len(data) - window_size + 1):
+        yield sum(data[i:i + window_size]) / window_size
+
+
+def benchmark(n=200_000, window_sizes=(10, 100, 1000)):
+    data = [float(i % 1000) for i in range(n)]
+    for window_size in window_sizes:
+        start = time.perf_counter()
+        original = list(sliding_window_average(data, window_size))
+        original_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        streaming = list(sliding_mean(iter(data), window_size))
+        streaming_seconds = time.perf_counter() - start
+
+        same = all(math.isclose(a, b, abs_tol=1e-6) for a, b in zip(original, streaming))
+        line = (f"w={window_size:<5} original {original_seconds:.3f}s, streaming {streaming_seconds:.3f}s "
+                f"({original_seconds / streaming_seconds:.1f}x), same result: {same}")
+        if np is not None:
+            array_data = np.asarray(data)
+            start = time.perf_counter()
+            sliding_mean(array_data, window_size)
+            line += f", numpy {time.perf_counter() - start:.4f}s"
+        print(line)
+
+benchmark()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: How do you compute a moving average in O(1) per element?
+A: Keep a running sum. When the window slides, add the new value and subtract the value that left the window.
+
+Q: How do you compute a sliding maximum efficiently?
+A: With a monotonic deque that stores candidates in decreasing order. The front is the current max; values that can
+never become the max again are popped from the back. Each element enters and leaves once: amortised O(1).
+
+Q: What is Welford's algorithm?
+A: A numerically stable, single-pass way to update the mean and variance one value at a time. It avoids the
+catastrophic cancellation of computing E[x²] - E[x]² with large numbers.
+
+Q: What is the difference between count-based and time-based windows?
+A: A count-based window holds the last N events; a time-based window holds events from the last T seconds, so its size
+varies with the event rate - typical for monitoring and streaming metrics.
+"""
@@ -0,0 +1,231 @@
+"""
+Prefix Scans: Streaming, Vectorised and Parallel
+cumulative_sum in 06_advanced_generators.py yields one running total at a time. That is perfect for unbounded streams,
+but for tens of millions of rows the per-item Python loop is the bottleneck.
+
+A "scan" (prefix scan) generalises cumulative_sum to any associative binary operation:
+    scan([a, b, c], op) -> [a, op(a, b), op(op(a, b), c)]
+Running sum, running product, running max (e.g. "highest price so far") and running min are all scans.
+
+This script offers three execution modes:
+ > Streaming: a generator for unbounded input (itertools.accumulate does the loop in C).
+ > Chunked NumPy: ufunc.accumulate over fixed-size chunks, carrying the last value into the next chunk. Memory for
+   temporaries stays bounded and the output can be written into a pre-allocated (or memory-mapped) array.
+ > Parallel two-pass block scan: split the array into blocks, (1) reduce each block in parallel, (2) scan the block
+   totals to get each block's starting offset, (3) scan every block in parallel, seeded with its offset.
+   Blocks live in shared memory, so processes don't pickle the data back and forth.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import operator
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import accumulate, islice
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np  # optional: vectorised chunked scans
+except ImportError:
+    np = None
+
+"""
+1. Named Operations
+Each named op maps to a plain Python function (for streaming and parallel mode) and a NumPy ufunc (for chunked mode).
+Any other associative, picklable two-argument function can be passed directly.
+"""
+OPERATIONS = {
+    "sum": (operator.add, "add"),
+    "product": (operator.mul, "multiply"),
+    "max": (max, "maximum"),
+    "min": (min, "minimum"),
+}
+
+
+def resolve(op):
+    if callable(op):
+        return op, None
+    if op not in OPERATIONS:
+        raise ValueError(f"op must be callable or one of {tuple(OPERATIONS)}")
+    function, ufunc_name = OPERATIONS[op]
+    return function, (getattr(np, ufunc_name) if np is not None else None)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Streaming Scan (Unbounded Input)
+"""
+def scan(data, op="sum", initial=None):
+    function, _ = resolve(op)
+    scanned = accumulate(data, function, initial=initial)
+    return islice(scanned, 1, None) if initial is not None else scanned  # don't emit the seed itself
+
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Chunked NumPy Scan
+The carry (last output of the previous chunk) is combined with the chunk's own scan - valid because op is associative:
+    scan(chunk2, seeded with carry) == op(carry, scan(chunk2))
+Custom Python functions can't be vectorised, so they fall back to the streaming scan.
+"""
+def chunked_scan(values, op="sum", chunk_size=1 << 20, out=None):
+    _, ufunc = resolve(op)
+    if np is None or ufunc is None:
+        return list(scan(values, op))
+    values = np.asarray(values)
+    if out is None:
+        out = np.empty_like(values)
+    carry = None
+    for start in range(0, len(values), chunk_size):
+        chunk_out = out[start:start + chunk_size]
+        ufunc.accumulate(values[start:start + chunk_size], out=chunk_out)
+        if carry is not None:
+            ufunc(carry, chunk_out, out=chunk_out)
+        carry = chunk_out[-1]
+    return out
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Parallel Two-Pass Block Scan
+Workers attach to the shared-memory block by name and work on their [start, end) slice in place. With NumPy and a
+named op, the slice is an np.frombuffer view and each pass is one ufunc.reduce / ufunc.accumulate call in C. Otherwise
+the block is viewed as a typed memoryview (array module typecodes: "d" float64, "q" int64, "Q" uint64) and scanned
+with itertools.accumulate.
+"""
+def typecode_for(dtype):
+    # dtype.char is not portable ("l" is int64 on Linux, "q" on Windows), so map by kind: signed and unsigned integers
+    # widen to 64 bits, everything else becomes float64
+    return {"b": "q", "i": "q", "u": "Q"}.get(dtype.kind, "d")
+
+
+def _block_reduce(name, typecode, start, end, op):
+    function, ufunc = resolve(op)
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        if ufunc is not None:
+            segment = np.frombuffer(block.buf, dtype=typecode)[start:end]
+            total = ufunc.reduce(segment).item()
+            del segment  # views must be released before the block can be closed
+            return total
+        view = block.buf.cast(typecode)
+        try:
+            return reduce(function, view[start:end])
+        finally:
+            view.release()
+    finally:
+        block.close()
+
+
+def _block_scan(name, typecode, start, end, op, offset):
+    _, ufunc = resolve(op)
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        if ufunc is not None:
+            segment = np.frombuffer(block.buf, dtype=typecode)[start:end]
+            ufunc.accumulate(segment, out=segment)
+            if offset is not None:
+                ufunc(offset, segment, out=segment)
+            del segment
+            return
+        view = block.buf.cast(typecode)
+        try:
+            view[start:end] = array(typecode, scan(view[start:end], op, initial=offset))
+        finally:
+            view.release()
+    finally:
+        block.close()
+
+
+def parallel_scan(values, op="sum", workers=None, typecode="d"):
+    workers = workers or os.cpu_count() or 1
+    resolve(op)  # validate before starting any processes
+    if np is not None and isinstance(values, np.ndarray):
+        typecode = typecode_for(values.dtype)
+        source = np.ascontiguousarray(values.ravel(), dtype=typecode)
+    else:
+        source = array(typecode, values)
+    count = len(source)
+    if count == 0:
+        return source
+
+    block = shared_memory.SharedMemory(create=True, size=count * source.itemsize)
+    view = block.buf.cast(typecode)
+    try:
+        view[:] = memoryview(source).cast("B").cast(typecode)
+        del source
+        step = -(-count // workers)  # ceil division
+        bounds = [(start, min(start + step, count)) for start in range(0, count, step)]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Pass 1: every block's total, in parallel
+            totals = list(pool.map(_block_reduce, *zip(*[(block.name, typecode, s, e, op) for s, e in bounds])))
+            # Between passes: each block starts from the scan of all the totals before it (only `workers` values)
+            offsets = [None] + list(scan(totals[:-1], op))
+            # Pass 2: scan every block, seeded with its offset, in parallel
+            list(pool.map(_block_scan, *zip(*[(block.name, typecode, s, e, op, offset)
+                                              for (s, e), offset in zip(bounds, offsets)])))
+
+        if np is not None:
+            return np.frombuffer(view, dtype=typecode).copy()
+        return array(typecode, view)
+    finally:
+        view.release()
+        block.close()
+        block.unlink()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. Benchmark Against cumulative_sum
+"""
+def cumulative_sum(data: list):  # the original, from 06_advanced_generators.py
+    total = 0
+    for item in data:
+        total += item
+        yield total
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"{label:<36}{time.perf_counter() - start:>8.3f}s")
+    return result
+
+
+if __name__ == "__main__":
+    print(list(scan([1, 2, 3, 4, 5])))
+    print(list(scan([3, 1, 4, 1, 5, 9, 2], op="max")))
+    print(list(scan([1, 2, 3, 4], op="product")))
+    print(list(scan(["a", "b", "c"], op=lambda left, right: left + right)))
+    if np is not None:
+        print(chunked_scan(np.arange(1, 11), chunk_size=3).tolist())
+        print(parallel_scan(np.array([2 ** 60, 1, 1]), workers=2).tolist())  # int64 stays exact
+
+    print(parallel_scan([1, 2, 3, 4, 5, 6, 7], workers=3, typecode="q").tolist())
+    print(parallel_scan([3, 1, 4, 1, 5, 9, 2, 6], op="max", workers=3, typecode="q").tolist())
+
+    n = 5_000_000
+    data = list(range(n))
+    expected = timed("cumulative_sum (original)", lambda: list(cumulative_sum(data)))
+    streaming = timed("scan (itertools.accumulate)", lambda: list(scan(data)))
+    parallel = timed("parallel_scan, 4 workers", parallel_scan, data, workers=4, typecode="q")
+    if np is not None:
+        array_data = np.arange(n, dtype=np.int64)
+        chunked = timed("chunked_scan (NumPy)", chunked_scan, array_data)
+        parallel_numpy = timed("parallel_scan (NumPy), 4 workers", parallel_scan, array_data, workers=4)
+        print("chunked matches:", chunked.tolist() == expected,
+              "| parallel (NumPy) matches:", parallel_numpy.tolist() == expected)
+    print("streaming matches:", streaming == expected, "| parallel matches:", parallel.tolist() == expected)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What is a prefix scan?
+A: An operation that produces all running results of an associative operation: running totals, running max, etc.
+cumulative_sum is the scan of addition.
+
+Q: Why must the operation be associative to parallelise a scan?
+A: Blocks are combined out of order: each block is scanned independently and later joined with the total of the
+blocks before it. That regrouping only gives the same answer if (a op b) op c == a op (b op c).
+
+Q: Why is parallel_scan a "two-pass" algorithm?
+A: The first pass only computes one total per block; a tiny serial scan turns those into offsets; the second pass
+scans each block starting from its offset. Both big passes run in parallel.
+
+Q: Why use shared memory with a process pool?
+A: Arguments and results are otherwise pickled and copied between processes, which for large arrays costs more than
+the computation. Shared memory lets every worker read and write the same buffer directly.
+"""
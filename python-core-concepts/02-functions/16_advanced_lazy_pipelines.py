@@ -0,0 +1,277 @@
+"""
+Fused, Lazy Transformation Pipelines
+apply_transformations in 05_advanced_higher_order.py stacks one map() per transformation:
+    map(t3, map(t2, map(t1, data)))
+Every item passes through one iterator object per stage and one Python function call per stage, and nothing can be
+vectorised because each stage only ever sees a single element.
+
+A lazy pipeline records the stages first and decides how to run them later:
+ > Stages (map / filter / reduce) are only recorded - nothing runs until a terminal operation (collect, reduce, iter).
+ > Adjacent stages are fused into a single generated loop, so each item makes one pass with no intermediate iterators.
+ > Items are processed in batches, which keeps memory bounded for huge or infinite sources.
+ > When the source is a NumPy array and a run of stages is array-compatible (NumPy ufuncs, or functions marked
+   vectorized=True), that run is compiled into whole-array expressions instead of per-item calls.
+ > explain() prints the fused plan, so you can see which parts are vectorised and which fall back to Python.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import time
+from functools import reduce
+from itertools import islice
+
+try:
+    import numpy as np  # optional: vectorised execution of array-compatible stages
+except ImportError:
+    np = None
+
+"""
+1. Stages
+A stage is just (kind, function, vectorized). vectorized means "this function works element-wise on a whole array",
+e.g. np.sqrt or lambda x: x * 2 + 1. NumPy ufuncs are detected automatically.
+"""
+class Stage:
+    __slots__ = ("kind", "func", "vectorized")
+
+    def __init__(self, kind, func, vectorized=None):
+        if vectorized is None:
+            vectorized = np is not None and isinstance(func, np.ufunc)
+        self.kind = kind
+        self.func = func
+        self.vectorized = vectorized
+
+    def __repr__(self):
+        return f"{self.kind}({getattr(self.func, '__name__', repr(self.func))})"
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Fusing Python Stages Into One Pass
+Consecutive maps are composed into one nested call, and each filter binds the current value once (the
+`for v in (expr,)` idiom, which CPython compiles to a plain assignment). For [map f0, filter p1, map f2] we generate
+(once) and then call:
+
+    def fused(batch, s0, s1, s2):
+        return [s2(v1) for x in batch for v1 in (s0(x),) if s1(v1)]
+
+One comprehension, one pass, no iterator object per stage. This is the same technique collections.namedtuple uses:
+build source code, then exec it.
+"""
+def compile_fused_loop(stages):
+    names = [f"s{index}" for index in range(len(stages))]
+    expression, clauses = "x", ["for x in batch"]
+    for index, (name, stage) in enumerate(zip(names, stages)):
+        if stage.kind == "map":
+            expression = f"{name}({expression})"
+            continue
+        if not expression.isidentifier():  # bind the mapped value once, so the filter and later stages share it
+            clauses.append(f"for v{index} in ({expression},)")
+            expression = f"v{index}"
+        clauses.append(f"if {name}({expression})")
+    parameters = ", ".join(["batch"] + names)
+    source = f"def fused({parameters}):\n    return [{expression} {' '.join(clauses)}]"
+    namespace = {}
+    exec(source, namespace)
+    fused = namespace["fused"]
+    functions = [stage.func for stage in stages]
+    return lambda batch: fused(batch, *functions)
+
+
+def compile_vectorized(stages):
+    # map -> apply the function to the whole array; filter -> boolean mask
+    def run(batch):
+        for stage in stages:
+            if stage.kind == "map":
+                batch = stage.func(batch)
+            else:
+                batch = batch[np.asarray(stage.func(batch), dtype=bool)]
+        return batch
+    return run
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. The Pipeline
+The plan is a list of segments. Consecutive vectorised stages form a "numpy" segment (only when the source is an
+array), everything else is fused into "python" segments. Each batch flows through every segment in order.
+"""
+class Pipeline:
+    def __init__(self, source, batch_size=4096, stages=()):
+        self.source = source
+        self.batch_size = batch_size
+        self.stages = list(stages)
+
+    def _extend(self, stage):
+        # Pipelines are immutable: every call returns a new pipeline sharing the same source
+        return Pipeline(self.source, self.batch_size, self.stages + [stage])
+
+    def map(self, func, vectorized=None):
+        return self._extend(Stage("map", func, vectorized))
+
+    def filter(self, predicate, vectorized=None):
+        return self._extend(Stage("filter", predicate, vectorized))
+
+    @property
+    def _array_source(self):
+        return np is not None and isinstance(self.source, np.ndarray)
+
+    def plan(self):
+        segments = []
+        for stage in self.stages:
+            kind = "numpy" if stage.vectorized and self._array_source else "python"
+            if segments and segments[-1][0] == kind:
+                segments[-1][1].append(stage)
+            else:
+                segments.append((kind, [stage]))
+        return segments
+
+    def _compiled(self):
+        return [(kind, compile_vectorized(stages) if kind == "numpy" else compile_fused_loop(stages))
+                for kind, stages in self.plan()]
+
+    def _batches(self):
+        if self._array_source:
+            for start in range(0, len(self.source), self.batch_size):
+                yield self.source[start:start + self.batch_size]
+        else:
+            iterator = iter(self.source)
+            while batch := list(islice(iterator, self.batch_size)):
+                yield batch
+
+    def iter_batches(self):
+        compiled = self._compiled()
+        for batch in self._batches():
+            for kind, run in compiled:
+                if kind == "numpy" and not isinstance(batch, np.ndarray):
+                    batch = np.asarray(batch)
+                batch = run(batch)
+            if len(batch):
+                yield batch
+
+    def __iter__(self):
+        for batch in self.iter_batches():
+            yield from batch
+
+    def collect(self):
+        batches = list(self.iter_batches())
+        if batches and np is not None and all(isinstance(batch, np.ndarray) for batch in batches):
+            return np.concatenate(batches)
+        return [item for batch in batches for item in batch]
+
+    def reduce(self, func, initial=None):
+        # ufuncs reduce each array batch in C, then the per-batch results are combined with the same ufunc
+        vector_reduce = np is not None and isinstance(func, np.ufunc)
+        accumulator = initial
+        for batch in self.iter_batches():
+            if vector_reduce and isinstance(batch, np.ndarray):
+                partial = func.reduce(batch)
+                accumulator = partial if accumulator is None else func(accumulator, partial)
+            elif accumulator is None:
+                accumulator = reduce(func, batch)
+            else:
+                accumulator = reduce(func, batch, accumulator)
+        if accumulator is None:
+            raise TypeError("reduce() of empty pipeline with no initial value")
+        return accumulator
+
+    def explain(self):
+        source_type = type(self.source).__name__
+        segments = self.plan()
+        lines = [f"Pipeline over {source_type} in batches of {self.batch_size}: "
+                 f"{len(self.stages)} stage(s) fused into {len(segments)} segment(s), one pass per batch"]
+        for number, (kind, stages) in enumerate(segments, start=1):
+            how = "vectorised array expressions" if kind == "numpy" else "single fused Python loop"
+            lines.append(f"  segment {number} [{how}]: " + " -> ".join(map(repr, stages)))
+        return "\n".join(lines)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Replacing apply_transformations
+"""
+def apply_transformations(data, transformations):  # the original, from 05_advanced_higher_order.py
+    for transformation in transformations:
+        data = map(transformation, data)
+    return list(data)
+
+def apply_transformations_fused(data, transformations):
+    pipeline = Pipeline(data)
+    for transformation in transformations:
+        pipeline = pipeline.map(transformation)
+    return pipeline.collect()
+
+data = [1, 2, 3, 4]
+transformations = [lambda x: x + 1, lambda x: x ** 2]
+print(apply_transformations(data, transformations))
+print(apply_transformations_fused(data, transformations))
+
+def is_even(x):
+    return x % 2 == 0
+
+def square(x):
+    return x * x
+
+def add(x, y):
+    return x + y
+
+pipeline = Pipeline(range(10)).map(lambda x: x + 1).filter(is_even).map(square)
+print(pipeline.explain())
+print(pipeline.collect())
+print(pipeline.reduce(add))
+
+if np is not None:
+    array_pipeline = (Pipeline(np.arange(10.0)).map(np.sqrt).map(lambda x: x * 2, vectorized=True)
+                      .filter(lambda x: x > 3, vectorized=True).map(str))
+    print(array_pipeline.explain())
+    print(array_pipeline.collect())
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. Benchmark
+For arbitrary Python callables the cost is dominated by the function calls themselves, which fusion cannot remove -
+and stacked map()/filter() objects already loop in C - so the fused Python path runs at about the same speed.
+Its value there is one bounded, batched pass and an inspectable plan. The large gains come from the vectorised path,
+where whole batches are handled by NumPy.
+"""
+def benchmark(n=1_000_000):
+    data = list(range(n))
+    transformations = [lambda x: x + 1, lambda x: x * 3, lambda x: x - 7, lambda x: x // 2]
+
+    start = time.perf_counter()
+    expected = apply_transformations(data, transformations)
+    original_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fused = apply_transformations_fused(data, transformations)
+    fused_seconds = time.perf_counter() - start
+    print(f"stacked map(): {original_seconds:.3f}s, fused pipeline: {fused_seconds:.3f}s, same: {fused == expected}")
+
+    increment = transformations[0]
+    start = time.perf_counter()
+    expected_filtered = list(map(square, filter(is_even, map(increment, data))))
+    original_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    filtered = Pipeline(data).map(increment).filter(is_even).map(square).collect()
+    fused_seconds = time.perf_counter() - start
+    print(f"stacked map/filter/map: {original_seconds:.3f}s, fused pipeline: {fused_seconds:.3f}s, "
+          f"same: {filtered == expected_filtered}")
+
+    if np is not None:
+        vector_pipeline = Pipeline(np.arange(n), batch_size=1 << 16)
+        for transformation in transformations:
+            vector_pipeline = vector_pipeline.map(transformation, vectorized=True)
+        start = time.perf_counter()
+        vectorised = vector_pipeline.collect()
+        print(f"vectorised pipeline: {time.perf_counter() - start:.3f}s, same: {vectorised.tolist() == expected}")
+
+benchmark()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What is lazy evaluation in a data pipeline?
+A: Recording the operations instead of running them immediately. Because the whole chain is known before execution,
+it can be optimised (fused, reordered, vectorised) and run in a single pass.
+
+Q: What is operator fusion?
+A: Combining consecutive operations into one loop, so each element is processed by all of them in one go - no
+intermediate lists or iterator layers between stages. Spark and Polars do the same with their query plans.
+
+Q: Why does vectorisation need to know the functions are element-wise?
+A: A vectorised stage receives a whole array instead of a single value. An arbitrary Python function (e.g. one with
+an if-statement on the value) may not work on arrays, so it has to run per item.
+
+Q: Why process data in batches?
+A: Batches give vectorised code enough data to be efficient while keeping memory bounded, and they work for
+sources that are too large - or infinite - to materialise at once.
+"""
@@ -0,0 +1,295 @@
+"""
+Streaming Min-Max Normalisation
+normalise_values in 05_advanced_higher_order.py is fine for a short list, but it has three problems at scale:
+ - It walks the data three times (min, max, then map), and every value goes through a lambda call.
+ - The whole dataset has to be a Python list in memory.
+ - When all values are equal, max - min is 0 and it raises ZeroDivisionError.
+
+A normaliser object splits the work into "fit" and "transform", like scikit-learn's MinMaxScaler:
+ > partial_fit(chunk) updates the running min/max one chunk at a time, so the data can arrive as a stream of chunks
+   read from disk, a database cursor or a memory-mapped column - it never needs to fit in RAM.
+ > transform() is a single multiply-add per value: x * scale + offset. With NumPy it runs over whole arrays (in place,
+   or into a pre-allocated / memory-mapped output); without NumPy it runs over typed arrays in a comprehension.
+ > A constant column gets scale 0, so every value maps to the lower end of the range instead of crashing.
+ > The fitted state is a handful of numbers, so it can be saved to JSON and re-loaded to transform new data later.
+
+Note: min-max needs the global min and max before the first value can be transformed, so data larger than RAM is
+read twice - one fit pass and one transform pass. Only the chunks themselves are ever held in memory.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import json
+import math
+import os
+import tempfile
+import time
+from array import array
+
+try:
+    import numpy as np  # optional: vectorised fit/transform over arrays and memory-mapped columns
+except ImportError:
+    np = None
+
+"""
+1. The Normaliser
+min() and max() over a list or typed array both run in C. With NumPy, 2-D chunks are fitted per column (axis 0), so
+one normaliser can handle a whole feature matrix.
+NaN values are ignored when fitting NumPy arrays, so a missing value doesn't turn the whole range into NaN.
+"""
+class MinMaxNormaliser:
+    def __init__(self, feature_range=(0.0, 1.0), clip=False):
+        low, high = feature_range
+        if low >= high:
+            raise ValueError("feature_range must be (low, high) with low < high")
+        self.feature_range = (float(low), float(high))
+        self.clip = clip
+        self.data_min = None
+        self.data_max = None
+        self.n_samples_seen = 0
+
+    def partial_fit(self, chunk):
+        if np is not None and isinstance(chunk, np.ndarray):
+            if chunk.size == 0:
+                return self
+            chunk_min, chunk_max = np.nanmin(chunk, axis=0), np.nanmax(chunk, axis=0)
+            if self.data_min is not None:
+                chunk_min = np.minimum(chunk_min, self.data_min)
+                chunk_max = np.maximum(chunk_max, self.data_max)
+            self.n_samples_seen += len(chunk)
+        else:
+            if not isinstance(chunk, (list, tuple, array)):
+                chunk = list(chunk)  # a generator can only be walked once, but we need both min and max
+            if not chunk:
+                return self
+            chunk_min, chunk_max = min(chunk), max(chunk)
+            if self.data_min is not None:
+                chunk_min, chunk_max = min(chunk_min, self.data_min), max(chunk_max, self.data_max)
+            self.n_samples_seen += len(chunk)
+        self.data_min, self.data_max = chunk_min, chunk_max
+        return self
+
+    def fit(self, data):
+        self.data_min = self.data_max = None
+        self.n_samples_seen = 0
+        return self.partial_fit(data)
+
+    def fit_stream(self, chunks):
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    @property
+    def is_fitted(self):
+        return self.data_min is not None
+
+    def _parameters(self):
+        # x_scaled = x * scale + offset, computed once instead of (x - min) / (max - min) per value
+        if not self.is_fitted:
+            raise RuntimeError("MinMaxNormaliser is not fitted yet - call fit() or partial_fit() first")
+        low, high = self.feature_range
+        data_range = self.data_max - self.data_min
+        if np is not None and isinstance(data_range, np.ndarray):
+            scale = np.divide(high - low, data_range, out=np.zeros(data_range.shape), where=data_range != 0)
+        else:
+            scale = (high - low) / data_range if data_range else 0.0  # constant data -> low end of the range
+        return scale, low - self.data_min * scale
+
+    def transform(self, values, out=None):
+        scale, offset = self._parameters()
+        low, high = self.feature_range
+        if np is not None and isinstance(values, np.ndarray):
+            if out is None:
+                out = np.empty(values.shape, dtype=np.result_type(values.dtype, np.float64))
+            np.multiply(values, scale, out=out)
+            np.add(out, offset, out=out)
+            if self.clip:
+                np.clip(out, low, high, out=out)
+            return out
+        if self.clip:
+            return array("d", [min(high, max(low, x * scale + offset)) for x in values])
+        return array("d", [x * scale + offset for x in values])
+
+    def transform_stream(self, chunks):
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    def inverse_transform(self, values):
+        scale, offset = self._parameters()
+        if np is not None and isinstance(values, np.ndarray):
+            return np.where(scale != 0, (values - offset) / np.where(scale != 0, scale, 1), self.data_min)
+        if not scale:
+            return array("d", [self.data_min] * len(values))
+        return array("d", [(x - offset) / scale for x in values])
+    """-------------------------------------------------------------------------------------------------------------"""
+    """
+    Serialisation
+    Only the fitted numbers are stored - NumPy arrays are saved as lists and restored as arrays.
+    """
+    def to_dict(self):
+        def plain(value):
+            return value.tolist() if np is not None and isinstance(value, (np.ndarray, np.generic)) else value
+        return {"feature_range": list(self.feature_range), "clip": self.clip, "data_min": plain(self.data_min),
+                "data_max": plain(self.data_max), "n_samples_seen": self.n_samples_seen}
+
+    @classmethod
+    def from_dict(cls, state):
+        normaliser = cls(tuple(state["feature_range"]), state["clip"])
+        data_min, data_max = state["data_min"], state["data_max"]
+        if isinstance(data_min, list):
+            if np is None:
+                raise RuntimeError("this normaliser was fitted per column and needs NumPy to be loaded")
+            data_min, data_max = np.asarray(data_min), np.asarray(data_max)
+        normaliser.data_min, normaliser.data_max = data_min, data_max
+        normaliser.n_samples_seen = state["n_samples_seen"]
+        return normaliser
+
+    def save(self, file_path):
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path) as file:
+            return cls.from_dict(json.load(file))
+
+    def __repr__(self):
+        return (f"MinMaxNormaliser(feature_range={self.feature_range}, data_min={self.data_min}, "
+                f"data_max={self.data_max}, n_samples_seen={self.n_samples_seen})")
+
+
+def normalise_values_fast(data):
+    # Drop-in replacement for normalise_values that also handles constant data
+    return list(MinMaxNormaliser().fit_transform(data))
+
+
+print(normalise_values_fast([10, 20, 30, 40]))  # Output: [0.0, 0.333..., 0.666..., 1.0]
+print(normalise_values_fast([5, 5, 5]))  # Output: [0.0, 0.0, 0.0] - the original raises ZeroDivisionError
+
+normaliser = MinMaxNormaliser(feature_range=(-1, 1))
+for chunk in ([3, 7, 1], [9, 4], [2, 8]):  # e.g. batches arriving from a stream
+    normaliser.partial_fit(chunk)
+print(normaliser)
+print(list(normaliser.transform([1, 5, 9])))  # Output: [-1.0, 0.0, 1.0]
+
+restored = MinMaxNormaliser.from_dict(json.loads(json.dumps(normaliser.to_dict())))
+print(list(restored.transform([1, 5, 9])))
+
+if np is not None:
+    matrix = np.array([[1.0, 100.0], [2.0, 100.0], [3.0, 300.0]])
+    print(MinMaxNormaliser().fit_transform(matrix))  # per column; the constant rows are fine too
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Normalising a Column Larger Than Memory
+The column is stored on disk as raw float64 values. It is read in fixed-size chunks for the fit pass and again for
+the transform pass, and each transformed chunk is written straight to the output file.
+ - With NumPy the file is opened with np.memmap: chunks are views of the mapping and transform() writes into the
+   output mapping in place, so no extra copies are made.
+ - Without NumPy, array.fromfile / array.tofile read and write one chunk at a time.
+"""
+def iter_column_chunks(file_path, chunk_size=1 << 20):
+    if np is not None:
+        column = np.memmap(file_path, dtype=np.float64, mode="r")
+        for start in range(0, len(column), chunk_size):
+            yield column[start:start + chunk_size]
+        return
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = array("d")
+            try:
+                chunk.fromfile(file, chunk_size)
+            except EOFError:  # the last chunk is shorter than chunk_size - fromfile still keeps what it read
+                pass
+            if not chunk:
+                return
+            yield chunk
+
+
+def normalise_column_file(input_path, output_path, chunk_size=1 << 20, normaliser=None):
+    normaliser = normaliser or MinMaxNormaliser()
+    normaliser.fit_stream(iter_column_chunks(input_path, chunk_size))  # pass 1: fit
+
+    if np is not None:  # pass 2: transform straight into a memory-mapped output file
+        size = os.path.getsize(input_path) // 8
+        output = np.memmap(output_path, dtype=np.float64, mode="w+", shape=(size,))
+        for start, chunk in zip(range(0, size, chunk_size), iter_column_chunks(input_path, chunk_size)):
+            normaliser.transform(chunk, out=output[start:start + chunk_size])
+        output.flush()
+        del output
+    else:
+        with open(output_path, "wb") as file:
+            for transformed in normaliser.transform_stream(iter_column_chunks(input_path, chunk_size)):
+                transformed.tofile(file)
+    return normaliser
+
+
+def write_sample_column(count, chunk_size=1 << 20):
+    handle, path = tempfile.mkstemp(suffix=".f64")
+    with os.fdopen(handle, "wb") as file:
+        for start in range(0, count, chunk_size):
+            array("d", (math.sin(i) * 50 + 20 for i in range(start, min(start + chunk_size, count)))).tofile(file)
+    return path
+
+
+input_path = write_sample_column(100_000)
+output_path = input_path + ".normalised"
+try:
+    fitted = normalise_column_file(input_path, output_path, chunk_size=16_384)
+    print(fitted)
+    with open(output_path, "rb") as file:
+        head = array("d")
+        head.fromfile(file, 3)
+    print("first normalised values:", list(head))
+finally:
+    os.remove(input_path)
+    if os.path.exists(output_path):
+        os.remove(output_path)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Benchmark Against normalise_values
+"""
+def normalise_values(data: list):  # the original, from 05_advanced_higher_order.py
+    min_value, max_value = min(data), max(data)
+    return list(map(lambda x: (x - min_value) / (max_value - min_value), data))
+
+
+def benchmark(n=1_000_000):
+    data = [float(i % 9973) for i in range(n)]
+
+    start = time.perf_counter()
+    expected = normalise_values(data)
+    original_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = MinMaxNormaliser().fit_transform(data)
+    fast_seconds = time.perf_counter() - start
+    same = all(math.isclose(a, b, abs_tol=1e-12) for a, b in zip(expected, result))
+    print(f"normalise_values: {original_seconds:.3f}s, MinMaxNormaliser (lists): {fast_seconds:.3f}s "
+          f"({original_seconds / fast_seconds:.1f}x), same result: {same}")
+
+    if np is not None:
+        values = np.asarray(data)
+        start = time.perf_counter()
+        MinMaxNormaliser().fit(values).transform(values, out=values)  # in place: no second array allocated
+        print(f"MinMaxNormaliser (NumPy, in place): {time.perf_counter() - start:.4f}s")
+
+benchmark()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What is min-max normalisation, and when does it fail?
+A: Rescaling values to a fixed range with (x - min) / (max - min). It fails when max == min (division by zero), and
+a single outlier squeezes every other value into a tiny part of the range.
+
+Q: Why separate fit from transform?
+A: The parameters must be learned from the training data only and then reused unchanged on validation, test and
+production data - otherwise information leaks from the evaluation data into the model.
+
+Q: What does partial_fit enable?
+A: Fitting on data that arrives in chunks or doesn't fit in memory. For min-max the running state is just the
+min and max seen so far, and combining two chunks is simply min(mins) and max(maxes).
+
+Q: Why precompute scale and offset?
+A: (x - min) / (max - min) costs a subtraction and a division per value; x * scale + offset is one multiply-add,
+and it is the same formula for every value, so it vectorises well.
+"""
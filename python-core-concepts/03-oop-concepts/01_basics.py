@@ -29,6 +29,7 @@ scaler = FeatureScaler(mean=10, std=2)
 scaled_value = scaler.scale(14)
 print(scaled_value)
 print(scaler.mean) # No encapsulation - to understand go through the next concept
+# For fitting mean/std from data and scaling whole columns at once, see 04_advanced_feature_scaling.py
 
 """
 What is the difference between a class and an object?
@@ -90,6 +91,7 @@ account.withdraw(100)
 print(account.get_balance())
 # Direct access attempt will fail
 # print(account.__balance)  # AttributeError
+# For thread-safe batches, integer cents, a transaction log and snapshots, see 17_advanced_ledger.py
 
 """
 B. Machine Learning Pipeline (Hyperparameter Management)
@@ -136,6 +138,7 @@ data = [1, 0, None, 3, None, 5]
 cleaner = DataCleaner(data)
 cleaner.missing_values(-1)
 print(cleaner.get_cleaned_data())
+# For typed columns with a validity bitmap and in-place mean/median/forward-fill, see 05_advanced_columnar_cleaning.py
 
 """
 D. Web Applications (User Authentication)
@@ -158,6 +161,7 @@ class User:
 user = User("John", "PASSWORD")
 print(user.authenticate("<PASSWORD>")) # FALSE
 print(user.authenticate("PASSWORD")) # TRUE
+# For salted scrypt/PBKDF2 hashing, batch verification and async authenticate, see 16_advanced_password_hashing.py
 
 """
 E. Single underscore - Indicating "Protected" Attributes or Methods
@@ -246,6 +250,8 @@ text_data = ["Alice", "BOB", "CHarLIe", None]
 preprocessor = TextPreProcessor(text_data)
 preprocessor.clean()
 print(preprocessor.data)
+# For a lazy, single-pass chain of stages contributed by each subclass, see 15_advanced_text_pipeline.py
+# To cache the results of steps like clean() on disk, keyed on the input data and code, see 10_advanced_step_cache.py
 
 """
 B. Machine Learning Pipelines
@@ -256,7 +262,9 @@ class BaseModel:
         self.data = data
 
     def preprocess(self):
-        return [(x - min(self.data))/(min(self.data) - max(self.data)) for x in self.data] # Min-Max Scaling
+        low, high = min(self.data), max(self.data) # Computed once, not once per element
+        span = (high - low) or 1.0 # Constant data would otherwise divide by zero
+        return [(x - low)/span for x in self.data] # Min-Max Scaling
 
     def train(self):
         return NotImplementedError("Subclasses must implement this method")
@@ -272,6 +280,7 @@ class DecisionTreeModel(BaseModel):
 model = LogisticRegressionModel([10,20, -30, 50, 5, 9.5])
 print(model.preprocess())
 model.train()
+# To fit min/max once and share the scaling between models, see 11_advanced_fitted_preprocessing.py
 
 """
 C. ETL Pipelines (Extract, Transform, Load)
@@ -311,6 +320,7 @@ csv_etl.etl_process()
 
 api_etl = APIETL("https://api.example.com/data")
 api_etl.etl_process()
+# To stream chunks through extract/transform/load in parallel stages, see 06_advanced_etl_engine.py
 
 """
 What is inheritance, and why is it useful?
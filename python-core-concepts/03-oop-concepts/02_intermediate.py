@@ -43,6 +43,7 @@ models = [LinearRegressionModel(), DecisionTreeModel()]
 for model in models:
     model.fit([1,2,3])
     print(model.predict([1,2,3]))
+# For batched, chunked, threaded and micro-batched prediction on this interface, see 12_advanced_batched_predict.py
 
 """
 Real-World Relevance for Data Scientists
@@ -124,6 +125,7 @@ data = csv_pipeline.extract()
 print(data)
 transformed_data = csv_pipeline.transform(data)
 csv_pipeline.load(transformed_data)
+# For a fast, typed CSV extract with column projection, see 08_advanced_csv_extraction.py
 
 print("API Pipeline:")
 api_pipeline = APIETL("https://api.example.com/data")
@@ -131,6 +133,9 @@ data = api_pipeline.extract()
 print(data)
 transformed_data = api_pipeline.transform(data)
 api_pipeline.load(transformed_data)
+# To stream chunks through extract/transform/load in parallel stages, see 06_advanced_etl_engine.py
+# For async, concurrent extraction from a paginated API, see 07_advanced_async_etl.py
+# For resumable, incremental (watermark-based) runs, see 09_advanced_etl_checkpoints.py
 
 """
 Real-World Relevance for Data Scientists
@@ -172,6 +177,7 @@ processor = dataPreprocessor()
 processor.process([1,2,3])
 processor.process([1,2,3], [4,5,6])
 processor.process()
+# To run the multi-dataset path on a thread or process pool, with shared memory and timings, see 14_advanced_parallel_dispatch.py
 
 """
 Real-World Relevance for Data Scientists
@@ -208,6 +214,7 @@ class DataStats:
 
 stats = DataStats([1,2,3,5,6])
 print(stats.mean)
+# For O(1) updates on append, Welford variance, quantile sketches and mergeable stats, see 13_advanced_streaming_stats.py
 
 """
 Real-World Relevance for Data Scientists
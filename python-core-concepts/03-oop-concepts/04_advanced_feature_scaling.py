@@ -0,0 +1,324 @@
+"""
+Vectorised Feature Scaling With a Streaming Fit
+FeatureScaler in 01_basics.py takes a precomputed mean/std and scales one value per scale() call. That is fine for a
+single number, but scaling a million-row column means a million Python method calls, and the mean/std have to come
+from somewhere else.
+
+This version keeps the same idea and adds:
+ > fit() / partial_fit(): the mean and standard deviation are learned from data, batch by batch, using Welford's
+   algorithm - one pass, numerically stable, and no need to hold the whole column in memory.
+ > Parallel fitting: partial statistics of independent chunks are computed in a process pool and merged exactly
+   (Chan et al.'s formula), so fitting scales with the number of cores.
+ > transform(): a whole NumPy array (rows x features) or a batch of columns is scaled in one call, in the
+   x * scale + offset form explained in 02-functions/17_advanced_streaming_normaliser.py (scale = 1 / std,
+   offset = -mean / std), computed in C by NumPy.
+ > Compact state: per-column parameters are stored in typed arrays (array("d")) instead of lists of Python floats,
+   and the classes use __slots__, so thousands of per-feature scalers don't each carry a __dict__.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import math
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np  # optional: vectorised fit/transform over 2-D arrays
+except ImportError:
+    np = None
+
+"""
+Concept 1: Running Statistics (Welford + Parallel Merge)
+Definition
+ - Welford's algorithm updates count, mean and M2 (the sum of squared differences from the mean) one value at a time.
+ - Two sets of statistics can be merged exactly:
+       delta = mean_b - mean_a
+       mean  = mean_a + delta * n_b / n
+       M2    = M2_a + M2_b + delta² * n_a * n_b / n
+ - So a batch is summarised on its own (vectorised with NumPy, or with a short loop) and merged into the running
+   state, and chunks processed by different workers can be merged in any order.
+Why It Matters in Data Science
+ - Mean/std of a dataset that doesn't fit in memory, or that is split across machines, in a single pass.
+"""
+class RunningStats:
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, n_features=1):
+        self.count = 0
+        self.mean = array("d", [0.0] * n_features)
+        self.m2 = array("d", [0.0] * n_features)
+
+    @property
+    def n_features(self):
+        return len(self.mean)
+
+    def push(self, row):
+        # Welford for a single row (one value per feature)
+        self.count += 1
+        for i, value in enumerate(row):
+            delta = value - self.mean[i]
+            self.mean[i] += delta / self.count
+            self.m2[i] += delta * (value - self.mean[i])
+
+    def update(self, columns):
+        self.merge(RunningStats.from_batch(columns))
+        return self
+
+    @classmethod
+    def from_batch(cls, columns):
+        # Summarise one batch: NumPy array (rows x features, or 1-D) or a list of column sequences
+        if np is not None and isinstance(columns, np.ndarray):
+            values = columns.reshape(len(columns), -1).astype(np.float64, copy=False)
+            stats = cls(values.shape[1])
+            stats.count = len(values)
+            if stats.count:
+                batch_mean = values.mean(axis=0)
+                stats.mean = array("d", batch_mean.tolist())
+                stats.m2 = array("d", ((values - batch_mean) ** 2).sum(axis=0).tolist())
+            return stats
+        stats = cls(len(columns))
+        stats.count = len(columns[0]) if columns else 0
+        for i, column in enumerate(columns):
+            if len(column) != stats.count:
+                raise ValueError("all columns in a batch must have the same length")
+            if stats.count:
+                column_mean = math.fsum(column) / stats.count
+                stats.mean[i] = column_mean
+                stats.m2[i] = math.fsum((x - column_mean) ** 2 for x in column)
+        return stats
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, array("d", other.mean), array("d", other.m2)
+            return self
+        if other.n_features != self.n_features:
+            raise ValueError(f"cannot merge statistics for {other.n_features} features into {self.n_features}")
+        total = self.count + other.count
+        for i in range(self.n_features):
+            delta = other.mean[i] - self.mean[i]
+            self.mean[i] += delta * other.count / total
+            self.m2[i] += other.m2[i] + delta * delta * self.count * other.count / total
+        self.count = total
+        return self
+
+    def std(self):
+        # Population standard deviation (ddof=0), like sklearn's StandardScaler
+        return array("d", [math.sqrt(m2 / self.count) if self.count else 0.0 for m2 in self.m2])
+
+
+def running_stats_demo():
+    stats = RunningStats(2)
+    for row in [(1, 10), (2, 20), (3, 30), (4, 40)]:
+        stats.push(row)
+    print(stats.count, list(stats.mean), list(stats.std()))
+
+    left = RunningStats.from_batch([[1, 2], [10, 20]])
+    right = RunningStats.from_batch([[3, 4], [30, 40]])
+    merged = left.merge(right)
+    print(merged.count, list(merged.mean), list(merged.std()))  # same result as pushing all four rows
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Concept 2: The Batch-Capable FeatureScaler
+ - FeatureScaler(mean=10, std=2).scale(14) still works exactly like the original.
+ - mean/std may also be sequences (one value per feature), or learned with fit() / partial_fit().
+ - transform() accepts a NumPy array (1-D, or rows x features) or a list of columns, and returns the same layout.
+ - A feature with std 0 (a constant column) is only centred, so it becomes 0 instead of dividing by zero.
+"""
+class FeatureScaler:
+    __slots__ = ("stats", "_scale", "_offset")
+
+    def __init__(self, mean=None, std=None):
+        self.stats = None
+        self._scale = self._offset = None
+        if mean is not None:
+            means = array("d", mean if hasattr(mean, "__len__") else [mean])
+            stds = array("d", std if hasattr(std, "__len__") else [std])
+            if len(means) != len(stds):
+                raise ValueError("mean and std must have the same number of features")
+            self._set_parameters(means, stds)
+
+    def _set_parameters(self, means, stds):
+        # x_scaled = x * scale + offset, with scale = 1 / std and offset = -mean / std
+        self._scale = array("d", [1.0 / s if s else 1.0 for s in stds])
+        self._offset = array("d", [-m * k for m, k in zip(means, self._scale)])
+
+    @property
+    def mean(self):
+        self._check_fitted()
+        return array("d", [-o / k for o, k in zip(self._offset, self._scale)])
+
+    @property
+    def std(self):
+        self._check_fitted()
+        return self.stats.std() if self.stats is not None else array("d", [1.0 / k for k in self._scale])
+
+    def _check_fitted(self):
+        if self._scale is None:
+            raise RuntimeError("FeatureScaler has no parameters - pass mean/std or call fit() first")
+
+    def partial_fit(self, batch):
+        batch_stats = RunningStats.from_batch(batch)
+        self.stats = batch_stats if self.stats is None else self.stats.merge(batch_stats)
+        self._set_parameters(self.stats.mean, self.stats.std())
+        return self
+
+    def fit(self, data):
+        self.stats = None
+        return self.partial_fit(data)
+
+    def fit_parallel(self, batches, workers=None):
+        # Each batch is summarised in a worker process; the small summaries are merged here
+        self.stats = None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch_stats in pool.map(RunningStats.from_batch, batches):
+                self.stats = batch_stats if self.stats is None else self.stats.merge(batch_stats)
+        if self.stats is None:
+            raise ValueError("fit_parallel() needs at least one batch")
+        self._set_parameters(self.stats.mean, self.stats.std())
+        return self
+
+    def scale(self, value, feature=0):
+        self._check_fitted()
+        return value * self._scale[feature] + self._offset[feature]
+
+    def transform(self, data, out=None):
+        self._check_fitted()
+        if np is not None and isinstance(data, np.ndarray):
+            scale, offset = np.frombuffer(self._scale), np.frombuffer(self._offset)  # zero-copy views
+            if data.ndim == 1:
+                scale, offset = scale[0], offset[0]
+            if out is None:
+                out = np.empty(data.shape, dtype=np.result_type(data.dtype, np.float64))
+            np.multiply(data, scale, out=out)
+            np.add(out, offset, out=out)
+            return out
+        if len(data) != len(self._scale):
+            raise ValueError(f"expected {len(self._scale)} column(s), got {len(data)}")
+        return [array("d", [x * k + o for x in column]) for column, k, o in zip(data, self._scale, self._offset)]
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    def __repr__(self):
+        if self._scale is None:
+            return "FeatureScaler(unfitted)"
+        return f"FeatureScaler(mean={list(self.mean)}, std={list(self.std)})"
+
+
+def scaler_demo():
+    scaler = FeatureScaler(mean=10, std=2)
+    print(scaler.scale(14))  # Output: 2.0 - same as the original
+
+    scaler = FeatureScaler().fit([[1, 2, 3, 4], [10, 10, 10, 10]])  # two columns; the second one is constant
+    print(scaler)
+    print([list(column) for column in scaler.transform([[1, 4], [10, 10]])])
+
+    if np is not None:
+        matrix = np.array([[1.0, 100.0], [2.0, 200.0], [3.0, 300.0]])
+        print(FeatureScaler().fit_transform(matrix))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Concept 3: __slots__ and Memory
+Without __slots__ every instance carries its own __dict__. For a model with thousands of per-feature scalers the
+dicts add up; with __slots__ the attributes live in fixed slots on the instance itself.
+Better still, one FeatureScaler can hold the parameters of thousands of features in two typed arrays - 8 bytes per
+number, instead of a whole Python object per feature.
+"""
+class DictFeatureScaler:  # the original, from 01_basics.py
+    def __init__(self, mean, std):
+        self.mean = mean
+        self.std = std
+
+    def scale(self, value):
+        return (value - self.mean) / self.std
+
+
+class SlottedScalar:
+    __slots__ = ("mean", "std")
+
+    def __init__(self, mean, std):
+        self.mean = mean
+        self.std = std
+
+
+def allocated_bytes(factory):
+    tracemalloc.start()
+    objects = factory()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def memory_demo(count=10_000):
+    print("has __dict__ - original:", hasattr(DictFeatureScaler(0, 1), "__dict__"),
+          "| FeatureScaler:", hasattr(FeatureScaler(0, 1), "__dict__"))
+    for label, factory in [
+        (f"{count:,} original scalers", lambda: [DictFeatureScaler(i + 0.5, 1.5) for i in range(count)]),
+        (f"{count:,} slotted scalers", lambda: [SlottedScalar(i + 0.5, 1.5) for i in range(count)]),
+        (f"one FeatureScaler, {count:,} features",
+         lambda: FeatureScaler([i + 0.5 for i in range(count)], [1.5] * count)),
+    ]:
+        print(f"{label:<36}{allocated_bytes(factory) / 1024:>8.0f} KiB")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Concept 4: Benchmark
+Scaling one column of 1M values: a scale() call per value vs one transform() call.
+"""
+def benchmark(n=1_000_000):
+    column = [float(i % 1000) for i in range(n)]
+    original = DictFeatureScaler(mean=499.5, std=288.7)
+
+    start = time.perf_counter()
+    expected = [original.scale(x) for x in column]
+    original_seconds = time.perf_counter() - start
+
+    scaler = FeatureScaler(mean=499.5, std=288.7)
+    start = time.perf_counter()
+    (result,) = scaler.transform([column])
+    batch_seconds = time.perf_counter() - start
+    same = all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12) for a, b in zip(expected, result))
+    print(f"scale() per value: {original_seconds:.3f}s, transform() on a column: {batch_seconds:.3f}s "
+          f"({original_seconds / batch_seconds:.1f}x), same result: {same}")
+
+    start = time.perf_counter()
+    fitted = FeatureScaler().fit([column])
+    print(f"fit() on 1M values: {time.perf_counter() - start:.3f}s -> {fitted}")
+
+    if np is not None:
+        values = np.asarray(column)
+        start = time.perf_counter()
+        scaler.transform(values, out=values)
+        print(f"transform() on a NumPy array (in place): {time.perf_counter() - start:.4f}s")
+
+
+if __name__ == "__main__":
+    running_stats_demo()
+    scaler_demo()
+    memory_demo()
+    batches = [[[float(i) for i in range(start, start + 250_000)]] for start in range(0, 1_000_000, 250_000)]
+    parallel = FeatureScaler().fit_parallel(batches, workers=4)
+    serial = FeatureScaler().fit([[x for batch in batches for x in batch[0]]])
+    print("parallel fit:", parallel)
+    print("serial fit:  ", serial)
+    benchmark()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What does a standard scaler do?
+A: It turns each feature into (x - mean) / std, so features with different units end up on a comparable scale with
+mean 0 and standard deviation 1.
+
+Q: Why use Welford's algorithm instead of sum(x²)/n - mean²?
+A: Subtracting two large, nearly equal numbers loses precision (catastrophic cancellation). Welford's update works
+with differences from the running mean, which stay small.
+
+Q: How do you compute the mean and variance of data split across workers?
+A: Each worker returns (count, mean, M2) for its part, and the parts are merged with the parallel formula - the result
+is exactly what a single pass over all the data would give.
+
+Q: What does __slots__ do?
+A: It declares a fixed set of attributes, so instances don't get a per-instance __dict__. That saves memory and makes
+attribute access slightly faster, at the cost of not being able to add new attributes dynamically.
+"""
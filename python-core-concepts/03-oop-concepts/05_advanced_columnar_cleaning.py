@@ -0,0 +1,339 @@
+"""
+Columnar, Zero-Copy Missing-Value Imputation
+DataCleaner in 01_basics.py stores a plain list and fills missing values with a comprehension:
+ - Every missing_values() call builds a brand-new list, so memory peaks at twice the dataset size.
+ - get_cleaned_data() returns the private list itself, so callers can modify the "encapsulated" data.
+ - None is the only missing marker; NaN or sentinels such as -999 slip through.
+
+A columnar cleaner stores data the way Arrow and pandas do:
+ > Values live in a typed array (array("d") for floats, array("q") for ints): 8 bytes per value instead of a pointer
+   to a separate Python object.
+ > A validity bitmap (1 bit per row) records which values are present. Missing slots hold a placeholder 0.
+ > Imputation happens in place: only the missing slots are written, and the bitmap is updated. The statistics a
+   strategy needs (mean, median, previous value) are computed in passes that run in C.
+ > Cleaned data is read through read-only memoryviews (or NumPy views), so reading does not copy it.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import copy
+import math
+import re
+import statistics
+import time
+import tracemalloc
+from array import array
+from itertools import compress
+
+try:
+    import numpy as np  # optional: vectorised imputation on zero-copy array views
+except ImportError:
+    np = None
+
+"""
+Concept 1: The Validity Bitmap
+Definition
+ - Bit i of the bitmap is 1 when row i has a value and 0 when it is missing (the same layout Apache Arrow uses).
+ - Counting missing values is a popcount over the whole bitmap, and finding them only looks at bytes that are not
+   0xFF - a regular expression over the bytes does that scan in C, so columns with few gaps are cheap to scan.
+Why It Matters in Data Science
+ - 1 bit per row is 64x smaller than a Python list of booleans, and "is this value missing?" no longer depends on a
+   special value stored in the data itself.
+"""
+UNPACKED_BYTES = [bytes((byte >> bit) & 1 for bit in range(8)) for byte in range(256)]
+MISSING_BITS = [tuple(bit for bit in range(8) if not (byte >> bit) & 1) for byte in range(256)]
+NOT_ALL_VALID = re.compile(rb"[^\xff]")
+
+
+class ValidityBitmap:
+    __slots__ = ("bits", "length")
+
+    def __init__(self, length, valid=True):
+        self.length = length
+        self.bits = bytearray(b"\xff" * ((length + 7) // 8) if valid else (length + 7) // 8)
+        if valid and length % 8:
+            self.bits[-1] = (1 << (length % 8)) - 1  # padding bits past the end stay 0
+
+    def __getitem__(self, index):
+        return (self.bits[index >> 3] >> (index & 7)) & 1
+
+    def set_valid(self, index):
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def set_missing(self, index):
+        self.bits[index >> 3] &= ~(1 << (index & 7))
+
+    def valid_count(self):
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def missing_indices(self):
+        # Ascending order; only bytes that contain a 0 bit are inspected, using a lookup table of their 0 bits
+        bits, length = self.bits, self.length
+        for match in NOT_ALL_VALID.finditer(bits):
+            base = match.start() << 3
+            for bit in MISSING_BITS[bits[match.start()]]:
+                if base + bit < length:  # the padding bits of the last byte are 0 too
+                    yield base + bit
+
+    def mask(self):
+        # One byte (0/1) per row - a boolean array with NumPy, otherwise bytes, which itertools.compress accepts
+        if np is not None:
+            return np.unpackbits(np.frombuffer(self.bits, np.uint8), bitorder="little")[:self.length].view(bool)
+        return b"".join(map(UNPACKED_BYTES.__getitem__, self.bits))[:self.length]
+
+    def mark_all_valid(self):
+        self.bits[:] = ValidityBitmap(self.length).bits
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Concept 2: A Typed Column
+ - None and NaN are always treated as missing; extra sentinels (e.g. -999 or "") can be passed as missing_markers.
+ - Integer data is stored as array("q"). If a strategy produces a non-integer fill value (e.g. the mean), the column is
+   converted to float64 once, like pandas does - otherwise the fill value would be silently truncated.
+ - Views share memory with the column, so they see later in-place imputation. The one exception is an integer column
+   converted to float: views taken before the conversion keep pointing at the old integer values.
+"""
+class Column:
+    __slots__ = ("values", "validity")
+
+    def __init__(self, data, missing_markers=()):
+        markers = set(missing_markers)
+        is_integer = all(isinstance(x, int) for x in data if x is not None and x not in markers)
+        self.values = array("q" if is_integer else "d", bytes(8 * len(data)))
+        self.validity = ValidityBitmap(len(data))
+        values, validity = self.values, self.validity
+        for i, x in enumerate(data):
+            if x is None or x != x or x in markers:  # x != x is only true for NaN
+                validity.set_missing(i)
+            else:
+                values[i] = x
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def missing_count(self):
+        return len(self.values) - self.validity.valid_count()
+
+    def valid_values(self):
+        return compress(self.values, self.validity.mask())  # lazy: nothing is copied
+
+    def _ensure_float(self, fill_value):
+        if self.values.typecode == "q" and not float(fill_value).is_integer():
+            self.values = array("d", self.values)
+        return fill_value if self.values.typecode == "d" else int(fill_value)
+    """-------------------------------------------------------------------------------------------------------------"""
+    """
+    Imputation strategies (all in place)
+     - constant: write one value into every missing slot.
+     - mean: missing slots hold 0, so the sum of *all* values is already the sum of the valid ones - one fsum in C.
+     - median: needs the valid values sorted, so this strategy (and only this one) makes a temporary copy.
+     - ffill: carry the previous value forward; missing values at the very start have nothing to copy and stay missing.
+    """
+    STRATEGIES = ("constant", "mean", "median", "ffill")
+
+    def check(self, strategy="constant", value=None):
+        # Raises if impute(strategy, value) would fail, without touching the column
+        if strategy not in self.STRATEGIES:
+            raise ValueError("strategy must be one of 'constant', 'mean', 'median', 'ffill'")
+        missing = self.missing_count
+        if missing == 0:
+            return
+        if missing == len(self) and strategy != "constant":
+            raise ValueError(f"cannot compute a {strategy!r} fill value for a column with no values")
+        if strategy == "constant" and value is None:
+            raise ValueError("the constant strategy needs a value")
+
+    def impute(self, strategy="constant", value=None):
+        self.check(strategy, value)
+        missing = self.missing_count
+        if missing == 0:
+            return self
+        if strategy == "constant":
+            fill_value = value
+        elif strategy == "mean":
+            fill_value = math.fsum(self.values) / (len(self) - missing)
+        elif strategy == "median":
+            if np is not None:  # a float64 copy of the valid values, partitioned in place rather than sorted
+                valid = np.frombuffer(self.values, dtype=self.values.typecode)[self.validity.mask()]
+                fill_value = np.median(valid, overwrite_input=True).item()
+            else:
+                fill_value = statistics.median(self.valid_values())
+        else:
+            return self._forward_fill()
+
+        fill_value = self._ensure_float(fill_value)
+        if np is not None:
+            data = np.frombuffer(self.values, dtype=self.values.typecode)  # a writable view of the same memory
+            data[~self.validity.mask()] = fill_value
+            del data
+        else:
+            values = self.values
+            for i in self.validity.missing_indices():
+                values[i] = fill_value
+        self.validity.mark_all_valid()
+        return self
+
+    def _forward_fill(self):
+        values, validity = self.values, self.validity
+        if np is not None:
+            data = np.frombuffer(values, dtype=values.typecode)
+            missing = np.flatnonzero(~validity.mask())
+            # Only the missing rows are indexed: each one copies from the row just before its run of gaps
+            # (-1 for a run at the very start), so the index arrays grow with the gaps, not with the column
+            run_starts = np.where(np.diff(missing, prepend=-2) != 1, missing, 0)
+            source = np.maximum.accumulate(run_starts) - 1
+            leading_gap = int(np.count_nonzero(source < 0))
+            data[missing[leading_gap:]] = data[source[leading_gap:]]
+            del data
+            validity.mark_all_valid()
+            for i in range(leading_gap):
+                validity.set_missing(i)
+            return self
+        leading_gap = 0
+        for i in validity.missing_indices():  # ascending, so values[i - 1] is already filled when it is needed
+            if i == leading_gap:
+                leading_gap += 1  # every row so far is missing: nothing to carry forward yet
+                continue
+            values[i] = values[i - 1]
+            validity.set_valid(i)
+        return self
+    """-------------------------------------------------------------------------------------------------------------"""
+    """
+    Zero-copy views
+    """
+    def view(self):
+        # A read-only view of the values: no copy, and callers can't modify the column through it
+        if np is not None:
+            data = np.frombuffer(self.values, dtype=self.values.typecode)
+            data.flags.writeable = False
+            return data
+        return memoryview(self.values).toreadonly()
+
+    def __iter__(self):
+        # Lazily yields values with None where data is still missing
+        validity = self.validity
+        for i, x in enumerate(self.values):
+            yield x if validity[i] else None
+
+    def to_list(self):
+        return list(self)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Concept 3: The Columnar DataCleaner
+ - Same interface as the original: DataCleaner(data), missing_values(value), get_cleaned_data().
+ - data may also be a dict of named columns; impute() can use a different strategy per column, and leaves columns
+   missing from the dict untouched. Every column is checked before any is modified, so a failing call changes nothing.
+ - get_cleaned_data() now returns a read-only view, so encapsulation holds without copying the data.
+"""
+class DataCleaner:
+    def __init__(self, data, missing_markers=()):
+        columns = data if isinstance(data, dict) else {"value": data}
+        self.__columns = {name: Column(values, missing_markers) for name, values in columns.items()}
+
+    def missing_values(self, value):
+        # The original API: fill every missing value with a constant
+        return self.impute("constant", value)
+
+    def impute(self, strategy="constant", value=None, columns=None):
+        # strategy may also be a dict such as {"age": "median", "price": "ffill"}; columns not in it are left alone
+        if isinstance(strategy, dict):
+            plan = [(self.__columns[name], column_strategy) for name, column_strategy in strategy.items()]
+        else:
+            plan = [(self.__columns[name], strategy) for name in columns or self.__columns]
+        for column, column_strategy in plan:  # check every column first, so a bad call changes nothing
+            column.check(column_strategy, value)
+        for column, column_strategy in plan:
+            column.impute(column_strategy, value)
+        return self
+
+    def missing_counts(self):
+        return {name: column.missing_count for name, column in self.__columns.items()}
+
+    def get_cleaned_data(self, column="value"):
+        return self.__columns[column].view()
+
+    def to_lists(self):
+        return {name: column.to_list() for name, column in self.__columns.items()}
+
+
+data = [1, 0, None, 3, None, 5]
+cleaner = DataCleaner(data)
+cleaner.missing_values(-1)
+print(cleaner.get_cleaned_data().tolist())  # Output: [1, 0, -1, 3, -1, 5]
+try:
+    cleaner.get_cleaned_data()[0] = 100
+except (TypeError, ValueError) as error:  # memoryview raises TypeError, NumPy raises ValueError
+    print("read-only:", error)
+
+table = DataCleaner({
+    "age": [31, None, 45, 28, None],
+    "price": [None, 10.5, float("nan"), 12.0, None],
+    "rating": [4, -999, 5, 3, -999],
+}, missing_markers=(-999,))
+print(table.missing_counts())
+table.impute({"age": "median", "price": "ffill", "rating": "mean"})
+print(table.to_lists())  # the leading price gap stays None: there is nothing before it to carry forward
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Concept 4: Benchmark - Time and Peak Memory of the Imputation Step
+1M floats with 10% and with 0.1% missing. Building each structure is not measured, only the imputation itself.
+Without NumPy, the columnar path does Python-level work per *missing* value, while the comprehension does C-level work
+per value: with many gaps the comprehension is faster, with few gaps the columnar path is. The memory saving holds
+either way (the median strategy is the exception, as it has to partition a copy of the valid values).
+"""
+class ListDataCleaner:  # the original, from 01_basics.py
+    def __init__(self, data):
+        self.__data = data
+
+    def missing_values(self, value):
+        self.__data = [x if x is not None else value for x in self.__data]
+
+    def get_cleaned_data(self):
+        return self.__data
+
+
+def measure(label, make, impute):
+    target = make()
+    start = time.perf_counter()
+    impute(target)
+    seconds = time.perf_counter() - start
+
+    target = make()
+    tracemalloc.start()
+    impute(target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34}{seconds:>8.3f}s   peak extra memory {peak / 2**20:>7.2f} MiB")
+
+
+def benchmark(n=1_000_000, missing_every=10):
+    print(f"{n:,} values, 1 in {missing_every} missing")
+    raw = [None if i % missing_every == 0 else float(i % 1000) for i in range(n)]
+    prepared = DataCleaner(raw)  # built once; each run imputes a fresh copy (a plain memory copy of the arrays)
+    measure("original list comprehension", lambda: ListDataCleaner(raw[:]), lambda c: c.missing_values(-1.0))
+    for strategy, value in [("constant", -1.0), ("mean", None), ("median", None), ("ffill", None)]:
+        measure(f"columnar {strategy}", lambda: copy.deepcopy(prepared), lambda c: c.impute(strategy, value))
+
+    listed = ListDataCleaner(raw[:])
+    listed.missing_values(-1.0)
+    columnar = copy.deepcopy(prepared).missing_values(-1.0)
+    print("same result:", listed.get_cleaned_data() == columnar.get_cleaned_data().tolist())
+
+benchmark(missing_every=10)
+benchmark(missing_every=1000)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What is a columnar data layout?
+A: Each column is stored as one contiguous typed array instead of a list of row objects. Operations on a column then
+touch only that column's memory, and the data can be processed by vectorised code (NumPy, Arrow, pandas, Polars).
+
+Q: What is a validity bitmap?
+A: One bit per row saying whether the value is present. It separates "missing" from the data itself, so no special
+value (None, NaN, -999) has to be reserved, and it costs only n / 8 bytes.
+
+Q: Which imputation strategy would you use, and when?
+A: Constant when missing has its own meaning (e.g. 0 purchases). Mean for roughly symmetric numeric data, median when
+there are outliers or skew, forward-fill for time series where the last known value is the best guess.
+
+Q: Why does in-place imputation matter for memory?
+A: Building a new filled copy needs room for both the old and new data at the same time - twice the dataset size.
+Writing only the missing slots of the existing array needs almost no extra memory.
+"""
@@ -0,0 +1,410 @@
+"""
+A Chunked, Parallel ETL Execution Engine
+ETLBase.etl_process (01_basics.py, and the abstract version in 02_intermediate.py) runs the three steps one after
+another on whole lists:
+    raw = extract()  ->  transformed = transform(raw)  ->  load(transformed)
+Nothing is loaded until everything is transformed, nothing is transformed until everything is extracted, and the whole
+dataset sits in memory twice.
+
+An execution engine streams chunks through the three stages instead:
+ > extract yields chunks (e.g. pages from an API or blocks of a CSV file) into a bounded queue.
+ > transform workers take chunks from that queue and put results on a second bounded queue; they run in threads
+   (good for I/O or NumPy work that releases the GIL) or hand the chunk to a process pool (pure-Python CPU work).
+ > load workers write results out, in the original order (ordered=True) or as they arrive.
+ > The queues are bounded, so a fast stage blocks instead of piling up memory ahead of a slow one (backpressure).
+ > Every stage records how many items/chunks it handled, how long it was busy and how deep its input queue got, so
+   the slowest stage - the one to parallelise further - is easy to spot.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+"""
+1. Stage Metrics
+throughput is items per second of wall-clock time while the stage was running; utilisation is the share of that time
+its workers were busy (above 100% means several workers were busy at once).
+A stage whose input queue is often full is the bottleneck; a stage whose input queue is always empty is starved.
+"""
+class StageMetrics:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.chunks = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self.queue_depth_total = 0
+        self.queue_depth_samples = 0
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record(self, items, seconds, queue_depth):
+        with self._lock:
+            self.items += items
+            self.chunks += 1
+            self.busy_seconds += seconds
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+            self.queue_depth_total += queue_depth
+            self.queue_depth_samples += 1
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def snapshot(self):
+        elapsed = self.elapsed
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "items": self.items,
+            "chunks": self.chunks,
+            "items_per_second": self.items / elapsed if elapsed else 0.0,
+            "utilisation": self.busy_seconds / elapsed if elapsed else 0.0,
+            "avg_queue_depth": self.queue_depth_total / self.queue_depth_samples if self.queue_depth_samples else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+        }
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. The Engine
+Chunks carry a sequence number so the load stage can restore the original order when several transform workers
+finish out of order. An error in any stage stops the whole run and is re-raised from run().
+Queue depth is sampled on the input queue of each stage every time it takes a chunk.
+With ordered=True, finished chunks wait in a reorder buffer until the chunks before them are loaded. A semaphore caps
+the chunks in flight (taken in extract, released once a chunk is loaded), so one slow chunk can't make that buffer
+grow without bound while the workers keep going.
+In process mode, only etl.transform_function() is sent to the pool, never the ETL object itself.
+"""
+_DONE = object()
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ETLEngine:
+    def __init__(self, chunk_size=1000, queue_size=4, transform_workers=2, load_workers=1,
+                 transform_executor="thread", process_workers=None, ordered=True):
+        if transform_executor not in ("thread", "process"):
+            raise ValueError("transform_executor must be 'thread' or 'process'")
+        if ordered and load_workers != 1:
+            raise ValueError("ordered loading needs exactly one load worker")
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.transform_workers = transform_workers
+        self.load_workers = load_workers
+        self.transform_executor = transform_executor
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.ordered = ordered
+        self.metrics = {}
+
+    def run(self, etl):
+        extracted = queue.Queue(maxsize=self.queue_size)
+        transformed = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        in_flight = threading.Semaphore(2 * self.queue_size + self.transform_workers)
+        errors = []
+        self.metrics = {name: StageMetrics(name, workers) for name, workers in
+                        [("extract", 1), ("transform", self.transform_workers), ("load", self.load_workers)]}
+
+        def put(target, item):
+            # A blocking put that gives up if another stage has failed, so no thread waits forever on a full queue
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def acquire(semaphore):
+            while not stop.is_set():
+                if semaphore.acquire(timeout=0.1):
+                    return True
+            return False
+
+        def get(source):
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def guarded(stage):
+            def run_stage(*args):
+                try:
+                    stage(*args)
+                except BaseException as error:
+                    errors.append(error)
+                    stop.set()
+            return run_stage
+
+        @guarded
+        def extract_stage():
+            metrics = self.metrics["extract"]
+            metrics.started = time.perf_counter()
+            chunks = iter(etl.extract_chunks(self.chunk_size))
+            sequence = 0
+            while not stop.is_set():
+                start = time.perf_counter()
+                chunk = next(chunks, _DONE)
+                if chunk is _DONE:
+                    break
+                metrics.record(len(chunk), time.perf_counter() - start, 0)
+                if not acquire(in_flight) or not put(extracted, (sequence, chunk)):
+                    return
+                sequence += 1
+            for _ in range(self.transform_workers):
+                put(extracted, _DONE)
+            metrics.finished = time.perf_counter()
+
+        finished_transformers = []
+        finished_lock = threading.Lock()
+
+        @guarded
+        def transform_stage(pool):
+            metrics = self.metrics["transform"]
+            if metrics.started is None:
+                metrics.started = time.perf_counter()
+            transform = etl.transform if pool is None else etl.transform_function()
+            while (item := get(extracted)) is not _DONE:
+                depth = extracted.qsize()
+                sequence, chunk = item
+                start = time.perf_counter()
+                result = transform(chunk) if pool is None else pool.submit(transform, chunk).result()
+                metrics.record(len(chunk), time.perf_counter() - start, depth)
+                if not put(transformed, (sequence, result)):
+                    return
+            with finished_lock:
+                finished_transformers.append(True)
+                last = len(finished_transformers) == self.transform_workers
+            if last:  # the last transform worker to finish tells the load workers there is nothing more
+                metrics.finished = time.perf_counter()
+                for _ in range(self.load_workers):
+                    put(transformed, _DONE)
+
+        @guarded
+        def load_stage():
+            metrics = self.metrics["load"]
+            if metrics.started is None:
+                metrics.started = time.perf_counter()
+            waiting, next_sequence = {}, 0  # reorder buffer for ordered=True
+            while (item := get(transformed)) is not _DONE:
+                depth = transformed.qsize()
+                sequence, chunk = item
+                ready = [chunk]
+                if self.ordered:
+                    waiting[sequence] = chunk
+                    ready = []
+                    while next_sequence in waiting:
+                        ready.append(waiting.pop(next_sequence))
+                        next_sequence += 1
+                for chunk in ready:
+                    start = time.perf_counter()
+                    etl.load(chunk)
+                    in_flight.release()
+                    metrics.record(len(chunk), time.perf_counter() - start, depth)
+            metrics.finished = time.perf_counter()
+
+        pool = ProcessPoolExecutor(self.process_workers) if self.transform_executor == "process" else None
+        try:
+            threads = [threading.Thread(target=extract_stage, name="extract")]
+            threads += [threading.Thread(target=transform_stage, args=(pool,), name=f"transform-{i}")
+                        for i in range(self.transform_workers)]
+            threads += [threading.Thread(target=load_stage, name=f"load-{i}") for i in range(self.load_workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        if errors:
+            raise errors[0]
+        return self.report()
+
+    def report(self):
+        return [metrics.snapshot() for metrics in self.metrics.values()]
+
+    def print_report(self):
+        print(f"{'stage':<10}{'workers':>8}{'items':>9}{'chunks':>8}{'items/s':>11}{'busy':>7}{'avg q':>7}{'max q':>7}")
+        for row in self.report():
+            print(f"{row['stage']:<10}{row['workers']:>8}{row['items']:>9}{row['chunks']:>8}"
+                  f"{row['items_per_second']:>11.0f}{row['utilisation']:>7.0%}"
+                  f"{row['avg_queue_depth']:>7.1f}{row['max_queue_depth']:>7}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Streaming ETL Classes
+StreamingETLBase keeps the original interface - extract(), transform(data), load(data), etl_process() - and adds
+extract_chunks(). The default extract_chunks just splits extract()'s list, so existing subclasses work unchanged;
+sources that can stream (files, paginated APIs) override it so the first chunk is available right away.
+etl_process(engine=None) runs the original sequential version; pass an ETLEngine to stream.
+transform_function() is what a process pool runs instead of transform(): a module-level function, or a partial of one
+holding just the settings it needs. A subclass that overrides transform() for a process pool overrides it too.
+"""
+def double_all(data):  # module-level, so it can be sent to a process pool
+    return [x * 2 for x in data]
+
+
+def raise_to(data, exponent):
+    return [x ** exponent for x in data]
+
+
+class StreamingETLBase:
+    def __init__(self, source):
+        self.source = source
+
+    def extract(self):
+        raise NotImplementedError("Subclasses must implement extract() or extract_chunks()")
+
+    def extract_chunks(self, chunk_size):
+        return chunked(self.extract(), chunk_size)
+
+    def transform(self, data):
+        return double_all(data)  # Common transformation logic
+
+    def transform_function(self):
+        return double_all
+
+    def load(self, data):
+        print("Loading transformed data ", data)
+
+    def etl_process(self, engine=None):
+        if engine is None:
+            raw_data = [x for chunk in self.extract_chunks(1 << 16) for x in chunk]
+            self.load(self.transform(raw_data))
+            return None
+        return engine.run(self)
+
+
+class CSVETL(StreamingETLBase):
+    # Reads one numeric column from a real file, a chunk of lines at a time
+    def extract_chunks(self, chunk_size):
+        with open(self.source) as file:
+            next(file)  # header
+            for lines in chunked(file, chunk_size):
+                yield [int(line.split(",", 1)[0]) for line in lines]
+
+
+class APIETL(StreamingETLBase):
+    # A paginated API stub: every page costs a network round trip
+    def __init__(self, source, pages=20, page_size=100, latency=0.01):
+        super().__init__(source)
+        self.pages = pages
+        self.page_size = page_size
+        self.latency = latency
+
+    def extract_chunks(self, chunk_size):
+        for page in range(self.pages):
+            time.sleep(self.latency)  # waiting on the network, not the CPU
+            yield list(range(page * self.page_size, (page + 1) * self.page_size))
+
+
+class CollectingLoadMixin:
+    # Collects loaded chunks instead of printing them, to check results in the demo
+    def __init__(self, *args, load_latency=0.0, transform_latency=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded = []
+        self.load_latency = load_latency
+        self.transform_latency = transform_latency
+
+    def transform(self, data):
+        time.sleep(self.transform_latency)  # e.g. an enrichment lookup per chunk
+        return super().transform(data)
+
+    def load(self, data):
+        time.sleep(self.load_latency)  # e.g. a bulk insert into a database
+        self.loaded.extend(data)
+
+
+class CollectingAPIETL(CollectingLoadMixin, APIETL):
+    pass
+
+
+class CollectingCSVETL(CollectingLoadMixin, CSVETL):
+    pass
+
+
+class CPUHeavyCSVETL(CollectingCSVETL):
+    exponent = 2
+
+    def transform(self, data):
+        return raise_to(data, self.exponent)
+
+    def transform_function(self):
+        return partial(raise_to, exponent=self.exponent)  # pickles the exponent, not self.loaded
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Demo: Overlapping I/O With Transformation
+The API ETL spends its time waiting: 10 ms per page to extract, 30 ms per chunk to transform and 5 ms per chunk to
+load. Sequentially these add up. Streamed, the stages overlap: with one transform worker the run takes as long as the
+transform stage alone, and with four workers the extract stage becomes the bottleneck (busy ~100% in the report).
+"""
+def timed_run(etl, engine=None):
+    start = time.perf_counter()
+    etl.etl_process(engine)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    pages, page_size = 40, 100
+    expected = [x * 2 for x in range(pages * page_size)]
+
+    serial = CollectingAPIETL("https://api.example.com/data", pages=pages, page_size=page_size,
+                              transform_latency=0.03, load_latency=0.005)
+    start = time.perf_counter()
+    for chunk in serial.extract_chunks(page_size):  # one stage at a time, nothing overlaps
+        serial.load(serial.transform(chunk))
+    serial_seconds = time.perf_counter() - start
+    print(f"sequential: {serial_seconds:.2f}s, correct: {serial.loaded == expected}")
+
+    for workers in (1, 4):
+        etl = CollectingAPIETL("https://api.example.com/data", pages=pages, page_size=page_size,
+                               transform_latency=0.03, load_latency=0.005)
+        engine = ETLEngine(chunk_size=page_size, queue_size=4, transform_workers=workers)
+        seconds = timed_run(etl, engine)
+        print(f"engine, {workers} transform worker(s): {seconds:.2f}s, correct: {etl.loaded == expected}")
+        engine.print_report()
+
+    # CSV source with a CPU-bound transform handed to a process pool
+    csv_path = "etl_engine_demo.csv"
+    with open(csv_path, "w") as file:
+        file.write("value,label\n")
+        file.writelines(f"{i},row{i}\n" for i in range(20_000))
+    try:
+        etl = CPUHeavyCSVETL(csv_path)
+        engine = ETLEngine(chunk_size=2000, transform_workers=2, transform_executor="process", process_workers=2)
+        seconds = timed_run(etl, engine)
+        print(f"CSV with process-pool transform: {seconds:.2f}s, "
+              f"correct: {etl.loaded == [i * i for i in range(20_000)]}")
+        engine.print_report()
+    finally:
+        os.remove(csv_path)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why stream an ETL job in chunks instead of processing whole lists?
+A: Memory stays bounded by (queue size x chunk size), the first results are loaded long before extraction finishes,
+and slow I/O in one stage overlaps with work in the others.
+
+Q: What is the purpose of bounded queues between stages?
+A: Backpressure. If load is slower than extract, an unbounded queue would buffer the whole dataset in memory; a bounded
+queue makes the producer wait until the consumer catches up.
+
+Q: Threads or processes for the transform stage?
+A: Threads when the work waits on I/O or runs in C code that releases the GIL (NumPy, compression, hashing);
+processes for pure-Python CPU work, at the cost of pickling every chunk to and from the workers.
+
+Q: How do you find the bottleneck in a pipeline?
+A: Look at the stage metrics: the bottleneck is busy close to 100% of the time (per worker), and the queue in front
+of it is usually full while the queues after it are usually empty.
+"""
@@ -0,0 +1,390 @@
+"""
+Fast, Typed CSV Extraction
+CSVETL.extract in 01_basics.py / 02_intermediate.py returns mock data. The usual first real version is a loop over
+csv.reader (or csv.DictReader) that converts each field and appends it to a list of rows. For large files the cost is
+almost entirely per-value Python work: a dict or list per row, a str per field, an int()/float() call per value.
+
+This extractor removes the per-row and per-value Python work:
+ > The file is read in large binary blocks that end on a newline, and each block is decoded and parsed in one go.
+ > A block without quotes is split into all of its fields with one str.split call, and each column is a slice of that
+   list. Blocks with quoted fields fall back to the C-level csv parser.
+ > Only the projected columns are kept, and each one is converted with array("q"/"d", map(int/float, ...)) - the loop
+   and the conversion both run in C, and numbers end up in compact typed arrays.
+ > The schema can be given, or inferred from a sample of rows (int -> float -> str).
+ > Batches of columns are yielded per block, so a file larger than memory can be streamed.
+ > Optionally, newline-aligned byte ranges are parsed in a process pool and the column pieces concatenated in order.
+
+Limitation: blocks are split at newlines, so quoted fields must not contain line breaks (pass quoted_newlines=True to
+use a slower, streaming csv.reader path that handles them).
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import csv
+import io
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+"""
+1. Schema Inference
+A column is int if every sampled value parses as int, else float if every value parses as float (empty values count
+as missing and make an int column float, since array("q") has no NaN), else str.
+"""
+TYPECODES = {"int": "q", "float": "d"}
+
+
+def infer_type(values):
+    def parses(converter):
+        try:
+            for value in values:
+                if value != "":
+                    converter(value)
+            return True
+        except ValueError:
+            return False
+    if any(value == "" for value in values):
+        return "float" if parses(float) else "str"
+    if parses(int):
+        return "int"
+    return "float" if parses(float) else "str"
+
+
+def read_header_and_sample(file_path, sample_rows=1000, encoding="utf-8", delimiter=","):
+    with open(file_path, newline="", encoding=encoding) as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader)
+        sample = [row for _, row in zip(range(sample_rows), reader)]
+    return header, sample
+
+
+def infer_schema(file_path, sample_rows=1000, encoding="utf-8", delimiter=","):
+    header, sample = read_header_and_sample(file_path, sample_rows, encoding, delimiter)
+    columns = list(zip(*sample)) if sample else [()] * len(header)
+    return {name: infer_type(values) for name, values in zip(header, columns)}
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Parsing One Block Into Typed Columns
+Fast path: when a block contains no quote characters, every newline is turned into a delimiter and the block is split
+once - a single C call that returns every field of every row in one flat list. Column i is then simply
+fields[i::width] (a C-level slice). If the block has quotes, or the field count doesn't match (ragged rows), the
+block is parsed with csv.reader instead, and columns are picked out with itemgetter.
+Conversion uses map(int/float, ...) into an array. Empty values in a float column become NaN.
+"""
+def convert_column(values, column_type, name):
+    if column_type == "str":
+        return list(values)
+    typecode = TYPECODES[column_type]
+    try:
+        return array(typecode, map(int if column_type == "int" else float, values))
+    except ValueError:
+        if column_type == "float":
+            try:
+                return array(typecode, map(float, [value or "nan" for value in values]))
+            except ValueError:
+                pass
+        converter = int if column_type == "int" else float
+        bad = next((value for value in values if not parses_as(converter, value)), None)
+        raise ValueError(f"column {name!r} was declared {column_type} but contains {bad!r}") from None
+
+
+def parses_as(converter, value):
+    try:
+        converter(value or "nan")
+        return True
+    except ValueError:
+        return False
+
+
+def split_fields(text, width, delimiter):
+    # Returns (fields, row_count) for a quote-free block, or None if the fast path can't be used
+    if '"' in text:
+        return None
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+    text = text.rstrip("\n")
+    if not text:
+        return [], 0
+    row_count = text.count("\n") + 1
+    fields = text.replace("\n", delimiter).split(delimiter)
+    return (fields, row_count) if len(fields) == row_count * width else None
+
+
+def parse_block(text, indices, names, types, delimiter, width):
+    split = split_fields(text, width, delimiter)
+    if split is not None:
+        fields, _ = split
+        columns = [fields[index::width] for index in indices]
+    else:
+        rows = list(csv.reader(io.StringIO(text), delimiter=delimiter))
+        columns = [list(map(itemgetter(index), rows)) for index in indices]
+    return {name: convert_column(column, column_type, name)
+            for name, column_type, column in zip(names, types, columns)}
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Block Reader
+Reads [start, end) of the file in blocks of roughly block_size bytes, each ending right after a newline. The range
+itself must start at the beginning of a line (byte 0 after the header, or a newline-aligned shard boundary).
+"""
+def iter_text_blocks(file_path, start, end, block_size, encoding):
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        remaining = end - start
+        carry = b""
+        while remaining > 0:
+            data = file.read(min(block_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            data = carry + data
+            cut = data.rfind(b"\n") + 1 if remaining > 0 else len(data)
+            if cut == 0:  # no newline in this block yet: a very long line, keep reading
+                carry = data
+                continue
+            carry = data[cut:]
+            yield data[:cut].decode(encoding)
+        if carry:
+            yield carry.decode(encoding)
+
+
+def header_end_offset(file_path):
+    with open(file_path, "rb") as file:
+        file.readline()
+        return file.tell()
+
+
+def newline_aligned_ranges(file_path, start, parts):
+    size = os.path.getsize(file_path)
+    step = max(1, (size - start) // parts)
+    boundaries = [start]
+    with open(file_path, "rb") as file:
+        for i in range(1, parts):
+            file.seek(start + i * step)
+            file.readline()
+            boundaries.append(min(file.tell(), size))
+    boundaries.append(size)
+    boundaries = sorted(set(boundaries))
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def parse_range(file_path, start, end, indices, names, types, width, block_size, encoding, delimiter):
+    # Worker function: parse one byte range into a single dict of columns
+    merged = {name: (array(TYPECODES[t]) if t in TYPECODES else []) for name, t in zip(names, types)}
+    for text in iter_text_blocks(file_path, start, end, block_size, encoding):
+        for name, column in parse_block(text, indices, names, types, delimiter, width).items():
+            merged[name].extend(column)
+    return merged
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. The Extractor
+ - iter_batches(): yields {column: typed column} per block - constant memory for any file size.
+ - read(): the whole file as one dict of columns; with workers > 1, byte ranges are parsed in a process pool.
+"""
+class CSVExtractor:
+    def __init__(self, file_path, columns=None, schema=None, block_size=8 * 1024 * 1024, encoding="utf-8",
+                 delimiter=",", quoted_newlines=False, sample_rows=1000):
+        self.file_path = file_path
+        self.block_size = block_size
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.quoted_newlines = quoted_newlines
+        header, _ = read_header_and_sample(file_path, 0, encoding, delimiter)
+        schema = dict(schema or {})
+        missing = [name for name in header if name not in schema]
+        if missing:
+            inferred = infer_schema(file_path, sample_rows, encoding, delimiter)
+            schema.update({name: inferred[name] for name in missing})
+        self.schema = {name: schema[name] for name in header}
+        self.width = len(header)
+        self.names = list(columns) if columns else header
+        unknown = set(self.names) - set(header)
+        if unknown:
+            raise KeyError(f"columns not in the file: {sorted(unknown)}")
+        self.indices = [header.index(name) for name in self.names]
+        self.types = [self.schema[name] for name in self.names]
+
+    def _parse_arguments(self):
+        return (self.indices, self.names, self.types, self.width, self.block_size, self.encoding,
+                self.delimiter)
+
+    def iter_batches(self):
+        if self.quoted_newlines:
+            yield from self._iter_batches_streaming()
+            return
+        start = header_end_offset(self.file_path)
+        for text in iter_text_blocks(self.file_path, start, os.path.getsize(self.file_path), self.block_size,
+                                     self.encoding):
+            yield parse_block(text, self.indices, self.names, self.types, self.delimiter, self.width)
+
+    def _iter_batches_streaming(self, batch_rows=100_000):
+        with open(self.file_path, newline="", encoding=self.encoding) as file:
+            reader = csv.reader(file, delimiter=self.delimiter)
+            next(reader)
+            pick = itemgetter(*self.indices)
+            while rows := [pick(row) for _, row in zip(range(batch_rows), reader)]:
+                columns = [[row] for row in rows] if len(self.indices) == 1 else rows
+                yield {name: convert_column(column, column_type, name)
+                       for name, column_type, column in zip(self.names, self.types, zip(*columns))}
+
+    def read(self, workers=1):
+        if workers <= 1 or self.quoted_newlines:
+            pieces = self.iter_batches()
+        else:
+            ranges = newline_aligned_ranges(self.file_path, header_end_offset(self.file_path), workers)
+            pool = ProcessPoolExecutor(max_workers=workers)
+            pieces = pool.map(parse_range, *zip(*[(self.file_path, start, end, *self._parse_arguments())
+                                                   for start, end in ranges]))
+        result = {name: (array(TYPECODES[t]) if t in TYPECODES else []) for name, t in zip(self.names, self.types)}
+        try:
+            for piece in pieces:  # in file order for both paths
+                for name, column in piece.items():
+                    result[name].extend(column)
+        finally:
+            if workers > 1 and not self.quoted_newlines:
+                pool.shutdown()
+        return result
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. CSVETL With a Real Extract
+extract() returns typed columns; transform doubles every numeric column, as the original CSVETL did with its list.
+"""
+class CSVETL:
+    def __init__(self, source, columns=None, schema=None, workers=1):
+        self.source = source
+        self.extractor = CSVExtractor(source, columns=columns, schema=schema)
+        self.workers = workers
+
+    def extract(self):
+        print("Extracting data from CSV: ", self.source)
+        return self.extractor.read(self.workers)
+
+    def transform(self, data):
+        return {name: array(column.typecode, (x * 2 for x in column)) if isinstance(column, array) else column
+                for name, column in data.items()}
+
+    def load(self, data):
+        print("Loading transformed data ", {name: list(column[:5]) for name, column in data.items()})
+
+    def etl_process(self):
+        self.load(self.transform(self.extract()))
+
+
+def make_sample_csv(target_bytes, seed=0):
+    rng = random.Random(seed)
+    handle, path = tempfile.mkstemp(suffix=".csv")
+    cities = ["London", "Paris", "Berlin", "Madrid", "Rome"]
+    with os.fdopen(handle, "w") as file:
+        file.write("id,price,quantity,city,score\n")
+        row_id = 0
+        while file.tell() < target_bytes:
+            lines = []
+            for _ in range(10_000):
+                lines.append(f"{row_id},{rng.uniform(1, 500):.2f},{rng.randint(1, 50)},{rng.choice(cities)},"
+                             f"{'' if row_id % 97 == 0 else rng.random():.6}\n")
+                row_id += 1
+            file.write("".join(lines))
+    return path
+
+
+def demo():
+    sample_path = make_sample_csv(200_000)
+    try:
+        extractor = CSVExtractor(sample_path)
+        print(extractor.schema)  # score has empty values, so it is inferred as float (missing -> NaN)
+        projected = CSVExtractor(sample_path, columns=["price", "city"]).read()
+        print({name: (type(column).__name__, len(column), list(column[:3])) for name, column in projected.items()})
+        CSVETL(sample_path, columns=["id", "quantity"]).etl_process()
+    finally:
+        os.remove(sample_path)
+
+    quoted_path = tempfile.mkstemp(suffix=".csv")[1]
+    with open(quoted_path, "w") as file:
+        file.write('city,population\n"Rome, IT",2873000\nParis,2161000\n"Washington, D.C.",689545\n')
+    try:
+        print(CSVExtractor(quoted_path).read())  # quoted block: parsed by the csv module fallback
+    finally:
+        os.remove(quoted_path)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+6. Benchmark Against a Naive csv.reader Loop
+The default input is 20 MB so the script finishes quickly; pass a size in MB on the command line (for example
+`python 08_advanced_csv_extraction.py 1024`) to run it on a 1 GB file.
+Expect a modest gain in pure Python (roughly 1.2-2x, more with projection): creating one str per field and calling
+int()/float() per value still dominates. Parsers that write straight into typed buffers in C (pyarrow.csv, Polars)
+are the next step for order-of-magnitude gains.
+"""
+def naive_extract(file_path, columns):
+    # The usual first version: one csv.reader loop, converting and appending value by value
+    result = {name: [] for name in columns}
+    with open(file_path, newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        positions = [(name, header.index(name)) for name in columns]
+        for row in reader:
+            for name, position in positions:
+                value = row[position]
+                if name == "city":
+                    result[name].append(value)
+                elif name in ("id", "quantity"):
+                    result[name].append(int(value))
+                else:
+                    result[name].append(float(value) if value else math.nan)
+    return result
+
+
+def same_columns(left, right):
+    return all(len(left[name]) == len(right[name]) and
+               all(a == b or (a != a and b != b) for a, b in zip(left[name], right[name])) for name in left)
+
+
+def benchmark(size_mb=20, workers=(2, 4)):
+    path = make_sample_csv(size_mb * 1024 * 1024)
+    try:
+        print(f"{os.path.getsize(path) / 2**20:.0f} MB CSV")
+        for columns in (["id", "price", "quantity", "city", "score"], ["price", "score"]):
+            start = time.perf_counter()
+            expected = naive_extract(path, columns)
+            naive_seconds = time.perf_counter() - start
+            print(f"  columns {columns}")
+            print(f"    naive csv.reader loop     {naive_seconds:>7.2f}s")
+
+            start = time.perf_counter()
+            result = CSVExtractor(path, columns=columns).read()
+            seconds = time.perf_counter() - start
+            print(f"    CSVExtractor              {seconds:>7.2f}s ({naive_seconds / seconds:.1f}x), "
+                  f"same: {same_columns(expected, result)}")
+            for count in workers:
+                start = time.perf_counter()
+                result = CSVExtractor(path, columns=columns).read(workers=count)
+                seconds = time.perf_counter() - start
+                print(f"    CSVExtractor, {count} processes {seconds:>7.2f}s ({naive_seconds / seconds:.1f}x), "
+                      f"same: {same_columns(expected, result)}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why is a naive csv.reader loop slow on large files?
+A: The parsing itself is in C, but everything after it - creating the row, converting each field, appending to a
+list - is Python bytecode executed once per value, and each number becomes a separate Python object.
+
+Q: What is column projection, and why does it help?
+A: Reading only the columns you need. Unneeded fields are never converted or stored, which saves both time and memory;
+columnar formats like Parquet go further and don't even read them from disk.
+
+Q: Why store numeric columns in typed arrays?
+A: array("d") stores raw 8-byte doubles contiguously, instead of a list of pointers to 24-byte float objects. It uses
+about a third of the memory and can be handed to NumPy without copying.
+
+Q: How do you parse one CSV file with several processes?
+A: Split it into byte ranges aligned to line boundaries, parse each range in its own process, and concatenate the
+per-range columns in order. This is only safe when quoted fields can't contain newlines.
+"""
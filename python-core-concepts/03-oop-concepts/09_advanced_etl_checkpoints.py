@@ -0,0 +1,294 @@
+"""
+Checkpointed, Incremental ETL Runs
+Every etl_process() call in 01_basics.py / 02_intermediate.py re-extracts and re-transforms the whole source. For a
+daily job where most of the input hasn't changed, that is wasted work - and if the job crashes at 90%, the rerun starts
+again from 0%.
+
+Checkpointing stores "how far did we get?" per source in a small state database (SQLite here):
+ > A watermark: the position of the last record that was loaded - e.g. (updated_at, id) for a table, or a byte offset
+   for an append-only file. The next run only extracts records after it (incremental extraction).
+ > A content hash of what was already processed, to detect when a source was rewritten rather than appended to - then
+   the watermark is no longer valid and the source is processed from the start.
+ > The checkpoint advances after every chunk, in the same transaction as the chunk's load. Either both happen or
+   neither does, so a crashed run resumes at the first chunk that wasn't loaded, and no chunk is loaded twice.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+"""
+1. The Checkpoint Store
+One row per source. The watermark is stored as JSON so each source type can use its own shape.
+The store shares its connection with the load target (the "warehouse"), so that loading a chunk and saving the
+checkpoint can be committed together. With a separate target, make the load idempotent (an upsert by key) instead:
+a crash between load and checkpoint then only repeats work, it never duplicates rows.
+"""
+class CheckpointStore:
+    def __init__(self, connection):
+        self.connection = connection
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS etl_checkpoints (
+                source TEXT PRIMARY KEY,
+                watermark TEXT,
+                content_hash TEXT,
+                chunks_loaded INTEGER NOT NULL DEFAULT 0,
+                rows_loaded INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL
+            )""")
+        self.connection.commit()
+
+    def get(self, source):
+        row = self.connection.execute(
+            "SELECT watermark, content_hash, chunks_loaded, rows_loaded FROM etl_checkpoints WHERE source = ?",
+            (source,)).fetchone()
+        if row is None:
+            return {"watermark": None, "content_hash": None, "chunks_loaded": 0, "rows_loaded": 0}
+        watermark, content_hash, chunks_loaded, rows_loaded = row
+        return {"watermark": json.loads(watermark) if watermark is not None else None,
+                "content_hash": content_hash, "chunks_loaded": chunks_loaded, "rows_loaded": rows_loaded}
+
+    def advance(self, source, watermark, content_hash, rows):
+        # Called inside the load transaction - committed (or rolled back) together with the chunk
+        self.connection.execute("""
+            INSERT INTO etl_checkpoints (source, watermark, content_hash, chunks_loaded, rows_loaded, updated_at)
+            VALUES (?, ?, ?, 1, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                watermark = excluded.watermark,
+                content_hash = excluded.content_hash,
+                chunks_loaded = chunks_loaded + 1,
+                rows_loaded = rows_loaded + excluded.rows_loaded,
+                updated_at = excluded.updated_at""",
+            (source, json.dumps(watermark), content_hash, rows, time.time()))
+
+    def reset(self, source):
+        with self.connection:
+            self.connection.execute("DELETE FROM etl_checkpoints WHERE source = ?", (source,))
+
+    @contextmanager
+    def transaction(self):
+        with self.connection:  # commits on success, rolls back on any exception
+            yield self.connection
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. The Checkpointed ETL Base Class
+Subclasses implement extract_since(checkpoint), which yields (chunk, watermark, content_hash) - the watermark and hash
+describe the source *after* that chunk. transform() and load() keep their usual roles; load() receives the open
+transaction so it writes in the same commit as the checkpoint.
+"""
+class CheckpointedETL:
+    def __init__(self, source, store, chunk_size=1000):
+        self.source = source
+        self.store = store
+        self.chunk_size = chunk_size
+
+    @property
+    def source_id(self):
+        return self.source  # the checkpoint key: the same source always resumes from the same checkpoint
+
+    def extract_since(self, checkpoint):
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def transform(self, data):
+        return [(key, value * 2) for key, value in data]  # Common transformation logic
+
+    def load(self, data, connection):
+        # An upsert: loading the same key twice leaves one row, so reprocessing can never create duplicates
+        connection.executemany("INSERT OR REPLACE INTO warehouse (key, value) VALUES (?, ?)", data)
+
+    def etl_process(self):
+        checkpoint = self.store.get(self.source_id)
+        chunks = rows = 0
+        for chunk, watermark, content_hash in self.extract_since(checkpoint):
+            with self.store.transaction() as connection:
+                self.load(self.transform(chunk), connection)
+                self.store.advance(self.source_id, watermark, content_hash, len(chunk))
+            chunks += 1
+            rows += len(chunk)
+        return {"chunks": chunks, "rows": rows}
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Source Type 1: A Table With an updated_at Column
+The watermark is the (updated_at, id) of the last loaded row. Using both columns makes the order strict, so rows that
+share a timestamp are neither skipped nor repeated at a chunk boundary. Each chunk is one keyset-paginated query:
+    WHERE (updated_at, id) > (?, ?) ORDER BY updated_at, id LIMIT ?
+An index on (updated_at, id) makes that a range scan that only touches new or changed rows.
+This assumes updated_at only grows. A row committed late with an older timestamp would be missed, so production jobs
+often re-read a small overlap window behind the watermark and rely on the idempotent load to absorb the repeats.
+"""
+class TableETL(CheckpointedETL):
+    def __init__(self, source, store, source_connection, chunk_size=1000):
+        super().__init__(source, store, chunk_size)
+        self.source_connection = source_connection
+
+    def extract_since(self, checkpoint):
+        last_updated, last_id = checkpoint["watermark"] or (-1.0, -1)
+        while True:
+            rows = self.source_connection.execute(
+                f"SELECT id, value, updated_at FROM {self.source} WHERE (updated_at, id) > (?, ?) "
+                "ORDER BY updated_at, id LIMIT ?", (last_updated, last_id, self.chunk_size)).fetchall()
+            if not rows:
+                return
+            last_id, _, last_updated = rows[-1]
+            yield [(f"{self.source}:{row_id}", value) for row_id, value, _ in rows], [last_updated, last_id], None
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Source Type 2: An Append-Only CSV File
+The watermark is the byte offset after the last loaded line, and content_hash is a hash of every byte before it.
+On the next run the same prefix is hashed again:
+ - same hash: the file was only appended to, so reading continues at the offset;
+ - different hash (or a shorter file): the file was rewritten, so it is processed from the start.
+The hash is updated incrementally chunk by chunk, so checking it costs one sequential read of the old part of the
+file - much cheaper than re-parsing, re-transforming and re-loading it.
+"""
+def hash_prefix(file_path, length, block_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        remaining = length
+        while remaining > 0 and (block := file.read(min(block_size, remaining))):
+            digest.update(block)
+            remaining -= len(block)
+    return digest, length - remaining
+
+
+class AppendOnlyCSVETL(CheckpointedETL):
+    def extract_since(self, checkpoint):
+        offset = checkpoint["watermark"] or 0
+        digest = hashlib.blake2b(digest_size=16)
+        if offset:
+            digest, hashed = hash_prefix(self.source, offset)
+            if hashed != offset or digest.hexdigest() != checkpoint["content_hash"]:
+                offset, digest = 0, hashlib.blake2b(digest_size=16)  # rewritten: start over
+
+        with open(self.source, "rb") as file:
+            if offset == 0:
+                header = file.readline()
+                digest.update(header)
+                offset = len(header)
+            file.seek(offset)
+            while True:
+                lines = [line for _, line in zip(range(self.chunk_size), file) if line.endswith(b"\n")]
+                if not lines:
+                    return  # a trailing line without "\n" may still be being written: pick it up next run
+                for line in lines:
+                    digest.update(line)
+                offset += sum(map(len, lines))
+                file.seek(offset)
+                rows = [line.decode().rstrip("\r\n").split(",") for line in lines]
+                yield [(f"csv:{row_id}", float(value)) for row_id, value in rows], offset, digest.hexdigest()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. Demo: Crash and Resume, Incremental Reruns, a Rewritten File
+"""
+class CrashingTableETL(TableETL):
+    # Simulates a job that dies while loading its third chunk of this run
+    def __init__(self, *args, crash_after_chunks, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.remaining = crash_after_chunks
+
+    def load(self, data, connection):
+        super().load(data, connection)
+        if self.remaining == 0:
+            raise RuntimeError("simulated crash while loading")
+        self.remaining -= 1
+
+
+def warehouse_count(connection, prefix):
+    return connection.execute("SELECT COUNT(*) FROM warehouse WHERE key LIKE ?", (prefix + "%",)).fetchone()[0]
+
+
+workdir = tempfile.mkdtemp()
+state = sqlite3.connect(os.path.join(workdir, "warehouse.sqlite"))  # checkpoints + loaded data, one transaction
+state.execute("CREATE TABLE warehouse (key TEXT PRIMARY KEY, value REAL)")
+store = CheckpointStore(state)
+
+source = sqlite3.connect(os.path.join(workdir, "source.sqlite"))
+source.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, value REAL, updated_at REAL)")
+source.execute("CREATE INDEX events_updated ON events (updated_at, id)")
+with source:
+    source.executemany("INSERT INTO events VALUES (?, ?, ?)", [(i, i, 1000.0 + i // 10) for i in range(5000)])
+
+crashing = CrashingTableETL("events", store, source, chunk_size=1000, crash_after_chunks=2)
+try:
+    crashing.etl_process()
+except RuntimeError as error:
+    print(f"run 1: {error}; checkpoint: {store.get(crashing.source_id)}, "
+          f"rows in warehouse: {warehouse_count(state, 'events:')}")  # the failed chunk was rolled back
+
+table_etl = TableETL("events", store, source, chunk_size=1000)
+print("run 2 (resume):", table_etl.etl_process(), "| rows in warehouse:", warehouse_count(state, "events:"))
+print("run 3 (nothing new):", table_etl.etl_process())
+with source:
+    source.execute("UPDATE events SET value = -1, updated_at = 2000 WHERE id IN (10, 20)")
+    source.executemany("INSERT INTO events VALUES (?, ?, ?)", [(i, i, 2000.0) for i in range(5000, 5100)])
+print("run 4 (2 updated + 100 new rows):", table_etl.etl_process())
+
+csv_path = os.path.join(workdir, "readings.csv")
+with open(csv_path, "w") as file:
+    file.write("id,value\n" + "".join(f"{i},{i * 0.5}\n" for i in range(3000)))
+csv_etl = AppendOnlyCSVETL(csv_path, store, chunk_size=1000)
+print("csv run 1:", csv_etl.etl_process())
+with open(csv_path, "a") as file:
+    file.write("".join(f"{i},{i * 0.5}\n" for i in range(3000, 3250)))
+print("csv run 2 (appended 250 lines):", csv_etl.etl_process())
+with open(csv_path, "w") as file:
+    file.write("id,value\n" + "".join(f"{i},{i * 0.25}\n" for i in range(3000)))
+print("csv run 3 (file rewritten):", csv_etl.etl_process())
+# The rewrite reloaded every row, but rows 3000-3249 from the old version are still in the warehouse: when a source
+# can shrink, the rows it loaded should be deleted when a rewrite is detected (or the target replaced as a whole).
+print("warehouse rows:", warehouse_count(state, "csv:"), "csv +", warehouse_count(state, "events:"), "events")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+6. Benchmark: Full Rerun vs Incremental Rerun
+A daily job over 200,000 rows where 1% changed since the last run.
+"""
+def benchmark(total=200_000, changed=2_000):
+    source.execute("DELETE FROM events")
+    with source:
+        source.executemany("INSERT INTO events VALUES (?, ?, ?)", [(i, i, 3000.0) for i in range(total)])
+    store.reset("events")
+    etl = TableETL("events", store, source, chunk_size=5000)
+    etl.etl_process()  # first run: everything
+
+    with source:
+        source.execute("UPDATE events SET value = value + 1, updated_at = 4000 WHERE id < ?", (changed,))
+
+    start = time.perf_counter()
+    incremental = etl.etl_process()
+    incremental_seconds = time.perf_counter() - start
+
+    store.reset("events")
+    start = time.perf_counter()
+    full = etl.etl_process()
+    full_seconds = time.perf_counter() - start
+    print(f"full rerun: {full['rows']} rows in {full_seconds:.2f}s, incremental rerun: {incremental['rows']} rows "
+          f"in {incremental_seconds:.3f}s ({full_seconds / incremental_seconds:.0f}x faster)")
+
+benchmark()
+state.close()
+source.close()
+for name in os.listdir(workdir):
+    os.remove(os.path.join(workdir, name))
+os.rmdir(workdir)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What is a watermark in incremental ETL?
+A: The position up to which a source has been processed - typically the highest updated_at (plus a tie-breaker such
+as the id) already loaded. The next run only extracts records after it.
+
+Q: How do you make an ETL job resumable after a crash?
+A: Process the data in chunks and save a checkpoint after each chunk. If the checkpoint is committed in the same
+transaction as the load, a crash can only lose the chunk in progress, which is then redone on the next run.
+
+Q: What is idempotency, and why does it matter for ETL?
+A: Running the same load twice gives the same result as running it once (e.g. upserts by key instead of plain
+inserts). It makes retries and reprocessing safe when exactly-once delivery can't be guaranteed.
+
+Q: Why isn't a timestamp watermark alone enough for files?
+A: Files don't carry per-row timestamps, and they can be rewritten as well as appended to. A byte offset plus a hash
+of the already-processed prefix detects both cases.
+"""
@@ -0,0 +1,365 @@
+"""
+A Content-Addressed On-Disk Cache for Pipeline Steps
+Steps like BaseModel.preprocess and PreProcessor.clean (01_basics.py) or the ETL transform methods are
+deterministic: the same input always gives the same output. Yet every run recomputes them, so tweaking a downstream
+step means waiting for every upstream step again.
+
+A content-addressed cache stores each result under a key derived from *what* was computed:
+ > key = hash(input data + the function's code + an optional version string). Change the data or edit the function and
+   the key changes, so stale results are never returned - there is nothing to invalidate by hand.
+ > Hashing uses BLAKE2b over raw buffers: typed arrays and NumPy arrays are hashed straight from memory without
+   conversion; other values are pickled first.
+ > Results are stored on disk in a compact binary format: arrays as a small header plus their raw bytes (so they can
+   be memory-mapped back without reading the whole file), everything else as pickle.
+ > A size budget is enforced with LRU eviction, and hits, misses and evictions are counted so the hit rate is visible.
+ > Writes go to a temporary file that is atomically renamed, so a crash never leaves a half-written entry and readers
+   in other processes never see one. Each StepCache keeps its own in-memory index, though: sharing a directory between
+   processes that run at the same time is safe, but none of them sees the others' new entries until it reopens the
+   cache, and each enforces the size budget on its own entries only.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import atexit
+import hashlib
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+from array import array
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+try:
+    import numpy as np  # optional: NumPy arrays are stored as raw buffers and loaded memory-mapped
+except ImportError:
+    np = None
+
+"""
+1. Fingerprints
+fingerprint() feeds a value into a BLAKE2b hash. Buffers (bytes, array.array, contiguous NumPy arrays) are hashed
+directly - a few GB/s - together with their type and shape, so array("d", [1.0]) and array("q", [1]) differ.
+code_fingerprint() hashes the function's bytecode, constants and names (recursing into nested functions such as
+lambdas and comprehensions), so editing the function body changes the key. function_fingerprint() adds the default
+arguments and the values the function closes over, which change its result just as much. Changes in *other* functions
+it calls by name are not detected - bump version= for those.
+"""
+def fingerprint(value, digest):
+    if isinstance(value, (bytes, bytearray)):
+        digest.update(b"bytes")
+        digest.update(value)
+    elif isinstance(value, array):
+        digest.update(f"array:{value.typecode}".encode())
+        digest.update(memoryview(value))
+    elif np is not None and isinstance(value, np.ndarray):
+        digest.update(f"ndarray:{value.dtype.str}:{value.shape}".encode())
+        digest.update(memoryview(np.ascontiguousarray(value)).cast("B"))
+    else:
+        digest.update(b"pickle")
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def code_fingerprint(code, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for constant in code.co_consts:
+        if hasattr(constant, "co_code"):
+            code_fingerprint(constant, digest)
+        else:
+            digest.update(repr(constant).encode())
+
+
+def function_fingerprint(func, digest):
+    code_fingerprint(func.__code__, digest)
+    fingerprint((func.__defaults__, func.__kwdefaults__), digest)
+    for cell in func.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:  # a cell that has not been assigned yet
+            continue
+        if hasattr(value, "__code__"):
+            function_fingerprint(value, digest)
+        elif isinstance(value, type):  # e.g. the __class__ cell of a method using super()
+            digest.update(f"{value.__module__}.{value.__qualname__}".encode())
+        else:
+            fingerprint(value, digest)
+
+
+def make_key(func, version, args, kwargs):
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{func.__module__}.{func.__qualname__}:{version}".encode())
+    function_fingerprint(func, digest)
+    for argument in args:
+        # For methods, self is part of the input: its attributes (e.g. self.data) are fingerprinted too
+        fingerprint(vars(argument) if hasattr(argument, "__dict__") and not callable(argument) else argument, digest)
+    for name in sorted(kwargs):
+        digest.update(name.encode())
+        fingerprint(kwargs[name], digest)
+    return digest.hexdigest()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. The Binary Entry Format
+    magic (4 bytes) | kind (1 byte) | header length (4 bytes) | header | payload
+ - kind "a": array.array - header is the typecode, payload the raw items.
+ - kind "n": NumPy array - header is "dtype|shape", payload the raw C-order bytes.
+ - kind "p": anything else - payload is a pickle.
+Array payloads can be loaded with mmap=True: the OS maps the file and pages it in on demand, so a 1 GB cached array
+is "loaded" instantly and only the parts that are actually read cost I/O.
+"""
+MAGIC = b"SCv1"
+PREFIX = struct.Struct("<4scI")
+
+
+def encode(value):
+    if isinstance(value, array):
+        return b"a", value.typecode.encode(), memoryview(value).cast("B")
+    if np is not None and isinstance(value, np.ndarray) and value.dtype != object:
+        value = np.ascontiguousarray(value)
+        header = f"{value.dtype.str}|{','.join(map(str, value.shape))}".encode()
+        return b"n", header, memoryview(value).cast("B")
+    return b"p", b"", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def write_entry(path, value):
+    kind, header, payload = encode(value)
+    header += b" " * (-(PREFIX.size + len(header)) % 16)  # pad so the payload is aligned for memory-mapping
+    directory = os.path.dirname(path)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(PREFIX.pack(MAGIC, kind, len(header)))
+            file.write(header)
+            file.write(payload)
+        os.replace(temporary, path)  # atomic: readers see either no entry or a complete one
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def read_entry(path, use_mmap=False):
+    with open(path, "rb") as file:
+        magic, kind, header_length = PREFIX.unpack(file.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a cache entry")
+        header = file.read(header_length).decode().rstrip()
+        offset = PREFIX.size + header_length
+        if kind == b"p":
+            return pickle.loads(file.read())
+        if kind == b"n":
+            dtype, shape = header.split("|")
+            shape = tuple(int(size) for size in shape.split(",") if size)
+            if np is None:
+                raise RuntimeError("this entry holds a NumPy array, but NumPy is not installed")
+            if use_mmap:
+                return np.memmap(path, dtype=np.dtype(dtype), mode="r", offset=offset, shape=shape)
+            values = np.empty(shape, dtype=np.dtype(dtype))  # a writable array the caller owns
+            file.readinto(memoryview(values).cast("B"))
+            return values
+        if use_mmap:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return memoryview(mapped)[offset:].cast(header)  # zero-copy, read-only view of the items
+        values = array(header)
+        values.frombytes(file.read())
+        return values
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. The Cache
+The LRU order and sizes are kept in memory (an OrderedDict, like LRUStore in 02-functions/09_advanced_memoization.py)
+and rebuilt from the files' modification times when the cache is opened. A hit "touches" the file, so the order
+survives restarts. When a new entry pushes the total over max_bytes, the least recently used entries are deleted.
+"""
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "entries", "bytes", "hit_rate"])
+
+
+class StepCache:
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp"):
+                os.remove(path)  # left behind by a crashed writer
+            elif name.endswith(".bin"):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        self.entries = OrderedDict((key, size) for _, key, size in sorted(entries))  # oldest first
+        self.total_bytes = sum(self.entries.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def get(self, key, use_mmap=False):
+        if key not in self.entries:
+            self.misses += 1
+            return None, False
+        try:
+            value = read_entry(self._path(key), use_mmap)
+        except FileNotFoundError:  # evicted by another process sharing the directory
+            self.total_bytes -= self.entries.pop(key)
+            self.misses += 1
+            return None, False
+        self.entries.move_to_end(key)
+        os.utime(self._path(key))
+        self.hits += 1
+        return value, True
+
+    def put(self, key, value):
+        path = self._path(key)
+        write_entry(path, value)
+        size = os.path.getsize(path)
+        self.total_bytes += size - self.entries.pop(key, 0)
+        self.entries[key] = size
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            victim, victim_size = self.entries.popitem(last=False)
+            try:
+                os.remove(self._path(victim))
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= victim_size
+            self.evictions += 1
+
+    def info(self):
+        lookups = self.hits + self.misses
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self.entries), self.total_bytes,
+                         self.hits / lookups if lookups else 0.0)
+
+    def clear(self):
+        for key in list(self.entries):
+            os.remove(self._path(key))
+        self.entries.clear()
+        self.total_bytes = 0
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. The cached_step Decorator
+Works on functions and methods. For a method, the instance's attributes are part of the key, so
+PreProcessor(data).clean is cached per dataset. Methods that modify self instead of returning a value (like
+PreProcessor.clean) are wrapped so they return the new state - see CachedPreProcessor below.
+"""
+def cached_step(cache, version="", use_mmap=False):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(func, version, args, kwargs)
+            value, found = cache.get(key, use_mmap)
+            if found:
+                return value
+            value = func(*args, **kwargs)
+            cache.put(key, value)
+            return value
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. Caching the Repo's Pipeline Steps
+Two "runs" share one cache directory. The second run uses a fresh StepCache object (as a new process would) and
+every step is a hit. Editing a step's code (simulated with a new version string) makes only that step recompute.
+"""
+cache_directory = tempfile.mkdtemp(prefix="step_cache_")
+atexit.register(shutil.rmtree, cache_directory, True)
+
+
+def build_pipeline(cache, transform_version=""):
+    class CachedBaseModel:
+        def __init__(self, data):
+            self.data = data
+
+        @cached_step(cache)
+        def preprocess(self):
+            low, high = min(self.data), max(self.data)
+            time.sleep(0.2)  # stands in for an expensive computation
+            span = (high - low) or 1.0
+            return array("d", [(x - low) / span for x in self.data])  # Min-Max Scaling
+
+    class CachedPreProcessor:
+        def __init__(self, data):
+            self.data = data
+
+        @cached_step(cache)
+        def _cleaned(self):
+            time.sleep(0.2)
+            return [x for x in self.data if x is not None]  # Removes missing values
+
+        def clean(self):
+            self.data = self._cleaned()
+
+    class CachedCSVETL:
+        @cached_step(cache, version=transform_version)
+        def transform(self, data):
+            time.sleep(0.2)
+            return [x * 2 for x in data]  # Common transformation logic
+
+    return CachedBaseModel, CachedPreProcessor, CachedCSVETL
+
+
+def run_pipeline(cache, transform_version=""):
+    CachedBaseModel, CachedPreProcessor, CachedCSVETL = build_pipeline(cache, transform_version)
+    start = time.perf_counter()
+    scaled = CachedBaseModel([10, 20, -30, 50, 5, 9.5]).preprocess()
+    cleaner = CachedPreProcessor([1, None, 3, None, 5])
+    cleaner.clean()
+    transformed = CachedCSVETL().transform([1, 2, 3, 5])
+    return time.perf_counter() - start, list(scaled), cleaner.data, transformed
+
+
+for label, version in [("run 1 (cold cache)", ""), ("run 2 (new process)", ""), ("run 3 (transform edited)", "2")]:
+    cache = StepCache(cache_directory, max_bytes=1024 * 1024)
+    seconds, *results = run_pipeline(cache, version)
+    print(f"{label}: {seconds:.2f}s, {cache.info()}")
+print(results)
+
+# Size budget: entries beyond max_bytes are evicted, least recently used first
+small = StepCache(os.path.join(cache_directory, "small"), max_bytes=100_000)
+for i in range(10):
+    small.put(f"entry{i}", array("d", [float(i)] * 2000))  # 16 KB each
+print(small.info())
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+6. Benchmark: Hashing, Storing and Loading a Large Array
+The key costs one hash over the input; a hit costs one read (or an mmap, which is nearly free until the data is
+touched). Both are far cheaper than recomputing any non-trivial step.
+"""
+big = array("d", range(5_000_000))  # 40 MB
+cache = StepCache(os.path.join(cache_directory, "big"))
+
+start = time.perf_counter()
+digest = hashlib.blake2b(digest_size=20)
+fingerprint(big, digest)
+hash_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+cache.put("big", big)
+put_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+loaded, _ = cache.get("big")
+get_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+mapped, _ = cache.get("big", use_mmap=True)
+mmap_seconds = time.perf_counter() - start
+print(f"40 MB array - hash: {hash_seconds:.3f}s, store: {put_seconds:.3f}s, load: {get_seconds:.3f}s, "
+      f"mmap load: {mmap_seconds:.5f}s, same: {loaded == big and mapped[-1] == big[-1]}")
+del mapped
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What is content-addressed storage?
+A: Storing data under a key computed from its content (or, for a cache, from the inputs that produced it). Identical
+inputs map to the same key, and any change produces a new key, so entries never need manual invalidation.
+
+Q: Why include the function's code in the cache key?
+A: If the function changes, old results are no longer valid. Hashing the code (or a version string) makes an edited
+step miss the cache automatically instead of silently returning outdated results.
+
+Q: Why write cache entries to a temporary file and rename them?
+A: A rename is atomic on the same filesystem: other readers see either the old state or the complete new file, never
+a half-written one - even if the writer crashes midway.
+
+Q: What is a good way to judge whether a cache is worth it?
+A: Measure the hit rate and compare the cost of a hit (hashing + loading) with the cost of recomputing. A low hit rate
+or a step that is cheaper than its own hashing means the cache only adds overhead.
+"""
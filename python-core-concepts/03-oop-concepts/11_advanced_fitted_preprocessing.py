@@ -0,0 +1,182 @@
+"""
+Fitted Preprocessing: Compute the Statistics Once, Reuse Them Everywhere
+BaseModel.preprocess in 01_basics.py used to evaluate min(self.data) twice and max(self.data) once *for every element*:
+ > Each call scans the whole list, so n elements cost about 3n^2 comparisons - 10^5 rows take minutes.
+ > The denominator was min - max, which is negative, so every scaled value came out in [-1, 0] instead of [0, 1].
+
+The fix has two parts:
+ > 01_basics.py now computes min and max once before the comprehension and divides by max - min (or by 1 when the
+   data is constant, instead of raising ZeroDivisionError).
+ > Here, preprocessing becomes a *fitted transform* (like scikit-learn's MinMaxScaler): fit() computes the statistics
+   once (or incrementally with partial_fit), transform() applies them in one vectorised pass. One fitted transform is
+   shared by LogisticRegressionModel, DecisionTreeModel and any future subclass, so no model recomputes min/max, and
+   new data (a test set, live predictions) is scaled with the *training* statistics - as it must be.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import time
+from array import array
+
+try:
+    import numpy as np  # optional: fit and transform run as whole-array operations
+except ImportError:
+    np = None
+
+"""
+1. The Fitted Transform
+This is MinMaxNormaliser from 02-functions/17_advanced_streaming_normaliser.py, trimmed to the [0, 1] range and the
+methods BaseModel needs; the x * scale + offset form and the constant-data guard are explained there.
+"""
+class MinMaxNormaliser:  # from 02-functions/17_advanced_streaming_normaliser.py, trimmed
+    def __init__(self):
+        self.data_min = None
+        self.data_max = None
+        self.n_samples_seen = 0
+
+    def partial_fit(self, chunk):
+        if np is not None and isinstance(chunk, np.ndarray):
+            if chunk.size == 0:
+                return self
+            chunk_min, chunk_max = np.nanmin(chunk, axis=0), np.nanmax(chunk, axis=0)
+            if self.data_min is not None:
+                chunk_min = np.minimum(chunk_min, self.data_min)
+                chunk_max = np.maximum(chunk_max, self.data_max)
+            self.n_samples_seen += len(chunk)
+        else:
+            if not isinstance(chunk, (list, tuple, array)):
+                chunk = list(chunk)
+            if not chunk:
+                return self
+            chunk_min, chunk_max = min(chunk), max(chunk)
+            if self.data_min is not None:
+                chunk_min, chunk_max = min(chunk_min, self.data_min), max(chunk_max, self.data_max)
+            self.n_samples_seen += len(chunk)
+        self.data_min, self.data_max = chunk_min, chunk_max
+        return self
+
+    def fit(self, data):
+        self.data_min = self.data_max = None
+        self.n_samples_seen = 0
+        return self.partial_fit(data)
+
+    @property
+    def is_fitted(self):
+        return self.data_min is not None
+
+    def _parameters(self):
+        if not self.is_fitted:
+            raise RuntimeError("MinMaxNormaliser is not fitted yet - call fit() or partial_fit() first")
+        data_range = self.data_max - self.data_min
+        if np is not None and isinstance(data_range, np.ndarray):
+            scale = np.divide(1.0, data_range, out=np.zeros(data_range.shape), where=data_range != 0)
+        else:
+            scale = 1.0 / data_range if data_range else 0.0
+        return scale, -self.data_min * scale
+
+    def transform(self, values):
+        scale, offset = self._parameters()
+        if np is not None and isinstance(values, np.ndarray):
+            return values * scale + offset
+        return array("d", [x * scale + offset for x in values])
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Models That Share One Fitted Transform
+A model either receives an already fitted transform or fits its own on first use. preprocess() keeps its result, so
+calling it again (e.g. once in train and once in evaluate) costs nothing.
+"""
+class BaseModel:
+    def __init__(self, data, scaler=None):
+        self.data = data
+        self.scaler = scaler if scaler is not None else MinMaxNormaliser()
+        self._preprocessed = None
+
+    def preprocess(self):
+        if self._preprocessed is None:
+            if not self.scaler.is_fitted:
+                self.scaler.fit(self.data)
+            self._preprocessed = self.scaler.transform(self.data)
+        return self._preprocessed
+
+    def train(self):
+        return NotImplementedError("Subclasses must implement this method")
+
+class LogisticRegressionModel(BaseModel):
+    def train(self):
+        print("Training Logistic Regression on", len(self.preprocess()), "scaled rows")
+
+class DecisionTreeModel(BaseModel):
+    def train(self):
+        print("Training Decision Trees on", len(self.preprocess()), "scaled rows")
+
+
+data = [10, 20, -30, 50, 5, 9.5]
+scaler = MinMaxNormaliser().fit(data)
+print(scaler.data_min, scaler.data_max, list(scaler.transform(data)))  # values in [0, 1], not [-1, 0]
+
+for model in (LogisticRegressionModel(data, scaler), DecisionTreeModel(data, scaler)):
+    model.train()  # both reuse the same min/max - neither scans the data for statistics
+
+# New data is scaled with the training statistics, so values outside the training range fall outside [0, 1]
+print(list(scaler.transform([-30, 50, 90])))
+
+# Incremental fitting: statistics from chunks equal statistics from the whole dataset
+chunked = MinMaxNormaliser()
+for chunk in (data[:2], data[2:4], data[4:]):
+    chunked.partial_fit(chunk)
+print(chunked.data_min == scaler.data_min and chunked.data_max == scaler.data_max)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Regression Benchmark: the Original Quadratic preprocess vs the Fitted Transform
+The original is too slow to run at 10^5 rows, so it is timed at a few thousand rows and extrapolated with its n^2
+growth. The fixed code is timed directly at 10^5 and 10^6 rows.
+"""
+def original_preprocess(data):  # the original BaseModel.preprocess from 01_basics.py, including its bugs
+    return [(x - min(data))/(min(data) - max(data)) for x in data]
+
+
+def fixed_preprocess(data):  # the corrected BaseModel.preprocess now in 01_basics.py
+    low, high = min(data), max(data)
+    span = (high - low) or 1.0
+    return [(x - low)/span for x in data]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+small = [float((i * 7919) % 10007) for i in range(2000)]
+seconds_2k, _ = timed(original_preprocess, small)
+seconds_4k, _ = timed(original_preprocess, small * 2)
+estimate = seconds_4k * (100_000 / 4000) ** 2
+print(f"original  n=2,000: {seconds_2k:.2f}s, n=4,000: {seconds_4k:.2f}s (x{seconds_4k / seconds_2k:.1f} for 2x rows)"
+      f" -> n=100,000 estimated {estimate / 60:.0f} min")
+
+for rows in (100_000, 1_000_000):
+    values = [float((i * 7919) % 10007) for i in range(rows)]
+    fixed_seconds, expected = timed(fixed_preprocess, values)
+    scaler = MinMaxNormaliser()
+    fit_seconds, _ = timed(scaler.fit, values)
+    transform_seconds, scaled = timed(scaler.transform, values)
+    models = [LogisticRegressionModel(values, scaler), DecisionTreeModel(values, scaler)]
+    shared_seconds, _ = timed(lambda: [model.preprocess() for model in models])
+    matches = all(abs(a - b) < 1e-12 for a, b in zip(scaled, expected))
+    print(f"n={rows:>9,}: fixed preprocess {fixed_seconds:.3f}s | fit {fit_seconds:.3f}s + transform "
+          f"{transform_seconds:.3f}s | two models sharing the fit {shared_seconds:.3f}s | same values: {matches}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why is calling min() inside a list comprehension O(n^2)?
+A: The comprehension body runs once per element, and min() scans all n elements each time - n scans of n elements.
+Values that don't change inside the loop should be computed once before it.
+
+Q: What is the difference between fit and transform?
+A: fit learns parameters from data (here min and max); transform applies them. Keeping them separate lets you fit on
+training data only and apply exactly the same scaling to validation, test and production data, avoiding data leakage.
+
+Q: How should scaling handle a constant feature?
+A: max - min is zero, so the formula divides by zero. Common choices are to map every value to 0 (as here) or to leave
+the feature unscaled; either way it must not crash the pipeline.
+"""
@@ -0,0 +1,347 @@
+"""
+A Batched Predict API for the Model Interface
+Model.predict in 02_intermediate.py takes a list and its implementations loop over Python scalars. That interface is
+fine for a demo, but real inference has other shapes:
+ > Offline scoring of arrays that are larger than memory - they have to be streamed through the model in chunks.
+ > Models backed by native code (NumPy, ONNX Runtime, XGBoost) that release the GIL - several chunks can then be
+   predicted at once by a thread pool.
+ > Online serving, where requests arrive one row at a time - but every model call has a fixed overhead, so answering
+   each row separately wastes most of the time. A micro-batcher gathers rows that arrive within a small latency budget
+   and predicts them as one batch.
+
+Here the Model interface is built around one contract, predict_batch(X): take a whole array, return an array of the
+same length. Everything else (predict, chunked prediction, threads, micro-batching) is written once on top of it.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import os
+import queue
+import statistics
+import tempfile
+import threading
+import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import numpy as np  # optional: predict_batch works on whole arrays instead of looping over Python scalars
+except ImportError:
+    np = None
+
+"""
+1. The Batched Model Interface
+Subclasses implement predict_batch only. releases_gil tells predict_chunked whether running chunks on threads can
+help: for pure-Python models the GIL lets only one thread run Python code at a time, so threads would just add
+overhead and the chunks are predicted one after another instead.
+"""
+def as_array(data):
+    if np is not None:
+        return np.asarray(data, dtype=float)
+    return data if isinstance(data, array) and data.typecode == "d" else array("d", data)
+
+
+def iter_chunks(data, chunk_size):
+    # Slicing a NumPy memmap or an array.array only touches that slice, so the whole input is never copied at once
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+class Model:
+    releases_gil = False
+
+    def fit(self, data):
+        raise NotImplementedError("Subclasses must import this method")
+
+    def predict_batch(self, X):
+        raise NotImplementedError("Subclasses must import this method")
+
+    def predict(self, data):
+        return self.predict_batch(as_array(data))
+
+    def predict_chunked(self, chunks, out=None, workers=1):
+        """Predict an iterable of chunks, in order. Results are written to `out` (e.g. a file) or returned."""
+        results = out if out is not None else []
+        write = results.write if hasattr(results, "write") else results.extend
+        if workers > 1 and self.releases_gil:
+            with ThreadPoolExecutor(workers) as executor:
+                pending = []
+                for chunk in chunks:
+                    pending.append(executor.submit(self.predict_batch, as_array(chunk)))
+                    if len(pending) >= 2 * workers:  # bounded: only a few chunks are held in memory at once
+                        write(pending.pop(0).result())
+                for future in pending:
+                    write(future.result())
+        else:
+            for chunk in chunks:
+                write(self.predict_batch(as_array(chunk)))
+        return results
+
+
+class LinearRegressionModel(Model):
+    def fit(self, data):
+        print(f"Fitting Linear Regression on {data}")
+
+    def predict_batch(self, X):
+        if np is not None:
+            return X * 2
+        return array("d", [x * 2 for x in X])
+
+
+class DecisionTreeModel(Model):
+    def fit(self, data):
+        print(f"Fitting Decision Tree on {data}")
+
+    def predict_batch(self, X):
+        if np is not None:
+            return np.square(X)
+        return array("d", [x * x for x in X])
+
+
+class NativeModel(Model):
+    """Stands in for a model running in native code: a fixed cost per call plus a small cost per row, during which
+    the GIL is released (simulated with time.sleep, which releases it too)."""
+    releases_gil = True
+
+    def __init__(self, call_overhead=0.002, per_row=0.000002):
+        self.call_overhead = call_overhead
+        self.per_row = per_row
+
+    def fit(self, data):
+        pass
+
+    def predict_batch(self, X):
+        time.sleep(self.call_overhead + self.per_row * len(X))
+        return array("d", [x * 2 for x in X])
+
+
+models = [LinearRegressionModel(), DecisionTreeModel()]
+for model in models:
+    model.fit([1, 2, 3])
+    print(list(model.predict([1, 2, 3])))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Chunked Prediction for Inputs Larger Than Memory
+The input is a file of raw float64 values. It is read one chunk at a time (np.memmap, or array.fromfile without NumPy)
+and each chunk's predictions are appended to the output file, so memory use is bounded by the chunk size, not by the
+size of the data.
+"""
+def iter_file_chunks(path, chunk_size):
+    if np is not None:
+        yield from iter_chunks(np.memmap(path, dtype=np.float64, mode="r"), chunk_size)
+        return
+    with open(path, "rb") as file:
+        while True:
+            chunk = array("d")
+            try:
+                chunk.fromfile(file, chunk_size)
+            except EOFError:  # the last, partial chunk is still filled in
+                pass
+            if not chunk:
+                return
+            yield chunk
+
+
+class BinaryWriter:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, predictions):
+        if np is not None:
+            predictions = np.ascontiguousarray(predictions, dtype=np.float64)
+        self.file.write(memoryview(predictions).cast("B"))
+
+
+def predict_file(model, in_path, out_path, chunk_size=100_000, workers=1):
+    with open(out_path, "wb") as file:
+        model.predict_chunked(iter_file_chunks(in_path, chunk_size), out=BinaryWriter(file), workers=workers)
+
+
+directory = tempfile.mkdtemp(prefix="batched_predict_")
+in_path, out_path = os.path.join(directory, "X.f64"), os.path.join(directory, "y.f64")
+with open(in_path, "wb") as file:
+    array("d", range(1_000_001)).tofile(file)  # 8 MB; deliberately not a multiple of the chunk size
+
+start = time.perf_counter()
+predict_file(LinearRegressionModel(), in_path, out_path, chunk_size=65_536)
+seconds = time.perf_counter() - start
+predictions = array("d")
+with open(out_path, "rb") as file:
+    predictions.fromfile(file, os.path.getsize(out_path) // 8)
+print(f"chunked file prediction: {len(predictions):,} rows in {seconds:.3f}s, "
+      f"correct: {predictions == array('d', [x * 2 for x in range(1_000_001)])}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Benchmark: One Call per Row vs Batches, and Threads for GIL-Releasing Models
+The same 10^6 rows are predicted one row per call (what an interface built around single rows forces) and as whole
+batches. For NativeModel, chunks are then spread over 1 and 4 threads.
+"""
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+rows = array("d", range(1_000_000))
+model = DecisionTreeModel()
+per_row_seconds, _ = timed(lambda: [model.predict_batch(array("d", [x]))[0] for x in rows])
+batch_seconds, _ = timed(model.predict, rows)
+print(f"DecisionTreeModel, 10^6 rows: one call per row {per_row_seconds:.2f}s, one batch {batch_seconds:.3f}s "
+      f"({per_row_seconds / batch_seconds:.0f}x)")
+
+native = NativeModel(call_overhead=0.002, per_row=0.000002)
+native_rows = rows[:200_000]
+for workers in (1, 4):
+    seconds, result = timed(native.predict_chunked, iter_chunks(native_rows, 10_000), workers=workers)
+    print(f"NativeModel, 20 chunks on {workers} thread(s): {seconds:.3f}s, correct: {result[-1] == native_rows[-1] * 2}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Micro-Batching for Online Serving
+Each caller submits one row and gets a Future. A background thread takes the first waiting row, then keeps collecting
+rows until the batch is full (max_batch_size) or the latency budget (max_latency seconds after the first row) runs
+out, and answers the whole batch with one predict_batch call.
+Under light load a row waits at most max_latency; under heavy load batches fill up immediately and the fixed
+per-call cost is shared by many rows.
+Futures follow the concurrent.futures contract: a row whose future was cancelled while it waited is dropped from its
+batch, a failing batch fails only its own futures (the server keeps going), and submit() after close() raises.
+"""
+class MicroBatcher:
+    def __init__(self, model, max_batch_size=64, max_latency=0.005):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.rows = 0
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.worker = threading.Thread(target=self._serve, daemon=True)
+        self.worker.start()
+
+    def submit(self, row):
+        future = Future()
+        with self._close_lock:  # so no row can be queued behind the shutdown marker
+            if self._closed:
+                raise RuntimeError("cannot submit rows to a closed MicroBatcher")
+            self.requests.put((row, future))
+        return future
+
+    def predict(self, row):
+        return self.submit(row).result()
+
+    def _serve(self):
+        stop = False
+        while not stop:
+            first = self.requests.get()
+            if first is None:
+                return
+            batch = []
+            self._take(batch, first)
+            deadline = time.perf_counter() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                self._take(batch, item)
+            if not batch:
+                continue
+            try:
+                self._run(batch)
+            except Exception as error:  # a bug in one batch must not stop the server for everyone else
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    @staticmethod
+    def _take(batch, item):
+        if item[1].set_running_or_notify_cancel():  # False if the caller cancelled it while it was queued
+            batch.append(item)
+
+    def _run(self, batch):
+        try:
+            predictions = list(self.model.predict_batch(as_array([row for row, _ in batch])))
+            if len(predictions) != len(batch):
+                raise ValueError(f"predict_batch returned {len(predictions)} predictions for {len(batch)} rows")
+        except Exception as error:  # every caller in the batch sees the failure
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
+        self.batches += 1
+        self.rows += len(batch)
+
+    def close(self):
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self.requests.put(None)
+        self.worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def serve(predict_one, clients=32, requests_per_client=50):
+    latencies = []
+
+    def client(client_id):
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            assert predict_one(float(client_id * 1000 + i)) == (client_id * 1000 + i) * 2
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    cuts = statistics.quantiles(latencies, n=100)
+    return len(latencies) / seconds, cuts[49] * 1000, cuts[98] * 1000
+
+
+native = NativeModel(call_overhead=0.002, per_row=0.000002)
+lock = threading.Lock()  # an unbatched model server handles one call at a time
+
+
+def predict_unbatched(row):
+    with lock:
+        return native.predict_batch(array("d", [row]))[0]
+
+
+throughput, p50, p99 = serve(predict_unbatched)
+print(f"one row per call: {throughput:>6.0f} rows/s, latency p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+with MicroBatcher(native, max_batch_size=64, max_latency=0.005) as batcher:
+    throughput, p50, p99 = serve(batcher.predict)
+print(f"micro-batched:    {throughput:>6.0f} rows/s, latency p50 {p50:.1f} ms, p99 {p99:.1f} ms, "
+      f"mean batch size {batcher.rows / batcher.batches:.1f}")
+
+os.remove(in_path)
+os.remove(out_path)
+os.rmdir(directory)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why is batched prediction faster than predicting one row at a time?
+A: Every call has a fixed cost - Python function calls, argument conversion, launching native code or a GPU kernel.
+A batch pays that cost once for many rows, and vectorised code processes the rows in a tight native loop.
+
+Q: When does running prediction in a thread pool help?
+A: Only when the model's heavy work runs without holding the GIL, as in NumPy, ONNX Runtime or most native ML
+libraries. Pure-Python prediction is serialised by the GIL, so threads add overhead without adding speed.
+
+Q: What is micro-batching?
+A: An online-serving technique that briefly holds incoming single requests, groups them into a batch and answers them
+together. It trades a small, bounded extra latency for much higher throughput.
+
+Q: How would you choose max_batch_size and max_latency?
+A: max_latency comes from the latency budget of the service (e.g. a few milliseconds of a 50 ms SLA). max_batch_size
+is where larger batches stop improving throughput, or where memory limits are reached - found by measuring.
+"""
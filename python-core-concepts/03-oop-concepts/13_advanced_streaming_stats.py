@@ -0,0 +1,324 @@
+"""
+Streaming Statistics: Update on Append, Read for Free
+DataStats.mean in 02_intermediate.py recomputes sum(self.data) / len(self.data) on every access. When rows keep
+arriving and a dashboard reads the stats thousands of times, every read costs a full pass over all the data - and
+median or quantiles would need a full sort each time.
+
+This version keeps running aggregates instead of the data:
+ > count, sum, min and max are updated in O(1) per appended value.
+ > Variance uses Welford's algorithm: a running mean and a running sum of squared deviations (M2), which stays
+   numerically accurate where the textbook sum(x^2)/n - mean^2 loses precision.
+ > Quantiles (median, p95, ...) come from a KLL sketch: a small summary with bounded memory that answers any quantile
+   within a known rank error (about 1% here), no matter how many values it has seen.
+ > All of it is mergeable: stats computed on separate shards (or in separate processes) combine into exactly the
+   count/mean/variance/min/max of the whole dataset, and into a sketch with the same error guarantee.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import math
+import pickle
+import random
+import statistics
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+"""
+1. The KLL Quantile Sketch
+Values are stored in a stack of "compactors". Level h holds items that each stand for 2^h original values. When the
+sketch is full, the first over-capacity level is sorted and compacted: every other item (starting at a random
+offset, so the error is unbiased) moves one level up with double the weight, the rest are dropped.
+Lower levels get geometrically smaller capacities (factor c = 2/3), so the total size stays around 3k items plus a
+few per level - O(k log(n/k)) - while the rank error stays around 1/k.
+"""
+class KLLSketch:
+    def __init__(self, k=200, c=2 / 3, seed=None):
+        self.k = k
+        self.c = c
+        self.random = random.Random(seed)
+        self.count = 0  # values seen
+        self.size = 0  # items retained
+        self.compactors = [[]]
+        self.max_size = self._capacity(0)
+        self._sorted = None  # (values, cumulative weights), rebuilt on the first read after a change
+
+    def _capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(height) for height in range(len(self.compactors)))
+
+    def _compress(self):
+        while self.size >= self.max_size:
+            for height, compactor in enumerate(self.compactors):
+                if len(compactor) >= self._capacity(height):
+                    if height + 1 == len(self.compactors):
+                        self._grow()
+                    compactor.sort()
+                    leftover = [compactor.pop()] if len(compactor) % 2 else []  # keep the weights exact
+                    self.compactors[height + 1].extend(compactor[self.random.getrandbits(1)::2])
+                    self.compactors[height] = leftover
+                    break
+            self.size = sum(len(compactor) for compactor in self.compactors)
+
+    def update(self, value):
+        self.compactors[0].append(value)
+        self.count += 1
+        self.size += 1
+        self._sorted = None
+        if self.size >= self.max_size:
+            self._compress()
+
+    def extend(self, values):
+        for value in values:
+            self.compactors[0].append(value)
+            self.size += 1
+            self.count += 1
+            if self.size >= self.max_size:
+                self._compress()
+        self._sorted = None
+        return self
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for height, compactor in enumerate(other.compactors):
+            self.compactors[height].extend(compactor)
+        self.count += other.count
+        self.size += other.size
+        self._sorted = None
+        self._compress()
+        return self
+
+    def _cumulative(self):
+        if self._sorted is None:
+            items = sorted((value, 1 << height) for height, compactor in enumerate(self.compactors)
+                           for value in compactor)
+            values, cumulative, total = [], [], 0
+            for value, weight in items:
+                total += weight
+                values.append(value)
+                cumulative.append(total)
+            self._sorted = values, cumulative
+        return self._sorted
+
+    def quantile(self, q):
+        if not self.count:
+            return float("nan")
+        values, cumulative = self._cumulative()
+        return values[min(bisect_left(cumulative, q * self.count), len(values) - 1)]
+
+    def rank(self, value):  # estimated share of values <= value
+        values, cumulative = self._cumulative()
+        position = bisect_right(values, value)
+        return cumulative[position - 1] / self.count if position else 0.0
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. DataStats With Running Aggregates
+append() updates everything in O(1) (plus the sketch's amortised O(1) insert); every property is then a constant-time
+read. extend() summarises a whole batch first and folds it in with merge, which is both faster and the same code
+path used to combine shards.
+merge() uses Chan et al.'s parallel formula: for two parts A and B with delta = mean_B - mean_A,
+    mean = mean_A + delta * n_B / n
+    M2   = M2_A + M2_B + delta^2 * n_A * n_B / n
+"""
+class DataStats:
+    def __init__(self, data=(), k=200, seed=None):
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.sketch = KLLSketch(k, seed=seed)
+        self.extend(data)
+
+    def append(self, value):
+        self.count += 1
+        self.sum += value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)  # Welford: uses the old and the new mean
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.update(value)
+
+    def extend(self, values):
+        values = list(values)
+        if not values:
+            return self
+        batch = DataStats.__new__(DataStats)
+        batch.count, batch.sum = len(values), math.fsum(values)
+        batch._mean = batch.sum / batch.count
+        batch._m2 = math.fsum((x - batch._mean) ** 2 for x in values)
+        batch.min, batch.max = min(values), max(values)
+        self._combine(batch)
+        self.sketch.extend(values)
+        return self
+
+    def _combine(self, other):
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other)
+            self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def mean(self):
+        return self._mean if self.count else float("nan")
+
+    @property
+    def variance(self):  # population variance, like statistics.pvariance
+        return self._m2 / self.count if self.count else float("nan")
+
+    @property
+    def sample_variance(self):  # like statistics.variance
+        return self._m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def median(self):
+        return self.sketch.quantile(0.5)
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def __repr__(self):
+        return (f"DataStats(count={self.count}, mean={self.mean:.4g}, std={self.std:.4g}, min={self.min}, "
+                f"max={self.max}, median~{self.median})")
+
+
+def stats_demo():
+    stats = DataStats([1, 2, 3, 5, 6])
+    print(stats.mean)
+    stats.append(10)
+    print(stats, stats.variance == statistics.pvariance([1, 2, 3, 5, 6, 10]))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. Merging Shards Across Processes
+Each worker process builds DataStats for its shard and returns it (pickled); the parent merges them. count, sum,
+min and max match a single pass exactly; mean and variance match up to floating-point rounding; quantiles stay within
+the sketch's error.
+"""
+def shard_stats(shard):
+    start, stop, seed = shard
+    rng = random.Random(seed)
+    return DataStats((rng.gauss(50, 10) for _ in range(start, stop)), seed=seed)
+
+
+def shard_values(shard):
+    start, stop, seed = shard
+    rng = random.Random(seed)
+    return [rng.gauss(50, 10) for _ in range(start, stop)]
+
+
+def rank_error(stats, exact_sorted, quantiles=(0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)):
+    worst = 0.0
+    for q in quantiles:
+        estimate = stats.quantile(q)
+        true_rank = bisect_right(exact_sorted, estimate) / len(exact_sorted)
+        worst = max(worst, abs(true_rank - q))
+    return worst
+
+
+def merge_demo():
+    shards = [(i * 250_000, (i + 1) * 250_000, i) for i in range(4)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        merged = DataStats()
+        for part in executor.map(shard_stats, shards):
+            merged.merge(part)
+    seconds = time.perf_counter() - start
+
+    values = sorted(x for shard in shards for x in shard_values(shard))
+    print(f"4 shards merged in {seconds:.2f}s: count {merged.count:,}, "
+          f"mean error {abs(merged.mean - statistics.fmean(values)):.1e}, "
+          f"variance error {abs(merged.variance - statistics.pvariance(values)) / merged.variance:.1e} (relative), "
+          f"min/max exact: {(merged.min, merged.max) == (values[0], values[-1])}")
+    print(f"sketch: {merged.sketch.size} items kept for {merged.count:,} values "
+          f"({len(pickle.dumps(merged)) / 1024:.0f} KiB pickled vs {len(pickle.dumps(values)) / 1024:.0f} KiB raw), "
+          f"worst rank error {rank_error(merged, values):.2%}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Benchmark: a Dashboard Reading Stats While Rows Are Appended
+100,000 rows are appended one at a time, and mean and median are read after every 100 rows (1,000 reads).
+The original recomputes from the full list on every read; the streaming version just reads its aggregates.
+"""
+class ListDataStats:  # the original, from 02_intermediate.py, plus a median that sorts on every access
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def mean(self):
+        return sum(self.data) / len(self.data)
+
+    @property
+    def median(self):
+        return statistics.median(self.data)
+
+
+def dashboard(stats, append, rows):
+    readings = []
+    for i, value in enumerate(rows, 1):
+        append(value)
+        if i % 100 == 0:
+            readings.append((stats.mean, stats.median))
+    return readings
+
+
+def dashboard_benchmark(size=100_000):
+    rng = random.Random(0)
+    rows = [rng.gauss(50, 10) for _ in range(size)]
+
+    original = ListDataStats([])
+    start = time.perf_counter()
+    dashboard(original, original.data.append, rows)
+    original_seconds = time.perf_counter() - start
+
+    streaming = DataStats(seed=0)
+    start = time.perf_counter()
+    readings = dashboard(streaming, streaming.append, rows)
+    streaming_seconds = time.perf_counter() - start
+    print(f"dashboard, {size:,} appends + {size // 100:,} reads: recomputing {original_seconds:.2f}s, "
+          f"streaming {streaming_seconds:.2f}s ({original_seconds / streaming_seconds:.1f}x), "
+          f"final median {readings[-1][1]:.3f} vs exact {statistics.median(rows):.3f}")
+
+
+if __name__ == "__main__":
+    stats_demo()
+    merge_demo()
+    dashboard_benchmark()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: What is Welford's algorithm?
+A: A one-pass way to compute variance: keep the count, the running mean and M2, the running sum of squared deviations
+from the mean, updating all three per value. It avoids the catastrophic cancellation of sum(x^2)/n - mean^2.
+
+Q: Why can't the exact median be maintained in O(1) memory?
+A: Any value seen so far could become the median later, so an exact answer requires keeping all of them. Sketches like
+KLL or t-digest keep a small, weighted sample instead and guarantee an approximate answer.
+
+Q: What does "mergeable" mean for statistics?
+A: Summaries of two parts can be combined into the summary of the whole without the raw data. Count, sum, min, max
+and (mean, M2) are exactly mergeable; KLL sketches merge with the same error bound - which is what makes them usable
+for sharded or distributed data.
+
+Q: When would you still recompute from raw data?
+A: When exact quantiles are required (e.g. for regulatory reporting) or the data is small enough that a full pass
+is cheap. Streaming aggregates are for large or constantly growing data.
+"""
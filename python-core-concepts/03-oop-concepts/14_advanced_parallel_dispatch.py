@@ -0,0 +1,250 @@
+"""
+Parallel Multi-Dataset Dispatch for dataPreprocessor.process
+dataPreprocessor.process(*args) in 02_intermediate.py accepts any number of datasets but only branches on len(args):
+the datasets are then handled one after another. Batch preprocessing jobs pass dozens of datasets, so the
+multi-dataset path is the natural place for parallelism:
+ > The datasets are fanned out across a worker pool and the results come back in the order they were passed in.
+ > A policy chooses the pool: "serial", "thread", "process" or "auto". Small jobs stay serial (starting workers costs
+   more than it saves); CPU-bound pure-Python steps need processes because of the GIL; threads suit steps that
+   release the GIL (NumPy, I/O).
+ > Large array inputs are passed to worker processes through shared memory: the parent copies the raw buffer into a
+   shared block once and sends only its name, instead of pickling the data into the worker and the result back.
+ > Every dataset's run time and worker are recorded, so it is visible where the time goes and whether the job scales.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import math
+import os
+import threading
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np  # optional: NumPy arrays are scaled in one vectorised pass and shared without pickling
+except ImportError:
+    np = None
+
+"""
+1. The Preprocessing Step
+min_max_scale is the corrected BaseModel.preprocess from 01_basics.py. Steps must be module-level functions so worker
+processes can import them by name.
+"""
+def min_max_scale(values):
+    if np is not None and isinstance(values, np.ndarray):
+        low, high = values.min(), values.max()  # one C-level pass each, instead of iterating NumPy scalars
+        return (values - low) / ((high - low) or 1.0)
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    return array("d", [(x - low) / span for x in values])
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. Shared-Memory Transport
+Only flat buffers qualify: array.array and NumPy arrays. A descriptor (block names, typecode or dtype, shape) is all
+that crosses the process boundary, and any picklable module-level step can use it:
+ > The step gets the same type as in serial mode: a NumPy array is a zero-copy view of the input block, an array.array
+   is rebuilt from it in the worker (one memory copy, still no pickling).
+ > A result of float64 values with the input's shape (array("d") or a float64 ndarray, as min_max_scale returns) is
+   written straight into the output block, which the parent then reads back. Any other result (another dtype, another
+   length, a list) is pickled back as usual, so every mode returns exactly what serial mode returns.
+"""
+SharedDataset = namedtuple("SharedDataset", ["input_name", "output_name", "kind", "format", "shape"])
+
+
+class InSharedMemory:  # returned by a worker instead of a result it wrote to the output block
+    pass
+
+
+def share(values):
+    if np is not None and isinstance(values, np.ndarray):
+        kind, format, shape = "numpy", values.dtype.str, values.shape
+        data = memoryview(np.ascontiguousarray(values)).cast("B")
+    else:
+        kind, format, shape = "array", values.typecode, (len(values),)
+        data = memoryview(values).cast("B")
+    source = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    target = shared_memory.SharedMemory(create=True, size=max(math.prod(shape) * 8, 1))  # float64 results
+    source.buf[:data.nbytes] = data
+    return SharedDataset(source.name, target.name, kind, format, shape), (source, target)
+
+
+def run_shared(step, dataset):
+    source = shared_memory.SharedMemory(name=dataset.input_name)
+    target = shared_memory.SharedMemory(name=dataset.output_name)
+    values = out = result = None
+    try:
+        count = math.prod(dataset.shape)
+        if dataset.kind == "numpy":
+            values = np.ndarray(dataset.shape, dtype=np.dtype(dataset.format), buffer=source.buf)
+            result = step(values)
+            if isinstance(result, np.ndarray) and result.dtype == np.float64 and result.shape == dataset.shape:
+                out = np.ndarray(dataset.shape, dtype=np.float64, buffer=target.buf)
+                np.copyto(out, result)
+                return InSharedMemory()
+            if isinstance(result, np.ndarray) and np.may_share_memory(result, values):
+                result = result.copy()  # a view of the input block would not outlive it
+            return result
+        values = array(dataset.format)
+        with source.buf[:count * values.itemsize] as view:
+            values.frombytes(view)
+        result = step(values)
+        if isinstance(result, array) and result.typecode == "d" and len(result) == count:
+            with target.buf[:count * 8] as view:
+                view[:] = memoryview(result).cast("B")
+            return InSharedMemory()
+        return result
+    finally:
+        del values, out, result  # views must be released before the blocks can be closed, even if the step failed
+        source.close()
+        target.close()
+
+
+def read_shared(dataset, target):
+    if dataset.kind == "numpy":
+        return np.ndarray(dataset.shape, dtype=np.float64, buffer=target.buf).copy()
+    result = array("d")
+    result.frombytes(target.buf[:dataset.shape[0] * 8])
+    return result
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. The Parallel dataPreprocessor
+Each task returns its result together with its own timing, measured inside the worker, so queueing time is not
+counted as processing time. executor.map returns results in submission order, whatever order the workers finish in.
+"""
+DatasetTiming = namedtuple("DatasetTiming", ["index", "size", "seconds", "worker"])
+
+
+def timed_step(step, index, values):
+    start = time.perf_counter()
+    if isinstance(values, SharedDataset):
+        result, size = run_shared(step, values), math.prod(values.shape)
+    else:
+        result, size = step(values), len(values)
+    worker = f"pid {os.getpid()} / {threading.current_thread().name}"
+    return result, DatasetTiming(index, size, time.perf_counter() - start, worker)
+
+
+def _timed_call(task):
+    return timed_step(*task)
+
+
+class dataPreprocessor:
+    def __init__(self, step=min_max_scale, policy="auto", workers=None, serial_threshold=50_000,
+                 shared_memory_threshold=100_000):
+        if policy not in ("auto", "serial", "thread", "process"):
+            raise ValueError(f"Unknown policy: {policy!r}")
+        self.step = step
+        self.policy = policy
+        self.workers = workers or os.cpu_count() or 1
+        self.serial_threshold = serial_threshold
+        self.shared_memory_threshold = shared_memory_threshold
+        self.timings = []
+        self.mode = None
+
+    def choose_mode(self, datasets):
+        if self.policy != "auto":
+            return self.policy
+        cores = min(self.workers, os.cpu_count() or 1)
+        if sum(len(values) for values in datasets) < self.serial_threshold or cores == 1:
+            return "serial"
+        return "process"  # the default step is pure Python, so only processes run it in parallel
+
+    def process(self, *args):
+        if len(args) == 1:
+            result, timing = timed_step(self.step, 0, args[0])
+            self.timings, self.mode = [timing], "serial"
+            return result
+        elif len(args) > 1:
+            return self._process_many(args)
+        else:
+            print(f"No dataset provided")
+            self.timings, self.mode = [], None
+            return []
+
+    def _process_many(self, datasets):
+        self.mode = self.choose_mode(datasets)
+        tasks = [(self.step, index, values) for index, values in enumerate(datasets)]
+        if self.mode == "serial":
+            outputs = [timed_step(*task) for task in tasks]
+        elif self.mode == "thread":
+            with ThreadPoolExecutor(self.workers) as executor:
+                outputs = list(executor.map(_timed_call, tasks))
+        else:
+            outputs = self._process_in_pool(tasks)
+        self.timings = [timing for _, timing in outputs]
+        return [result for result, _ in outputs]
+
+    def _shareable(self, values):
+        is_buffer = isinstance(values, array) or (np is not None and isinstance(values, np.ndarray))
+        return is_buffer and len(values) >= self.shared_memory_threshold
+
+    def _process_in_pool(self, tasks):
+        blocks = {}
+        try:
+            for position, (step, index, values) in enumerate(tasks):
+                if self._shareable(values):
+                    descriptor, blocks[index] = share(values)
+                    tasks[position] = (step, index, descriptor)
+            with ProcessPoolExecutor(self.workers) as executor:
+                outputs = list(executor.map(_timed_call, tasks))
+            for position, (step, index, values) in enumerate(tasks):
+                if isinstance(outputs[position][0], InSharedMemory):
+                    outputs[position] = (read_shared(values, blocks[index][1]), outputs[position][1])
+            return outputs
+        finally:
+            for source, target in blocks.values():
+                for block in (source, target):
+                    block.close()
+                    block.unlink()
+
+    def report(self):
+        for timing in self.timings:
+            print(f"  dataset {timing.index}: {timing.size:>9,} values in {timing.seconds:.3f}s on {timing.worker}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Demo and Benchmark
+The same 8 datasets of 250,000 values are processed with each mode. Shared memory is compared with pickling by
+setting the threshold out of reach. On a single-core machine neither threads nor processes can beat serial for this
+CPU-bound step - the per-dataset timings show the work is simply interleaved - while on N cores the process modes
+approach an N-times speedup.
+"""
+if __name__ == "__main__":
+    processor = dataPreprocessor()
+    print(list(processor.process([1, 2, 3])))
+    print([list(result) for result in processor.process([1, 2, 3], [4, 5, 6])])
+    processor.process()
+
+    datasets = [array("d", ((i * 7919 + k) % 10007 for i in range(250_000))) for k in range(8)]
+    expected = [min_max_scale(values) for values in datasets]
+    print(f"{os.cpu_count()} CPU core(s), {len(datasets)} datasets x {len(datasets[0]):,} values")
+    runs = [("serial", {}), ("thread", {}), ("process", {"shared_memory_threshold": float("inf")}),
+            ("process", {}), ("auto", {})]
+    for policy, options in runs:
+        processor = dataPreprocessor(policy=policy, workers=4, **options)
+        start = time.perf_counter()
+        results = processor.process(*datasets)
+        seconds = time.perf_counter() - start
+        transport = "pickled" if options else "shared memory" if processor.mode == "process" else "-"
+        print(f"{policy:>7} -> {processor.mode:<7} ({transport:<13}): {seconds:.2f}s wall, "
+              f"{sum(t.seconds for t in processor.timings):.2f}s summed over datasets, "
+              f"in order and correct: {results == expected}")
+    processor.report()
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: When should a data job use threads and when processes?
+A: Threads when the work waits on I/O or runs in native code that releases the GIL (NumPy, pandas internals,
+compression); processes for pure-Python CPU-bound work, which the GIL otherwise runs one thread at a time.
+
+Q: Why pass large arrays through shared memory?
+A: Sending an array to a worker process normally pickles it, copies it through a pipe and unpickles it - and the
+result makes the same trip back. With shared memory both processes see the same pages, so only a name is sent.
+
+Q: Why can parallelism make small jobs slower?
+A: Starting workers, sending tasks and collecting results has a fixed cost. When each dataset takes microseconds, that
+overhead is larger than the work itself, so below a size threshold serial processing wins.
+
+Q: Why measure time per dataset rather than only the total?
+A: Per-dataset timings reveal skew - one huge dataset that keeps a single worker busy while the others idle - which
+limits scaling no matter how many cores are added.
+"""
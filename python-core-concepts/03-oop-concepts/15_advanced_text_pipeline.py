@@ -0,0 +1,211 @@
+"""
+A Lazy, Fused Step Chain for PreProcessor and TextPreProcessor
+In 01_basics.py, TextPreProcessor.clean calls PreProcessor.clean, which builds a filtered list, and then builds a
+second, lowercased list from it. Every subclass layer adds another full-size intermediate list, and each layer walks
+the whole dataset again.
+
+Here each class in the hierarchy *contributes a stage* instead of doing the work itself:
+ > stages() returns the parent's stages plus the class's own (via super(), just like clean() did), so the chain still
+   follows the inheritance hierarchy.
+ > A stage is a per-item filter, a per-item map or a per-batch function. Per-item stages are chained as filter()/map()
+   iterators, so each item flows through the whole chain before the next one is read - one pass, no intermediate
+   lists, and the loops run in C.
+ > iter_clean() works on any iterable (a list, a file, a generator) and yields results lazily; clean() keeps the
+   original API and stores one final list.
+ > For corpora of tens of millions of strings, chunked parallel execution is opt-in: chunks are cleaned in worker
+   processes, with a bounded number of chunks in flight, and come back in order.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from operator import is_not
+
+"""
+1. Stages and the Fused Runner
+Stage functions must be picklable for the parallel mode: built-ins like str.lower, functools.partial objects and
+module-level functions all are; lambdas are not.
+"""
+Stage = namedtuple("Stage", ["kind", "function"])  # kind: "filter", "map" or "batch"
+
+
+def apply_stages(stages, items):
+    for stage in stages:
+        if stage.kind == "filter":
+            items = filter(stage.function, items)
+        elif stage.kind == "map":
+            items = map(stage.function, items)
+        else:
+            items = stage.function(list(items))
+    return items
+
+
+def run_chunk(stages, chunk):
+    return list(apply_stages(stages, chunk))
+
+
+def iter_chunks(items, chunk_size):
+    items = iter(items)
+    while chunk := list(islice(items, chunk_size)):
+        yield chunk
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. The PreProcessor Hierarchy
+Subclasses override stages() and extend super().stages() - the same shape as the original clean() overrides, but
+nothing runs until the data is consumed.
+"""
+class PreProcessor:
+    def __init__(self, data, chunk_size=10_000):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    def stages(self):
+        return [Stage("filter", partial(is_not, None))]  # Removes missing values
+
+    def iter_clean(self, data=None, workers=1):
+        stages = self.stages()
+        data = self.data if data is None else data
+        if workers > 1:
+            return self._iter_parallel(stages, data, workers)
+        if any(stage.kind == "batch" for stage in stages):
+            # Batch stages need materialised input, so the data goes through the chain one chunk at a time
+            return (item for chunk in iter_chunks(data, self.chunk_size) for item in run_chunk(stages, chunk))
+        return apply_stages(stages, iter(data))
+
+    def _iter_parallel(self, stages, data, workers):
+        with ProcessPoolExecutor(workers) as executor:
+            pending = deque()
+            for chunk in iter_chunks(data, self.chunk_size):
+                pending.append(executor.submit(run_chunk, stages, chunk))
+                if len(pending) >= 2 * workers:  # bounded: only a few chunks are in memory at once
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def clean(self, workers=1):
+        self.data = list(self.iter_clean(workers=workers))
+
+class TextPreProcessor(PreProcessor):
+    def stages(self):
+        return super().stages() + [Stage("map", str.lower)]  # Converts to lowercase
+
+
+def text_demo():
+    text_data = ["Alice", "BOB", "CHarLIe", None]
+    preprocessor = TextPreProcessor(text_data)
+    preprocessor.clean()
+    print(preprocessor.data)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. A Deeper Subclass With a Per-Batch Stage
+Collapsing runs of whitespace with one re.sub per string pays the regex call overhead millions of times. The batch
+stage joins a whole chunk with a separator the pattern cannot match, runs re.sub once and splits it back - falling
+back to per-item calls if a string happens to contain the separator.
+"""
+WHITESPACE = re.compile(r"[ \t\r\n]+")
+SEPARATOR = "\x1f"  # ASCII unit separator, never matched by WHITESPACE
+
+
+def collapse_whitespace(batch):
+    collapsed = WHITESPACE.sub(" ", SEPARATOR.join(batch)).split(SEPARATOR)
+    if len(collapsed) != len(batch):
+        return [WHITESPACE.sub(" ", text) for text in batch]
+    return collapsed
+
+
+class NormalisingTextPreProcessor(TextPreProcessor):
+    def stages(self):
+        return super().stages() + [Stage("batch", collapse_whitespace), Stage("map", str.strip),
+                                   Stage("filter", None)]  # filter(None, ...) drops empty strings
+
+
+def normalising_demo():
+    print(list(NormalisingTextPreProcessor(["  Hello   World ", None, " \t", "Data\nScience"]).iter_clean()))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Benchmark: Layered Lists vs the Fused Chain
+The original implementation (copied below) is compared with the fused chain on 2,000,000 strings, timing both and
+measuring peak memory allocated during clean() with tracemalloc. The new lowercased strings dominate memory in both
+cases; the fused chain saves the intermediate lists, and streaming the result (e.g. to a file) instead of keeping it
+saves the final list as well. On a single-core machine the parallel mode only adds pickling overhead; it pays off
+when workers can run on separate cores.
+"""
+class ListPreProcessor:  # the original, from 01_basics.py
+    def __init__(self, data):
+        self.data = data
+
+    def clean(self):
+        self.data = [x for x in self.data if x is not None] # Removes missing values
+
+class ListTextPreProcessor(ListPreProcessor):  # the original, from 01_basics.py
+    def clean(self):
+        super().clean() # Calls the parent clean method
+        self.data = [x.lower() for x in self.data] # Converts to lowercase
+
+
+def measure(make_run):
+    start = time.perf_counter()
+    make_run()()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()  # a second run for memory: tracing slows allocation down too much to time the same run
+    make_run()()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def stream_to_file(processor, path, workers=1):
+    with open(path, "w") as file:
+        file.writelines(f"{text}\n" for text in processor.iter_clean(workers=workers))
+
+
+if __name__ == "__main__":
+    text_demo()
+    normalising_demo()
+
+    corpus = [None if i % 10 == 0 else f"Document {i} About DATA Science" for i in range(2_000_000)]
+    output_path = os.path.join(tempfile.mkdtemp(prefix="text_pipeline_"), "clean.txt")
+
+    processors = {}
+
+    def clean_with(label, cls, **options):
+        def make_run():
+            processors[label] = cls(corpus)
+            return partial(processors[label].clean, **options)
+        return make_run
+
+    runs = [("original (two lists)", clean_with("original", ListTextPreProcessor)),
+            ("fused chain, clean()", clean_with("fused", TextPreProcessor)),
+            ("fused chain, streamed to a file", lambda: partial(stream_to_file, TextPreProcessor(corpus), output_path)),
+            ("fused chain, 2 worker processes", clean_with("parallel", TextPreProcessor, workers=2))]
+    for label, make_run in runs:
+        seconds, peak = measure(make_run)
+        print(f"{label:<32}: {seconds:.2f}s, peak allocated {peak:.0f} MiB")
+    original, fused, parallel = processors["original"], processors["fused"], processors["parallel"]
+    print(f"same result: {original.data == fused.data == parallel.data}")
+    os.remove(output_path)
+    os.rmdir(os.path.dirname(output_path))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why do layered list comprehensions increase peak memory?
+A: Each layer builds a new full-size list while the previous one is still referenced, so n layers hold up to n lists
+at the same time. Chained iterators hold one item at a time per layer.
+
+Q: What is operator fusion?
+A: Combining several consecutive operations into a single pass over the data, so each item is read once and goes
+through every step before the next item is read. It avoids intermediate results and repeated passes.
+
+Q: Why are filter() and map() with built-in functions fast?
+A: The loop runs in C and, with functions like str.lower, so does the call - no Python bytecode runs per item, unlike
+a comprehension or generator expression.
+
+Q: When is chunked parallel text processing worth it?
+A: When the per-item work is heavy enough (tokenisation, regexes, normalisation) that CPU time dominates the cost of
+sending chunks to worker processes and collecting the results, and there are multiple cores to use.
+"""
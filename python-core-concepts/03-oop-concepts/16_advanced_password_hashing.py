@@ -0,0 +1,243 @@
+"""
+Salted, Tunable-Cost Password Hashing for User
+User.__hash_password in 01_basics.py stores sha256(password). That is fast - which is exactly the problem:
+ > Without a salt, identical passwords have identical hashes, and one precomputed table cracks every account.
+ > A GPU computes billions of SHA-256 hashes per second, so a leaked table of unsalted hashes falls to brute force.
+
+Password storage needs a key derivation function (KDF) that is deliberately slow and salted. hashlib ships two:
+ > PBKDF2-HMAC-SHA256: cost = number of iterations (OWASP currently recommends 600,000).
+ > scrypt: cost = n (CPU and memory), r (block size) and p (parallelism); it needs 128 * n * r bytes of memory per
+   hash, which makes GPU and ASIC attacks much more expensive.
+The cost parameters are stored inside each hash string, so the cost can be raised later without breaking old hashes.
+
+A slow KDF also makes our own bulk work slow: importing 100,000 users or a login storm hits the CPU hard. So:
+ > Bulk hashing and batch verification are spread over a process pool, one KDF per core.
+ > authenticate_async() runs the KDF in an executor, so an asyncio server keeps serving other requests while a
+   password is checked.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+"""
+1. Encoding Hashes With Their Parameters
+    scrypt$<n>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+Salt and hash are URL-safe base64. Verification reads the parameters from the stored string, never from the current
+settings, and compares with hmac.compare_digest so the comparison time doesn't reveal how many bytes matched.
+"""
+def b64encode(data):
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def derive(algorithm, parameters, password, salt):
+    if algorithm == "scrypt":
+        n, r, p = parameters
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=32,
+                              maxmem=2 * 128 * n * r * p + 1024 * 1024)  # default maxmem is too small for n >= 2^14
+    if algorithm == "pbkdf2_sha256":
+        (iterations,) = parameters
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    raise ValueError(f"Unknown password hashing algorithm: {algorithm!r}")
+
+
+def verify_password(password, encoded):
+    algorithm, *fields = encoded.split("$")
+    *parameters, salt, expected = fields
+    derived = derive(algorithm, tuple(int(value) for value in parameters), password, b64decode(salt))
+    return hmac.compare_digest(derived, b64decode(expected))
+
+
+def _verify_pair(pair):
+    return verify_password(*pair)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. The Hasher
+One PasswordHasher holds the current cost settings. needs_rehash() tells whether a stored hash uses different
+settings, so it can be upgraded the next time the user logs in successfully (the only time the plain password is
+available).
+"""
+class PasswordHasher:
+    def __init__(self, algorithm="scrypt", n=2 ** 14, r=8, p=1, iterations=600_000, salt_size=16):
+        if algorithm == "scrypt":
+            self.parameters = (n, r, p)
+        elif algorithm == "pbkdf2_sha256":
+            self.parameters = (iterations,)
+        else:
+            raise ValueError(f"Unknown password hashing algorithm: {algorithm!r}")
+        self.algorithm = algorithm
+        self.salt_size = salt_size
+
+    @property
+    def prefix(self):
+        return "$".join([self.algorithm, *map(str, self.parameters)])
+
+    def hash(self, password):
+        salt = secrets.token_bytes(self.salt_size)  # a fresh random salt per hash
+        return f"{self.prefix}${b64encode(salt)}${b64encode(derive(self.algorithm, self.parameters, password, salt))}"
+
+    def verify(self, password, encoded):
+        return verify_password(password, encoded)
+
+    def needs_rehash(self, encoded):
+        return not encoded.startswith(self.prefix + "$")
+
+    def hash_many(self, passwords, workers=None, chunksize=8):
+        with ProcessPoolExecutor(workers) as executor:
+            return list(executor.map(self.hash, passwords, chunksize=chunksize))
+
+    def verify_many(self, pairs, workers=None, chunksize=8):
+        with ProcessPoolExecutor(workers) as executor:
+            return list(executor.map(_verify_pair, pairs, chunksize=chunksize))
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. User With a KDF Backend
+The stored hash stays private (name-mangled __password, as in 01_basics.py). authenticate() transparently upgrades an
+outdated hash after a successful login. authenticate_async() hands the KDF to an executor: hashlib releases the GIL
+while it computes, so a thread pool is enough to keep the event loop responsive, and a process pool spreads a login
+storm over all cores.
+"""
+class User:
+    hasher = PasswordHasher()
+
+    def __init__(self, username, password=None, password_hash=None):
+        self.username = username
+        self.__password = password_hash if password_hash is not None else self.hasher.hash(password)
+
+    @classmethod
+    def bulk_create(cls, records, workers=None):
+        hashes = cls.hasher.hash_many([password for _, password in records], workers)
+        return [cls(username, password_hash=encoded) for (username, _), encoded in zip(records, hashes)]
+
+    @property
+    def password_hash(self):  # read-only: for storing in a database, never the password itself
+        return self.__password
+
+    def authenticate(self, password):
+        if not verify_password(password, self.__password):
+            return False
+        if self.hasher.needs_rehash(self.__password):
+            self.__password = self.hasher.hash(password)
+        return True
+
+    async def authenticate_async(self, password, executor=None):
+        loop = asyncio.get_running_loop()
+        valid = await loop.run_in_executor(executor, verify_password, password, self.__password)
+        if valid and self.hasher.needs_rehash(self.__password):
+            self.__password = await loop.run_in_executor(executor, self.hasher.hash, password)
+        return valid
+
+
+def user_demo():
+    user = User("John", "PASSWORD")
+    print(user.password_hash)
+    print(user.authenticate("<PASSWORD>")) # FALSE
+    print(user.authenticate("PASSWORD")) # TRUE
+    print(User("Jane", "PASSWORD").password_hash != user.password_hash)  # same password, different salt
+
+    # Raising the cost later: old hashes still verify and are upgraded on the next successful login
+    legacy = User("Old", password_hash=PasswordHasher("pbkdf2_sha256", iterations=10_000).hash("hunter2"))
+    print(legacy.authenticate("hunter2"), legacy.password_hash.split("$")[0])
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Benchmark: Verifications per Second Against Cost
+Each setting is verified repeatedly for about half a second, serially and in a process pool with one worker per core.
+The original unsalted SHA-256 is included for scale - the speed that makes it unsuitable. Throughput only grows with
+the pool when there are several cores; the async demo shows the event loop staying responsive either way.
+"""
+def verifications_per_second(encoded, password, workers=None, budget=0.5):
+    pairs = [(password, encoded)]
+    start, done = time.perf_counter(), 0
+    if workers is None:
+        while time.perf_counter() - start < budget:
+            verify_password(password, encoded)
+            done += 1
+        return done / (time.perf_counter() - start)
+    with ProcessPoolExecutor(workers) as executor:
+        executor.submit(_verify_pair, pairs[0]).result()  # start the workers before timing
+        start = time.perf_counter()
+        while time.perf_counter() - start < budget:
+            batch = pairs * (4 * workers)
+            done += sum(executor.map(_verify_pair, batch))
+        return done / (time.perf_counter() - start)
+
+
+async def login_storm(users, password, executor, logins=16):
+    ticks = 0
+    stop = asyncio.Event()
+
+    async def heartbeat():  # stands in for all the other requests the server must keep answering
+        nonlocal ticks
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(users[i % len(users)].authenticate_async(password, executor)
+                                     for i in range(logins)))
+    seconds = time.perf_counter() - start
+    stop.set()
+    await beat
+    return all(results), seconds, ticks
+
+
+if __name__ == "__main__":
+    user_demo()
+
+    workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    imported = User.bulk_create([(f"user{i}", f"password{i}") for i in range(32)], workers=workers)
+    print(f"bulk import: {len(imported)} users hashed in {time.perf_counter() - start:.2f}s on {workers} process(es)")
+
+    sha256 = hashlib.sha256(b"PASSWORD").hexdigest()
+    start, count = time.perf_counter(), 0
+    while time.perf_counter() - start < 0.5:
+        count += hashlib.sha256(b"PASSWORD").hexdigest() == sha256
+    print(f"{'sha256 (original, unsalted)':<32}: {count / (time.perf_counter() - start):>10,.0f} verifications/s")
+
+    settings = [("pbkdf2_sha256", {"iterations": 100_000}), ("pbkdf2_sha256", {"iterations": 600_000}),
+                ("scrypt", {"n": 2 ** 12}), ("scrypt", {"n": 2 ** 14}), ("scrypt", {"n": 2 ** 15})]
+    for algorithm, options in settings:
+        hasher = PasswordHasher(algorithm, **options)
+        encoded = hasher.hash("PASSWORD")
+        serial = verifications_per_second(encoded, "PASSWORD")
+        pooled = verifications_per_second(encoded, "PASSWORD", workers=workers)
+        print(f"{hasher.prefix:<32}: {serial:>10,.1f} verifications/s serial, {pooled:,.1f}/s with {workers} "
+              f"process(es), {serial and 1000 / serial:.0f} ms per login")
+
+    User.hasher = PasswordHasher("scrypt", n=2 ** 14)
+    users = [User(f"user{i}", "PASSWORD") for i in range(4)]
+    with ThreadPoolExecutor(workers) as threads, ProcessPoolExecutor(workers) as processes:
+        for label, executor in (("thread pool", threads), ("process pool", processes)):
+            valid, seconds, ticks = asyncio.run(login_storm(users, "PASSWORD", executor))
+            print(f"login storm on a {label}: 16 logins in {seconds:.2f}s, all valid: {valid}, "
+                  f"event loop ticked {ticks} times meanwhile (~{seconds / 0.01:.0f} if never blocked)")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why is SHA-256 not suitable for storing passwords?
+A: It is designed to be fast, so attackers can test billions of guesses per second against a leaked hash. Password
+hashing needs a deliberately slow, salted KDF such as scrypt, PBKDF2, bcrypt or Argon2.
+
+Q: What does a salt protect against?
+A: A random per-user salt makes identical passwords hash differently, so precomputed (rainbow) tables are useless and
+each account has to be attacked separately.
+
+Q: How do you choose the cost parameters?
+A: As high as the login latency and server capacity allow - commonly tuned so one hash takes tens to a few hundred
+milliseconds. Storing the parameters in the hash lets you raise them over time and rehash on the next login.
+
+Q: Why run password verification in an executor in an async server?
+A: A KDF call blocks for tens of milliseconds. Run directly on the event loop, it would stall every other connection
+for that time; in an executor the loop keeps serving requests while the hash is computed elsewhere.
+"""
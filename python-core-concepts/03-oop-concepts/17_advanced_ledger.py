@@ -0,0 +1,418 @@
+"""
+A Concurrent BankAccount Ledger
+BankAccount in 01_basics.py keeps __balance private, which is good encapsulation - but under concurrent load it
+breaks down:
+ > self.__balance += amount is a read, an add and a write. Two threads can read the same balance and one deposit is
+   silently lost.
+ > Every operation prints, which is far slower than the update itself.
+ > Balances are whatever number was passed in: 0.1 + 0.2 != 0.3 in floating point, which is unacceptable for money.
+ > Nothing survives a crash.
+
+The ledger below wraps BankAccount with:
+ > Integer minor units (cents): exact arithmetic; amounts are converted once, at the edge, via Decimal.
+ > Atomic batches: a list of deposits, withdrawals and transfers is validated as a whole and either applied completely
+   or not at all.
+ > Lock striping: each account maps to one of a fixed number of locks. A batch takes only the locks of the accounts
+   it touches, always in ascending order (so two batches can never deadlock), and batches on unrelated accounts run
+   concurrently.
+ > An append-only transaction log written before the balances change (write-ahead), plus periodic snapshots: recovery
+   loads the latest snapshot and replays only the log written after it.
+"""
+"""-----------------------------------------------------------------------------------------------------------------"""
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_EVEN
+
+"""
+1. Money in Minor Units
+to_minor() accepts whole units as ints (5 -> 500) and exact amounts as strings or Decimals ("12.34" -> 1234).
+Floats are rejected on purpose: by the time an amount is a float, it may already be off by a fraction of a cent.
+"""
+CENT = Decimal("0.01")
+
+
+def to_minor(amount):
+    if isinstance(amount, float):
+        raise TypeError("Use a str or Decimal for money, not float")
+    if isinstance(amount, int):
+        return amount * 100
+    return int((Decimal(amount) / CENT).to_integral_value(ROUND_HALF_EVEN))
+
+
+def format_minor(minor):
+    sign = "-" if minor < 0 else ""
+    return f"{sign}{abs(minor) // 100}.{abs(minor) % 100:02d}"
+
+
+class InvalidAmount(ValueError):
+    pass
+
+
+class InsufficientFunds(ValueError):
+    pass
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+2. The Account
+BankAccount keeps the original interface, with two changes: amounts are integer minor units, and invalid operations
+raise instead of printing, so a batch can be rolled back. It has no lock of its own - the ledger decides which locks
+protect which accounts.
+"""
+class BankAccount:
+    def __init__(self, balance=0):
+        self.__balance = balance
+
+    def deposit(self, amount):
+        if amount <= 0:
+            raise InvalidAmount(f"Not a valid amount: {amount}")
+        self.__balance += amount
+
+    def withdraw(self, amount):
+        if amount <= 0:
+            raise InvalidAmount(f"Not a valid amount: {amount}")
+        if amount > self.__balance:
+            raise InsufficientFunds(f"Balance {self.__balance} is less than {amount}")
+        self.__balance -= amount
+
+    def get_balance(self):
+        return self.__balance # Getter method
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+3. The Ledger
+apply(batch):
+ 1. Lock the stripes of every account in the batch, in ascending order.
+ 2. Validate the whole batch against tentative balances - each transaction sees the effect of the ones before it.
+    If any transaction fails, raise before anything has changed.
+ 3. Append the batch to the log with the next sequence number (write-ahead).
+ 4. Apply it to the accounts and release the locks.
+Batches that touch the same account hold a common lock through steps 3 and 4, so the log records them in the order
+they were applied; batches on disjoint accounts commute, so their relative order in the log doesn't matter.
+
+Every snapshot_every batches, snapshot() takes every stripe lock (in order) plus the log lock for a consistent view,
+writes the balances and the sequence number they cover to a temporary file, renames it atomically and truncates the
+log. If the process crashes between the rename and the truncation, recover() simply skips log entries the snapshot
+already covers. Account ids are strings, as they round-trip through JSON.
+"""
+Transaction = namedtuple("Transaction", ["kind", "account", "amount", "target"], defaults=[None])
+
+
+class Ledger:
+    def __init__(self, directory=None, stripes=64, snapshot_every=10_000, durable=False):
+        self.accounts = {}
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.log_lock = threading.Lock()
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.durable = durable  # fsync every batch: survives power loss, at a large cost per batch
+        self.sequence = 0
+        self.committed = 0
+        self.rejected = 0
+        self.log = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.log = open(os.path.join(directory, "ledger.log"), "a")
+
+    def _stripes(self, account_ids):
+        return sorted({hash(account_id) % len(self.locks) for account_id in account_ids})
+
+    def open_account(self, account_id, balance=0):
+        self.apply([Transaction("open", account_id, balance)])
+
+    def apply(self, batch):
+        involved = {tx.account for tx in batch} | {tx.target for tx in batch if tx.target is not None}
+        stripes = self._stripes(involved)
+        for stripe in stripes:
+            self.locks[stripe].acquire()
+        try:
+            try:
+                self._validate(batch)
+            except (ValueError, KeyError):
+                with self.log_lock:
+                    self.rejected += 1
+                raise
+            if self.log is not None:
+                self._append(batch)
+            committed = self._apply(batch)
+        finally:
+            for stripe in reversed(stripes):
+                self.locks[stripe].release()
+        if self.log is not None and self.snapshot_every and committed % self.snapshot_every == 0:
+            self.snapshot()
+
+    def _validate(self, batch):
+        balances = {}
+
+        def balance(account_id):
+            if account_id not in balances:
+                if account_id not in self.accounts:
+                    raise KeyError(f"No such account: {account_id!r}")
+                balances[account_id] = self.accounts[account_id].get_balance()
+            return balances[account_id]
+
+        for tx in batch:
+            if type(tx.amount) is not int:  # floats, Decimals and bools would break exact integer arithmetic
+                raise InvalidAmount(f"Amounts must be int minor units (see to_minor), not {type(tx.amount).__name__}")
+            if tx.kind == "open":
+                if tx.account in self.accounts or tx.account in balances or tx.amount < 0:
+                    raise InvalidAmount(f"Cannot open account {tx.account!r} with {tx.amount}")
+                balances[tx.account] = tx.amount
+                continue
+            if tx.amount <= 0:
+                raise InvalidAmount(f"Not a valid amount: {tx.amount}")
+            if tx.kind == "deposit":
+                balances[tx.account] = balance(tx.account) + tx.amount
+            elif tx.kind in ("withdraw", "transfer"):
+                if tx.amount > balance(tx.account):
+                    raise InsufficientFunds(f"Account {tx.account!r} has {balance(tx.account)}, needs {tx.amount}")
+                balances[tx.account] -= tx.amount
+                if tx.kind == "transfer":
+                    balances[tx.target] = balance(tx.target) + tx.amount
+            else:
+                raise ValueError(f"Unknown transaction kind: {tx.kind!r}")
+
+    def _apply(self, batch):
+        for tx in batch:
+            if tx.kind == "open":
+                self.accounts[tx.account] = BankAccount(tx.amount)
+            elif tx.kind == "deposit":
+                self.accounts[tx.account].deposit(tx.amount)
+            else:
+                self.accounts[tx.account].withdraw(tx.amount)
+                if tx.kind == "transfer":
+                    self.accounts[tx.target].deposit(tx.amount)
+        with self.log_lock:
+            self.committed += 1
+            return self.committed
+
+    def _append(self, batch):
+        with self.log_lock:  # short critical section: assign a sequence number and write one line
+            self.sequence += 1
+            self.log.write(json.dumps([self.sequence, [list(tx) for tx in batch]]) + "\n")
+            if self.durable:
+                self.log.flush()
+                os.fsync(self.log.fileno())
+
+    def balance(self, account_id):
+        return self.accounts[account_id].get_balance()
+
+    def total(self):
+        return sum(account.get_balance() for account in self.accounts.values())
+
+    def snapshot(self):
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            with self.log_lock:
+                self.log.flush()
+                state = {"sequence": self.sequence,
+                         "balances": {str(key): account.get_balance() for key, account in self.accounts.items()}}
+                path = os.path.join(self.directory, "snapshot.json")
+                with open(path + ".tmp", "w") as file:
+                    json.dump(state, file)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(path + ".tmp", path)
+                self.log.truncate(0)
+        finally:
+            for lock in reversed(self.locks):
+                lock.release()
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+
+    @classmethod
+    def recover(cls, directory, **options):
+        ledger = cls(**options)  # no directory yet: replaying must not write to the log again
+        snapshot_path = os.path.join(directory, "snapshot.json")
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path) as file:
+                state = json.load(file)
+            ledger.sequence = state["sequence"]
+            ledger.accounts = {key: BankAccount(balance) for key, balance in state["balances"].items()}
+        log_path = os.path.join(directory, "ledger.log")
+        complete = 0  # byte offset just past the last complete line
+        with open(log_path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # a batch torn by a crash mid-write was never applied
+                sequence, batch = json.loads(line)
+                if sequence > ledger.sequence:
+                    ledger._apply([Transaction(*tx) for tx in batch])
+                    ledger.sequence = sequence
+                complete += len(line)
+        if complete < os.path.getsize(log_path):
+            os.truncate(log_path, complete)  # otherwise the next batch would be appended to the torn fragment
+        ledger.directory = directory
+        ledger.log = open(log_path, "a")
+        return ledger
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+4. Demo
+"""
+ledger = Ledger()
+ledger.open_account("alice", to_minor("100.10"))
+ledger.open_account("bob", to_minor(20))
+ledger.apply([Transaction("transfer", "alice", to_minor("0.10"), "bob"),
+              Transaction("transfer", "alice", to_minor("0.20"), "bob")])
+print(format_minor(ledger.balance("alice")), format_minor(ledger.balance("bob")))  # exact: 99.80 20.30
+
+try:  # the second withdrawal fails, so the first one is not applied either
+    ledger.apply([Transaction("withdraw", "bob", to_minor(10)), Transaction("withdraw", "bob", to_minor(50))])
+except InsufficientFunds as error:
+    print(f"batch rejected ({error}); bob still has {format_minor(ledger.balance('bob'))}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+5. Why the Original Needs Locks
+The original read-add-write is run from 8 threads at once, with a tiny thread switch interval so interleavings happen
+as often as possible. CPython 3.11 only switches threads at calls and loop jumps, so the bare += usually survives -
+an implementation detail, not a guarantee (free-threaded builds have no such luck). As soon as anything runs between
+the read and the write - here, composing the audit message that replaces the original print - updates are lost.
+"""
+def audit(message):
+    pass
+
+
+class UnlockedAccount:  # the original BankAccount, from 01_basics.py, without the prints
+    def __init__(self, balance):
+        self.__balance = balance
+
+    def deposit(self, amount):
+        if amount > 0:
+            self.__balance += amount
+
+    def deposit_with_audit(self, amount):
+        if amount > 0:
+            new_balance = self.__balance + amount
+            audit(f"You deposited {amount}")
+            self.__balance = new_balance
+
+    def get_balance(self):
+        return self.__balance # Getter method
+
+
+def hammer(deposit, threads=8, deposits=20_000):
+    workers = [threading.Thread(target=lambda: [deposit(1) for _ in range(deposits)]) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * deposits
+
+
+switch_interval = sys.getswitchinterval()
+sys.setswitchinterval(1e-6)
+try:
+    unlocked, audited = UnlockedAccount(0), UnlockedAccount(0)
+    expected = hammer(unlocked.deposit)
+    hammer(audited.deposit_with_audit)
+    ledger = Ledger()
+    ledger.open_account("shared", 0)
+    hammer(lambda amount: ledger.apply([Transaction("deposit", "shared", amount)]))
+finally:
+    sys.setswitchinterval(switch_interval)
+print(f"deposits kept out of {expected:,} - unlocked +=: {unlocked.get_balance():,}, "
+      f"unlocked with audit: {audited.get_balance():,}, ledger: {ledger.balance('shared'):,}")
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+6. Benchmark: Multi-Threaded Throughput and Recovery
+8 threads apply random transfers between 1,000 accounts in batches of 10. The runs compare one global lock
+(stripes=1) with 64 stripes, and the cost of the log and of fsync-per-batch durability. The total amount of money
+must be the same at the end of every run.
+In CPython the GIL lets only one thread run Python code at a time, so striping mostly removes lock convoys rather
+than adding parallelism; it pays off fully on free-threaded builds or when apply() waits on I/O (like fsync) while
+holding its locks.
+"""
+def run_transfers(ledger, threads=8, batches_per_thread=1_000, batch_size=10, accounts=1_000):
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(batches_per_thread):
+            batch = [Transaction("transfer", f"acct{rng.randrange(accounts)}", rng.randint(1, 500),
+                                 f"acct{rng.randrange(accounts)}") for _ in range(batch_size)]
+            try:
+                ledger.apply(batch)
+            except InsufficientFunds:
+                pass
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def new_ledger(accounts=1_000, **options):
+    ledger = Ledger(**options)
+    for i in range(accounts):
+        ledger.open_account(f"acct{i}", to_minor(100))
+    return ledger
+
+
+directory = tempfile.mkdtemp(prefix="ledger_")
+runs = [("1 global lock, no log", {"stripes": 1}, 1_000),
+        ("64 stripes, no log", {"stripes": 64}, 1_000),
+        ("64 stripes, log + snapshots", {"stripes": 64, "directory": os.path.join(directory, "log")}, 1_000),
+        ("64 stripes, fsync per batch", {"stripes": 64, "directory": os.path.join(directory, "fsync"),
+                                          "durable": True}, 50)]
+for label, options, batches in runs:
+    ledger = new_ledger(**options)
+    start_total, committed = ledger.total(), ledger.committed
+    seconds = run_transfers(ledger, batches_per_thread=batches)
+    batches_done = ledger.committed - committed + ledger.rejected
+    print(f"{label:<28}: {batches_done * 10 / seconds:>9,.0f} transactions/s, "
+          f"{ledger.rejected} batches rejected, money conserved: {ledger.total() == start_total}")
+    ledger.close()
+
+# Recovery: replaying the whole log vs loading a snapshot and replaying the tail
+for label, snapshot_every in (("full log replay", 0), ("snapshot + log tail", 5_000)):
+    path = os.path.join(directory, f"recovery{snapshot_every}")
+    ledger = new_ledger(directory=path, snapshot_every=snapshot_every)
+    run_transfers(ledger, batches_per_thread=2_000)
+    expected = {key: account.get_balance() for key, account in ledger.accounts.items()}
+    ledger.close()
+    start = time.perf_counter()
+    recovered = Ledger.recover(path)
+    seconds = time.perf_counter() - start
+    print(f"{label:<20}: recovered in {seconds:.3f}s ({os.path.getsize(os.path.join(path, 'ledger.log')) / 1024:.0f} "
+          f"KiB of log), identical balances: {expected == {k: a.get_balance() for k, a in recovered.accounts.items()}}")
+    recovered.close()
+
+# A crash mid-write leaves a torn last line. Recovery cuts it off, so the ledger keeps working and recovers again later
+path = os.path.join(directory, "torn")
+ledger = new_ledger(accounts=2, directory=path)
+ledger.close()
+with open(os.path.join(path, "ledger.log"), "a") as log:
+    log.write('[3, [["deposit", "acct0", 5')  # the crash hit in the middle of this line
+recovered = Ledger.recover(path)
+recovered.apply([Transaction("deposit", "acct0", to_minor(1))])
+recovered.close()
+recovered = Ledger.recover(path)
+print(f"torn write: recovered twice, acct0 has {format_minor(recovered.balance('acct0'))}")  # 101.00
+recovered.close()
+shutil.rmtree(directory)
+"""-----------------------------------------------------------------------------------------------------------------"""
+"""
+Q: Why store money as integers?
+A: Binary floating point cannot represent most decimal fractions exactly (0.1 + 0.2 == 0.30000000000000004), and the
+errors accumulate. Integer cents (or Decimal) keep every balance exact.
+
+Q: How does lock striping avoid deadlocks?
+A: Every operation acquires the locks it needs in the same global order (ascending stripe index). A cycle of threads
+each waiting for the next one's lock would need someone to take locks out of order, which never happens.
+
+Q: What is a write-ahead log?
+A: An append-only record of each change, written before the change is applied. After a crash, replaying the log
+rebuilds the state; nothing that was acknowledged is lost as long as the log reached disk.
+
+Q: Why take snapshots if the log already has everything?
+A: Replay time grows with the log. A snapshot captures the full state at one sequence number, so recovery only
+replays what came after it, and the log before the snapshot can be discarded.
+"""